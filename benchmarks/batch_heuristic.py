@@ -0,0 +1,73 @@
+import argparse
+import json
+import time
+from benchmarks.generator import generate_instance, instance_name
+from benchmarks.runner import sample_states
+from src.core.loader import build_problem_index
+from src.search.astar import get_all_possible_actions
+from src.search.heuristic import heuristic
+from src.search.vector_heuristic import batch_heuristic
+
+# Generated instances of growing branching factor - (jigs, racks, flights, seed)
+GENERATED_INSTANCES = ((20, 4, 2, 0), (60, 8, 4, 0), (120, 16, 6, 0), (240, 32, 8, 0))
+
+def expansion_successors(problem, num_states):
+    """Return the valid successors of each sampled state, one list per expansion."""
+    return [[successor for successor in (state.get_next_state(action, problem)
+                                         for action in get_all_possible_actions(state, problem))
+             if successor is not None]
+            for state in sample_states(problem, num_states)]
+
+def compare_paths(name, problem, num_states, repeats):
+    """Time the scalar and batched heuristic over the same expansions and return a result row."""
+    expansions = expansion_successors(problem, num_states)
+    successors = sum(len(children) for children in expansions)
+
+    def run_scalar():
+        start_time = time.perf_counter()
+        for children in expansions:
+            [heuristic(state, problem) for state in children]
+        return time.perf_counter() - start_time
+
+    def run_batched():
+        start_time = time.perf_counter()
+        for children in expansions:
+            batch_heuristic(children, problem)
+        return time.perf_counter() - start_time
+
+    # Both paths must agree before their times mean anything
+    for children in expansions:
+        assert batch_heuristic(children, problem) == [heuristic(state, problem) for state in children]
+
+    scalar_time = min(run_scalar() for _ in range(repeats))
+    batched_time = min(run_batched() for _ in range(repeats))
+    row = {
+        "instance": name,
+        "racks": problem.num_racks,
+        "branching": successors / len(expansions),
+        "scalar_us": scalar_time / successors * 1e6,
+        "batched_us": batched_time / successors * 1e6,
+        "speedup": scalar_time / batched_time
+    }
+    print(f"  {name:<24} {row['racks']:>3} racks, branching {row['branching']:6.1f}: "
+          f"scalar {row['scalar_us']:6.2f}us, batched {row['batched_us']:6.2f}us per successor, "
+          f"speedup {row['speedup']:.2f}x")
+    return row
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare scalar and NumPy-batched heuristic evaluation')
+    parser.add_argument('--states', type=int, default=200, help='Expansions to sample per instance')
+    parser.add_argument('--repeats', type=int, default=3, help='Timing repeats; the best is reported')
+    parser.add_argument('--output', help='JSON file to save the results to')
+    args = parser.parse_args()
+
+    print("Heuristic per successor, scalar vs batched:")
+    results = []
+    for jigs, racks, flights, seed in GENERATED_INSTANCES:
+        problem = build_problem_index(generate_instance(jigs, racks, flights, seed=seed))
+        results.append(compare_paths(instance_name(jigs, racks, flights, seed), problem, args.states, args.repeats))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
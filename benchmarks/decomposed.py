@@ -0,0 +1,65 @@
+import argparse
+import json
+import time
+from benchmarks.generator import generate_instance, instance_name
+from src.core.loader import build_problem_index
+from src.core.state import create_initial_state
+from src.search.astar import astar_search
+from src.search.decomposed import decomposed_search
+from src.utils.verification import simulate_plan
+
+# Generated instances of growing horizon - (jigs, racks, flights, seed), five jigs and one rack per flight
+GENERATED_INSTANCES = tuple((5 * flights, 2 + flights, flights, flights) for flights in (1, 2, 4, 6, 8, 12, 16))
+
+def horizon_instance(num_jigs, num_racks, num_flights, seed):
+    """
+    Return a generated instance whose schedule keeps only the jigs that
+    start on the racks; incoming jigs are not modelled, so scheduling them
+    would leave no reachable goal.
+    """
+    data = generate_instance(num_jigs, num_racks, num_flights, seed=seed, fill_ratio=0.5)
+    on_racks = {jig for rack in data['racks'] for jig in rack['jigs']}
+    for line in data['production_lines']:
+        line['schedule'] = [jig for jig in line['schedule'] if jig in on_racks]
+    return build_problem_index(data)
+
+def compare_solvers(name, problem, max_iterations, time_limit, options):
+    """Solve an instance whole and window by window and return a result row."""
+    initial_state = create_initial_state(problem)
+    row = {"instance": name, "flights": problem.num_flights}
+    for solver, search in (("monolithic", astar_search), ("decomposed", decomposed_search)):
+        start_time = time.perf_counter()
+        plan = search(initial_state, problem, max_iterations, time_limit, **options)
+        row[f"{solver}_time"] = time.perf_counter() - start_time
+        row[f"{solver}_plan"] = len(plan) if plan is not None else None
+        if plan is not None:
+            assert simulate_plan(initial_state, plan, problem, verbose=False)[0]
+
+    def outcome(solver):
+        steps = row[f"{solver}_plan"]
+        return f"{row[f'{solver}_time']:7.2f}s " + (f"{steps:3} steps" if steps is not None else " no plan ")
+    print(f"  {name:<24} {row['flights']:>3} flights: monolithic {outcome('monolithic')}, "
+          f"decomposed {outcome('decomposed')}")
+    return row
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare whole-horizon and flight-by-flight A* as flights grow')
+    parser.add_argument('--max-iterations', type=int, default=20000,
+                        help='Expansion budget of the whole search and of each window search')
+    parser.add_argument('--time-limit', type=int, default=60, help='Time limit per solver and instance in seconds')
+    parser.add_argument('--weight', type=float, default=2.0, help='Heuristic weight of every search')
+    parser.add_argument('--output', help='JSON file to save the results to')
+    args = parser.parse_args()
+
+    print("Monolithic vs decomposed A* by number of flights:")
+    options = {'weight': args.weight, 'prune': True, 'macros': True}
+    results = []
+    for jigs, racks, flights, seed in GENERATED_INSTANCES:
+        problem = horizon_instance(jigs, racks, flights, seed)
+        results.append(compare_solvers(instance_name(jigs, racks, flights, seed), problem,
+                                       args.max_iterations, args.time_limit, options))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
@@ -0,0 +1,101 @@
+import argparse
+import json
+import random
+
+# Jig types of the Beluga challenge - (size_empty, size_loaded)
+JIG_TYPES = {
+    'typeA': (4, 4),
+    'typeB': (8, 11),
+    'typeC': (9, 18),
+    'typeD': (18, 25),
+    'typeE': (32, 32),
+}
+
+def generate_instance(num_jigs=20, num_racks=3, num_flights=0, num_production_lines=2, seed=0,
+                      fill_ratio=0.7, empty_fraction=0.3):
+    """
+    Generate a random Beluga instance in the schema read by load_instance.
+    
+    The same arguments always give the same instance. Jigs that do not
+    arrive on a flight start on the racks, which are sized so they are
+    filled to about fill_ratio. Every loaded jig is scheduled on one of the
+    production lines. With flights, incoming jigs are spread over them and
+    each flight asks for the types of a few empty jigs as outgoing.
+    """
+    rng = random.Random(seed)
+    jig_types = {name: {'name': name, 'size_empty': empty, 'size_loaded': loaded}
+                 for name, (empty, loaded) in JIG_TYPES.items()}
+    
+    # Jigs - about empty_fraction of them start empty
+    names = [f'jig{i:04d}' for i in range(1, num_jigs + 1)]
+    jigs = {name: {'name': name, 'type': rng.choice(list(JIG_TYPES)), 'empty': rng.random() < empty_fraction}
+            for name in names}
+    
+    # Split the jigs between the racks and the incoming flights
+    num_incoming = min(num_jigs // 3, 2 * num_flights)
+    incoming = names[num_jigs - num_incoming:]
+    on_racks = names[:num_jigs - num_incoming]
+    
+    def size(name):
+        empty, loaded = JIG_TYPES[jigs[name]['type']]
+        return empty if jigs[name]['empty'] else loaded
+    
+    # Racks sized for the requested occupancy, and jigs placed where they fit
+    capacity = max(max((size(name) for name in names), default=0),
+                   int(sum(size(name) for name in on_racks) / max(num_racks, 1) / fill_ratio) + 1)
+    racks = [{'name': f'rack{r:02d}', 'size': capacity, 'jigs': []} for r in range(num_racks)]
+    used = [0] * num_racks
+    for name in on_racks:
+        fitting = [r for r in range(num_racks) if used[r] + size(name) <= capacity]
+        rack = rng.choice(fitting) if fitting else min(range(num_racks), key=used.__getitem__)
+        racks[rack]['jigs'].append(name)
+        used[rack] += size(name)
+    
+    # Production lines schedule every loaded jig
+    loaded = [name for name in names if not jigs[name]['empty']]
+    rng.shuffle(loaded)
+    production_lines = [{'name': f'pl{i}', 'schedule': loaded[i::num_production_lines]}
+                        for i in range(num_production_lines)]
+    
+    # Flights bring in the held back jigs and ask for empty jig types
+    empty_types = [jigs[name]['type'] for name in names if jigs[name]['empty']]
+    flights = []
+    for i in range(num_flights):
+        flights.append({
+            'name': f'beluga{i + 1}',
+            'incoming': incoming[i::num_flights],
+            'outgoing': [rng.choice(empty_types) for _ in range(rng.randint(0, 2))] if empty_types else []
+        })
+    
+    return {
+        'trailers_beluga': [{'name': 'beluga_trailer_1'}],
+        'trailers_factory': [{'name': 'factory_trailer_1'}],
+        'hangars': ['hangar1'],
+        'jig_types': jig_types,
+        'racks': racks,
+        'jigs': jigs,
+        'production_lines': production_lines,
+        'flights': flights
+    }
+
+def instance_name(num_jigs, num_racks, num_flights, seed):
+    """File name for a generated instance, in the style of the bundled one."""
+    return f"problem_g{seed}_j{num_jigs}_r{num_racks}_f{num_flights}.json"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate a random Beluga instance')
+    parser.add_argument('output', help='Path of the instance JSON file to write')
+    parser.add_argument('--jigs', type=int, default=20, help='Number of jigs')
+    parser.add_argument('--racks', type=int, default=3, help='Number of racks')
+    parser.add_argument('--flights', type=int, default=0, help='Number of flights')
+    parser.add_argument('--production-lines', type=int, default=2, help='Number of production lines')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--fill-ratio', type=float, default=0.7, help='Target rack occupancy (0-1]')
+    parser.add_argument('--empty-fraction', type=float, default=0.3, help='Fraction of jigs that start empty')
+    args = parser.parse_args()
+    
+    instance = generate_instance(args.jigs, args.racks, args.flights, args.production_lines, args.seed,
+                                 args.fill_ratio, args.empty_fraction)
+    with open(args.output, 'w') as f:
+        json.dump(instance, f, indent=2)
+    print(f"Instance written to {args.output}")
\ No newline at end of file
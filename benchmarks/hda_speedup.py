@@ -0,0 +1,62 @@
+import argparse
+import json
+import time
+from benchmarks.generator import generate_instance, instance_name
+from src.core.loader import load_instance, build_problem_index
+from src.core.state import create_initial_state
+from src.search.hda import hda_search
+from src.search.stats import SearchStats
+
+BUNDLED_INSTANCE = "instances/problem_4_s46_j23_r2_oc51_f6.json"
+
+# Generated instances - (jigs, racks, flights, seed); solvable, since they have no flights
+GENERATED_INSTANCES = ((16, 4, 0, 0), (20, 4, 0, 0))
+
+def run_speedup(name, problem, worker_counts, max_iterations, time_limit):
+    """Solve one problem with each worker count and return a result row per run."""
+    initial_state = create_initial_state(problem)
+    rows = []
+    for workers in worker_counts:
+        stats = SearchStats(timers=False)
+        start_time = time.perf_counter()
+        plan, _ = hda_search(initial_state, problem, workers, max_iterations, time_limit, stats=stats)
+        wall_time = time.perf_counter() - start_time
+        rows.append({
+            "instance": name,
+            "workers": workers,
+            "plan_length": len(plan) if plan is not None else None,
+            "expansions": stats.expansions,
+            "wall_time": wall_time,
+            "expansions_per_second": stats.expansions / wall_time,
+            "speedup": rows[0]["wall_time"] / wall_time if rows else 1.0
+        })
+        row = rows[-1]
+        print(f"  {name:<36} {workers:>2} workers: {row['wall_time']:7.2f}s, "
+              f"{row['expansions']:7} expansions ({row['expansions_per_second']:8.0f}/s), "
+              f"plan {row['plan_length']}, speedup {row['speedup']:.2f}x")
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure HDA* speedup over worker counts')
+    parser.add_argument('--workers', default='1,2,4,8', help='Comma-separated worker counts')
+    parser.add_argument('--max-iterations', type=int, default=20000,
+                        help='Expansion budget (the bundled instance always runs to it)')
+    parser.add_argument('--time-limit', type=int, default=300, help='Time limit in seconds per run')
+    parser.add_argument('--output', help='JSON file to save the results to')
+    args = parser.parse_args()
+    worker_counts = [int(count) for count in args.workers.split(',')]
+    
+    problems = [(BUNDLED_INSTANCE.split('/')[-1], build_problem_index(load_instance(BUNDLED_INSTANCE)))]
+    for jigs, racks, flights, seed in GENERATED_INSTANCES:
+        problems.append((instance_name(jigs, racks, flights, seed),
+                         build_problem_index(generate_instance(jigs, racks, flights, seed=seed))))
+    
+    print("HDA* speedup:")
+    results = []
+    for name, problem in problems:
+        results.extend(run_speedup(name, problem, worker_counts, args.max_iterations, args.time_limit))
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
\ No newline at end of file
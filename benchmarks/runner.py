@@ -0,0 +1,208 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections import deque
+from benchmarks.generator import generate_instance
+from src.core.loader import load_instance, build_problem_index
+from src.core.state import create_initial_state
+from src.search.astar import astar_search, get_all_possible_actions
+from src.search.heuristic import heuristic
+from src.search.nodes import SearchNodeTable
+from src.search.stats import SearchStats
+
+BUNDLED_INSTANCE = "instances/problem_4_s46_j23_r2_oc51_f6.json"
+BASELINE_FILE = "benchmarks/baseline.json"
+
+# Generated benchmark instances - name -> generate_instance keyword arguments
+GENERATED_INSTANCES = {
+    'gen_j12_r3': dict(num_jigs=12, num_racks=3, seed=1),
+    'gen_j20_r4': dict(num_jigs=20, num_racks=4, seed=0),
+    'gen_j40_r6_f4': dict(num_jigs=40, num_racks=6, num_flights=4, seed=0, fill_ratio=0.6),
+    'gen_j60_r8_f6': dict(num_jigs=60, num_racks=8, num_flights=6, num_production_lines=3, seed=0),
+}
+
+# Metrics where a larger value is better; for every other metric smaller is better
+HIGHER_IS_BETTER = {'expansions_per_second'}
+
+def load_benchmark_problems():
+    """Return (name, ProblemIndex) pairs for the bundled and generated instances."""
+    problems = [('bundled', build_problem_index(load_instance(BUNDLED_INSTANCE)))]
+    for name, options in GENERATED_INSTANCES.items():
+        problems.append((name, build_problem_index(generate_instance(**options))))
+    return problems
+
+def sample_states(problem, count):
+    """Return the first `count` states of a breadth-first expansion from the initial state."""
+    initial_state = create_initial_state(problem)
+    order = []
+    seen = {initial_state}
+    frontier = deque([initial_state])
+    while frontier and len(order) < count:
+        state = frontier.popleft()
+        order.append(state)
+        for action in get_all_possible_actions(state, problem):
+            next_state = state.get_next_state(action, problem)
+            if next_state not in seen:
+                seen.add(next_state)
+                frontier.append(next_state)
+    return order
+
+def _best_of(repeats, run):
+    """Run a timed function `repeats` times and return its lowest time."""
+    return min(run() for _ in range(repeats))
+
+def time_components(problem, states, repeats=3):
+    """
+    Time the parts of an expansion over a fixed set of states.
+    
+    Returns per-call times in microseconds for successor generation (action
+    generation plus get_next_state, per successor), the heuristic, a full
+    Zobrist hash recompute, and duplicate detection (node table lookup and
+    insert).
+    """
+    zobrist = problem.zobrist
+    successors = [state.get_next_state(action, problem)
+                  for state in states for action in get_all_possible_actions(state, problem)]
+    
+    def run_successors():
+        start_time = time.perf_counter()
+        for state in states:
+            for action in get_all_possible_actions(state, problem):
+                state.get_next_state(action, problem)
+        return time.perf_counter() - start_time
+    
+    def run_heuristic():
+        start_time = time.perf_counter()
+        for state in successors:
+            heuristic(state, problem)
+        return time.perf_counter() - start_time
+    
+    def run_hash():
+        start_time = time.perf_counter()
+        for state in successors:
+            zobrist.hash_state(state.racks, state.loaded, state.beluga, state.factory,
+                               state.produced, state.current_flight_idx)
+        return time.perf_counter() - start_time
+    
+    def run_dedup():
+        nodes = SearchNodeTable()
+        start_time = time.perf_counter()
+        for state in successors:
+            if nodes.lookup(state) is None:
+                nodes.add(state, -1, None, 0)
+        return time.perf_counter() - start_time
+    
+    scale = 1e6 / max(len(successors), 1)
+    return {
+        'successor_us': _best_of(repeats, run_successors) * scale,
+        'heuristic_us': _best_of(repeats, run_heuristic) * scale,
+        'hash_us': _best_of(repeats, run_hash) * scale,
+        'dedup_us': _best_of(repeats, run_dedup) * scale,
+    }
+
+def time_search(problem, max_iterations, repeats=3):
+    """
+    Measure astar_search throughput over a fixed expansion budget, and its
+    peak traced memory in a separate run (tracemalloc slows the search down).
+    """
+    initial_state = create_initial_state(problem)
+    best = None
+    for _ in range(repeats):
+        stats = SearchStats(timers=False)
+        astar_search(initial_state, problem, max_iterations, time_limit=600, stats=stats)
+        if best is None or stats.search_time < best.search_time:
+            best = stats
+    
+    tracemalloc.start()
+    astar_search(initial_state, problem, max_iterations, time_limit=600)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    return {
+        'expansions': best.expansions,
+        'expansions_per_second': best.expansions / max(best.search_time, 1e-9),
+        'peak_memory_mb': peak / 1e6,
+    }
+
+def run_benchmarks(max_iterations=2000, sample_size=200, repeats=3):
+    """Run every benchmark and return the results, keyed by instance then metric."""
+    results = {}
+    for name, problem in load_benchmark_problems():
+        states = sample_states(problem, sample_size)
+        metrics = time_components(problem, states, repeats)
+        metrics.update(time_search(problem, max_iterations, repeats))
+        results[name] = metrics
+        print(f"  {name:<16} " + ", ".join(f"{metric} {value:.3g}" for metric, value in metrics.items()))
+    return results
+
+def compare_results(results, baseline, threshold=0.1):
+    """
+    Compare results with a baseline and return the regressions.
+    
+    A metric regresses when it is worse than the baseline by more than
+    `threshold` as a fraction of the baseline value. Returns a list of
+    (instance, metric, baseline value, new value, relative change) tuples.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            base = baseline.get(name, {}).get(metric)
+            if not base or metric == 'expansions':
+                continue
+            change = (value - base) / base
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            if worse > threshold:
+                regressions.append((name, metric, base, value, change))
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the solver benchmarks and compare with a baseline')
+    parser.add_argument('--output', help='JSON file to save the results to')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='Baseline JSON file to compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='Overwrite the baseline with these results')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative slowdown flagged as a regression (default: 0.1)')
+    parser.add_argument('--max-iterations', type=int, default=2000, help='Expansion budget per search')
+    parser.add_argument('--sample-size', type=int, default=200, help='States timed per component benchmark')
+    args = parser.parse_args()
+    
+    print("Running benchmarks...")
+    results = run_benchmarks(args.max_iterations, args.sample_size)
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'max_iterations': args.max_iterations,
+        'sample_size': args.sample_size,
+        'results': results
+    }
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+    
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        sys.exit(0)
+    
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        sys.exit(0)
+    
+    regressions = compare_results(results, baseline['results'], args.threshold)
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+        sys.exit(0)
+    
+    print(f"Regressions beyond {args.threshold:.0%} against {args.baseline}:")
+    for name, metric, base, value, change in regressions:
+        print(f"  {name:<16} {metric:<22} {base:10.3g} -> {value:10.3g} ({change:+.0%})")
+    sys.exit(1)
\ No newline at end of file
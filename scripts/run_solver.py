@@ -4,14 +4,49 @@ import argparse
 import time
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.core.loader import load_instance
+from src.core.loader import load_instance, build_problem_index
 from src.core.state import create_initial_state
 from src.search.astar import astar_search
+from src.search.heuristic import heuristic
+from src.search.anytime import ara_search
+from src.search.beam import beam_search
+from src.search.portfolio import run_portfolio
+from src.search.hda import hda_search
+from src.search.decomposed import decomposed_search
+from src.search.ida import ida_search
+from src.search.stats import SearchStats
+from src.search.progress import console_progress
+from src.search.heuristic_cache import HeuristicCache
+from src.search.pattern_database import PatternDatabase, COMBINE_MODES
 from src.utils.verification import simulate_plan
+from src.utils.batch import run_batch
 from src.utils.utils import print_plan, print_state
 from src.search.goal import detailed_goal_check
 from tests.debug import run_debug_session
 
+# Options each strategy uses ('batch' for --batch, which always runs A*);
+# setting one for a strategy that would ignore it is an error
+STRATEGY_OPTIONS = {
+    'heuristic_cache': ('astar',),
+    'incremental_h': ('astar',),
+    'check_incremental': ('astar',),
+    'batched_h': ('astar',),
+    'open_limit': ('astar',),
+    'spill_dir': ('astar',),
+    'pdb': ('astar', 'ara', 'hda', 'ida'),
+    'prune': ('astar', 'decomposed'),
+    'macros': ('astar', 'decomposed'),
+    'low_memory': ('astar', 'decomposed', 'batch'),
+    'stats': ('astar', 'hda', 'ida'),
+    'initial_weight': ('ara',),
+    'beam_width': ('beam',),
+    'transposition_size': ('ida',),
+    'workers': ('portfolio', 'hda', 'batch'),
+    'results': ('batch',),
+    'memory_limit': ('batch',),
+    'wall_limit': ('batch',)
+}
+
 def save_plan_to_file(plan, instance_data, filename):
     """Save the plan to a file in a readable format."""
     from src.utils.utils import action_to_string
@@ -23,13 +58,83 @@ def save_plan_to_file(plan, instance_data, filename):
 
 def main():
     parser = argparse.ArgumentParser(description='Beluga Solver using A* Search')
-    parser.add_argument('instance_file', help='Path to the instance JSON file')
+    parser.add_argument('instance_file', nargs='?', help='Path to the instance JSON file')
     parser.add_argument('--max-iterations', type=int, default=10000, help='Maximum iterations for A* search')
     parser.add_argument('--time-limit', type=int, default=60, help='Time limit in seconds for A* search')
+    parser.add_argument('--strategy', choices=['astar', 'ara', 'beam', 'portfolio', 'hda', 'decomposed', 'ida'],
+                        default='astar',
+                        help='Search strategy: A*, anytime ARA* returning the best plan found in the budget, '
+                             'beam search, a parallel portfolio of A* variants, hash-distributed parallel A*, '
+                             'A* per flight window with the window plans stitched together, '
+                             'or memory-bounded iterative-deepening A*')
+    parser.add_argument('--initial-weight', type=float, default=3.0, help='Initial heuristic weight for ARA*')
+    parser.add_argument('--beam-width', type=int, default=100, help='States kept per depth for beam search')
+    parser.add_argument('--workers', type=int,
+                        help='Worker processes for the portfolio, HDA* or batch mode (default: CPU count)')
+    parser.add_argument('--transposition-size', type=int, default=0, metavar='N',
+                        help='Entries of the IDA* transposition table, 0 for none')
+    parser.add_argument('--low-memory', action='store_true', help='Keep states only for expanded nodes during search')
+    parser.add_argument('--open-limit', type=int, metavar='N',
+                        help='Keep at most N A* open list entries in memory and spill the rest to disk')
+    parser.add_argument('--spill-dir', help='Directory for the spilled open list runs (default: system temp)')
+    parser.add_argument('--symmetry', action='store_true',
+                        help='Treat empty jigs of the same type as interchangeable during search')
     parser.add_argument('--debug', action='store_true', help='Run in debug mode')
     parser.add_argument('--output', help='Output file to save the plan')
+    parser.add_argument('--heuristic-cache', type=int, metavar='N',
+                        help='Memoize up to N heuristic values during A* search (LRU)')
+    parser.add_argument('--incremental-h', action='store_true',
+                        help='Derive successor heuristics from the parent value during A* search')
+    parser.add_argument('--check-incremental', action='store_true',
+                        help='Verify each incremental heuristic value against a full recompute (debugging)')
+    parser.add_argument('--batched-h', action='store_true',
+                        help='Evaluate the heuristic of all successors of an expansion in one NumPy batch')
+    parser.add_argument('--pdb', type=int, metavar='K',
+                        help='Use a pattern-database heuristic over patterns of K schedule slots during A*, ARA*, '
+                             'HDA* or IDA* search')
+    parser.add_argument('--pdb-combine', choices=COMBINE_MODES, default='max',
+                        help='Combine the pattern values by sum or maximum')
+    parser.add_argument('--pdb-cache', default='outputs/pdb', metavar='DIR',
+                        help='Directory the pattern tables are cached in')
+    parser.add_argument('--prune', action='store_true',
+                        help='Skip successors undoing the last move or commuting with it during A* search')
+    parser.add_argument('--macros', action='store_true',
+                        help='Also search with macro actions retrieving blocked jigs via another rack during A* search')
+    parser.add_argument('--stats', metavar='FILE', help='Save A*, HDA* or IDA* search statistics and timings to FILE as JSON')
+    parser.add_argument('--batch', metavar='DIR', help='Solve every instance in DIR with A* instead of one file')
+    parser.add_argument('--results', default='outputs/batch_results.jsonl',
+                        help='JSONL file the batch results are streamed to')
+    parser.add_argument('--memory-limit', type=int, metavar='MB', help='Memory limit per batch worker in MB')
+    parser.add_argument('--wall-limit', type=float, metavar='SECONDS',
+                        help='Kill a batch worker still on one instance after SECONDS (default: time limit + 30)')
     args = parser.parse_args()
     
+    # Reject option combinations the searches cannot use together. A
+    # heuristic cache can memoize the pattern database, so those two combine
+    heuristic_modes = [name for name, used in (('--heuristic-cache', args.heuristic_cache),
+                                               ('--incremental-h', args.incremental_h or args.check_incremental),
+                                               ('--batched-h', args.batched_h),
+                                               ('--pdb', args.pdb and not args.heuristic_cache)) if used]
+    if len(heuristic_modes) > 1:
+        parser.error(f"{' and '.join(heuristic_modes)} cannot be used together")
+    if args.symmetry and args.prune:
+        parser.error("--prune cannot be used with --symmetry")
+    if args.batch and args.strategy != 'astar':
+        parser.error("--batch always uses A* and cannot be used with --strategy")
+    mode = 'batch' if args.batch else args.strategy
+    for option, strategies in STRATEGY_OPTIONS.items():
+        if mode not in strategies and getattr(args, option) != parser.get_default(option):
+            flag = '--' + option.replace('_', '-')
+            parser.error(f"{flag} cannot be used with {'--batch' if args.batch else '--strategy ' + mode}")
+    
+    # Solve a directory of instances if requested
+    if args.batch:
+        run_batch(args.batch, args.results, args.workers, args.max_iterations, args.time_limit,
+                  args.memory_limit, args.low_memory, args.wall_limit)
+        return
+    if not args.instance_file:
+        parser.error("an instance file or --batch DIR is required")
+    
     # Check if file exists
     if not os.path.exists(args.instance_file):
         print(f"Error: Instance file '{args.instance_file}' not found!")
@@ -42,24 +147,88 @@ def main():
     
     # Load instance
     start_time = time.time()
-    instance_data = load_instance(args.instance_file)
+    instance_data = build_problem_index(load_instance(args.instance_file, verbose=True), symmetric=args.symmetry)
     print(f"Instance loaded in {time.time() - start_time:.2f} seconds")
     
     # Create initial state
     initial_state = create_initial_state(instance_data)
     print("Initial state created")
     
-    # Run A* search
-    print(f"Running A* search (max iterations: {args.max_iterations}, time limit: {args.time_limit}s)...")
+    # Run the search
+    name = {'astar': "A*", 'ara': "ARA*", 'beam': "Beam", 'portfolio': "Portfolio", 'hda': "HDA*",
+            'decomposed': "Decomposed A*", 'ida': "IDA*"}[args.strategy]
+    print(f"Running {name} search (max iterations: {args.max_iterations}, time limit: {args.time_limit}s)...")
     start_time = time.time()
-    plan = astar_search(initial_state, instance_data, args.max_iterations, args.time_limit)
+    stats = SearchStats() if args.stats and args.strategy in ('astar', 'hda', 'ida') else None
+    if args.strategy == 'ara':
+        heuristic_fn = None
+        if args.pdb:
+            heuristic_fn = PatternDatabase(instance_data, args.pdb, args.pdb_combine, cache_dir=args.pdb_cache)
+        plan, bound = ara_search(initial_state, instance_data, args.max_iterations, args.time_limit,
+                                 initial_weight=args.initial_weight, progress=console_progress,
+                                 heuristic_fn=heuristic_fn)
+    elif args.strategy == 'beam':
+        plan = beam_search(initial_state, instance_data, args.beam_width, time_limit=args.time_limit,
+                           progress=console_progress)
+    elif args.strategy == 'hda':
+        heuristic_fn = None
+        if args.pdb:
+            heuristic_fn = PatternDatabase(instance_data, args.pdb, args.pdb_combine, cache_dir=args.pdb_cache)
+        plan, _ = hda_search(initial_state, instance_data, args.workers or os.cpu_count() or 1,
+                             args.max_iterations, args.time_limit, stats=stats, progress=console_progress,
+                             heuristic_fn=heuristic_fn)
+    elif args.strategy == 'decomposed':
+        plan = decomposed_search(initial_state, instance_data, args.max_iterations, args.time_limit,
+                                 low_memory=args.low_memory, prune=args.prune, macros=args.macros)
+    elif args.strategy == 'ida':
+        heuristic_fn = None
+        if args.pdb:
+            heuristic_fn = PatternDatabase(instance_data, args.pdb, args.pdb_combine, cache_dir=args.pdb_cache)
+        plan = ida_search(initial_state, instance_data, args.max_iterations, args.time_limit,
+                          transposition_size=args.transposition_size, heuristic_fn=heuristic_fn, stats=stats)
+    elif args.strategy == 'portfolio':
+        plan, results = run_portfolio(instance_data, workers=args.workers,
+                                      max_iterations=args.max_iterations, time_limit=args.time_limit)
+        print("\nPortfolio results:")
+        for result in results:
+            outcome = f"plan of {len(result['plan'])} steps" if result['plan'] else "no plan"
+            if result['stopped']:
+                outcome = "stopped"
+            if result['plan'] and not result['verified']:
+                outcome += " (failed verification)"
+            print(f"  {result['name']:<14} {result['wall_time']:7.2f}s {result['expansions']:8} expansions, {outcome}")
+    else:
+        heuristic_fn = None
+        if args.pdb:
+            heuristic_fn = PatternDatabase(instance_data, args.pdb, args.pdb_combine, cache_dir=args.pdb_cache)
+            print(f"Pattern database: {len(heuristic_fn.patterns)} patterns, {len(heuristic_fn)} abstract states")
+        heuristic_cache = None
+        if args.heuristic_cache:
+            heuristic_cache = HeuristicCache(args.heuristic_cache, function=heuristic if heuristic_fn is None else heuristic_fn)
+            heuristic_fn = None
+        plan = astar_search(initial_state, instance_data, args.max_iterations, args.time_limit,
+                            low_memory=args.low_memory, stats=stats, progress=console_progress,
+                            heuristic_cache=heuristic_cache, incremental=args.incremental_h or args.check_incremental,
+                            check_incremental=args.check_incremental, batched=args.batched_h,
+                            heuristic_fn=heuristic_fn, prune=args.prune, macros=args.macros,
+                            open_limit=args.open_limit, spill_dir=args.spill_dir)
+        if heuristic_cache is not None:
+            print(f"Heuristic cache: {heuristic_cache.counters()}")
+    if stats is not None:
+        print(stats.summary())
+        stats.save(args.stats)
+        print(f"Search statistics saved to {args.stats}")
     search_time = time.time() - start_time
-    print(f"A* search completed in {search_time:.2f} seconds")
+    print(f"{name} search completed in {search_time:.2f} seconds")
     
     # Print and save plan
     if plan:
         print_plan(plan, instance_data)
         print(f"Plan length: {len(plan)}")
+        if args.strategy == 'ara':
+            # Only the pattern database is admissible
+            proven = "proven" if args.pdb else "estimated with the default heuristic, not proven"
+            print(f"Suboptimality bound: {bound:.2f} ({proven})")
         
         if args.output:
             save_plan_to_file(plan, instance_data, args.output)
@@ -97,4 +266,4 @@ def main():
         print(f"  Outgoing jigs loaded: {goal_check['flight_status']['outgoing_processed']}/{goal_check['flight_status']['outgoing_total']}")
 
 if __name__ == "__main__":
-    main()
+    main()
\ No newline at end of file
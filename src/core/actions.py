@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Tuple
 
 @dataclass(frozen=True)
 class MoveJigBetweenRacks:
@@ -36,3 +36,28 @@ class ReturnEmptyJigFromFactory:
 class ProcessNextFlight:
     """Move to the next flight in the schedule."""
     pass
+
+@dataclass(frozen=True)
+class RetrieveJig:
+    """
+    Macro action: clear the jigs in front of a jig onto one other rack, then
+    send it to production.
+    
+    `steps` holds the primitive actions it stands for - a MoveJigBetweenRacks
+    from `from_rack_id` to `via_rack_id` per blocking jig, front first, and
+    the SendJigToProduction. Applying it applies them in order.
+    """
+    jig_id: str
+    from_rack_id: str
+    via_rack_id: str
+    steps: Tuple[Any, ...]
+
+def primitive_steps(action):
+    """Return the primitive actions an action stands for."""
+    if isinstance(action, RetrieveJig):
+        return action.steps
+    return (action,)
+
+def expand_macros(plan):
+    """Return a plan with every macro action replaced by its primitive steps."""
+    return [step for action in plan for step in primitive_steps(action)]
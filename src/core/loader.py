@@ -1,12 +1,16 @@
 import json
 from dataclasses import dataclass
 from typing import Dict, List, Set, Tuple, FrozenSet
+from src.core.zobrist import ZobristKeys, instance_seed
 
-def load_instance(file_path: str) -> Dict:
-    """Load a Beluga problem instance from a JSON file."""
+def load_instance(file_path: str, verbose: bool = False) -> Dict:
+    """Load a Beluga problem instance from a JSON file, printing its size if verbose."""
     with open(file_path, 'r') as f:
         data = json.load(f)
     
+    if not verbose:
+        return data
+    
     # Print basic instance information for verification
     print(f"Loaded instance with {len(data.get('racks', []))} racks")
     print(f"Number of jigs: {len(data.get('jigs', {}).keys())}")
@@ -14,6 +18,193 @@ def load_instance(file_path: str) -> Dict:
     
     return data
 
+@dataclass
+class ProblemIndex:
+    """
+    Compiled view of a problem instance for the search hot path.
+    
+    Built once per instance by build_problem_index. Jig and rack names are
+    interned to dense integer ids (their order in the instance file), and the
+    lookups that used to scan the raw instance dict (rack sizes, jig sizes,
+    the production schedule, outgoing totals) become tuple/set accesses by id.
+    The raw dict is kept in `data`, and `get`/`[]` delegate to it so code that
+    only reads the instance (printing, verification) can be handed either one.
+    """
+    
+    # Raw instance data as returned by load_instance
+    data: Dict
+    
+    # Interned names - id -> name and name -> id
+    jig_names: Tuple[str, ...]
+    jig_ids: Dict[str, int]
+    rack_names: Tuple[str, ...]
+    rack_ids: Dict[str, int]
+    
+    # Rack capacities, indexed by rack id
+    rack_capacity: Tuple[int, ...]
+    
+    # Jig sizes when loaded / empty, indexed by jig id
+    jig_size_loaded: Tuple[int, ...]
+    jig_size_empty: Tuple[int, ...]
+    
+    # Symmetry key of each jig id while it is empty - -1 minus the index of
+    # its jig type, so empty jigs of one type share it
+    empty_key: Tuple[int, ...]
+    
+    # Every jig appearing in any production line schedule, by name, as a
+    # per-id flag tuple and as a bitmask over jig ids
+    scheduled_jigs: FrozenSet[str]
+    is_scheduled: Tuple[bool, ...]
+    scheduled_mask: int
+    
+    # Position in the schedule - mapping of jig_name to (line index, slot index)
+    schedule_position: Dict[str, Tuple[int, int]]
+    
+    # Flight list and per-flight incoming counts
+    flights: List[Dict]
+    incoming_counts: Tuple[int, ...]
+    
+    # outgoing_suffix[i] is the number of outgoing jigs of flights i..end;
+    # it has one extra trailing 0 so any flight index up to len(flights) works
+    outgoing_suffix: Tuple[int, ...]
+    
+    # Hashing keys for states of this instance
+    zobrist: ZobristKeys
+    
+    # Whether states treat empty jigs of the same type as interchangeable
+    # (see BelugaState.signature)
+    symmetric: bool = False
+    
+    @property
+    def num_flights(self):
+        return len(self.flights)
+    
+    @property
+    def num_jigs(self):
+        return len(self.jig_names)
+    
+    @property
+    def num_racks(self):
+        return len(self.rack_names)
+    
+    def jig_size(self, jig, loaded):
+        """Return the rack space taken by jig id `jig` in the given loading status."""
+        if loaded:
+            return self.jig_size_loaded[jig]
+        return self.jig_size_empty[jig]
+    
+    def names_of(self, mask):
+        """Return the jig names whose ids are set in a jig bitmask."""
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.jig_names[low.bit_length() - 1])
+            mask ^= low
+        return names
+    
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+    
+    def __getitem__(self, key):
+        return self.data[key]
+
+def build_problem_index(instance_data: Dict, symmetric: bool = False) -> ProblemIndex:
+    """
+    Compile the lookup tables used by the search from the raw instance data.
+    
+    With symmetric, states of the problem hash and compare equal when they
+    differ only in which empty jigs of a type are where.
+    """
+    # Intern jig and rack names in instance order
+    jig_names = tuple(instance_data.get('jigs', {}).keys())
+    jig_ids = {name: i for i, name in enumerate(jig_names)}
+    rack_names = tuple(rack.get('name') for rack in instance_data.get('racks', []))
+    rack_ids = {name: i for i, name in enumerate(rack_names)}
+    
+    # Rack capacities
+    rack_capacity = tuple(rack.get('size', 0) for rack in instance_data.get('racks', []))
+    
+    # Jig sizes, resolved through jig_types once instead of per lookup
+    jig_types = instance_data.get('jig_types', {})
+    type_index = {name: i for i, name in enumerate(jig_types)}
+    jig_size_loaded = []
+    jig_size_empty = []
+    empty_key = []
+    for jig_data in instance_data.get('jigs', {}).values():
+        jig_type = jig_types[jig_data.get('type')]
+        jig_size_loaded.append(jig_type['size_loaded'])
+        jig_size_empty.append(jig_type['size_empty'])
+        empty_key.append(-1 - type_index[jig_data.get('type')])
+    
+    # Production schedule
+    schedule_position = {}
+    for line_idx, line in enumerate(instance_data.get('production_lines', [])):
+        for slot_idx, jig_id in enumerate(line.get('schedule', [])):
+            schedule_position.setdefault(jig_id, (line_idx, slot_idx))
+    is_scheduled = tuple(name in schedule_position for name in jig_names)
+    scheduled_mask = 0
+    for jig, scheduled in enumerate(is_scheduled):
+        if scheduled:
+            scheduled_mask |= 1 << jig
+    
+    # Flight totals
+    flights = instance_data.get('flights', [])
+    incoming_counts = tuple(len(flight.get('incoming', [])) for flight in flights)
+    outgoing_suffix = [0] * (len(flights) + 1)
+    for i in range(len(flights) - 1, -1, -1):
+        outgoing_suffix[i] = outgoing_suffix[i + 1] + len(flights[i].get('outgoing', []))
+    
+    # Zobrist keys, with rack slot rows for as many jigs as fit by capacity
+    positive_sizes = [size for size in jig_size_loaded + jig_size_empty if size > 0]
+    min_size = min(positive_sizes, default=0)
+    rack_slots = []
+    for rack in instance_data.get('racks', []):
+        slots = rack.get('size', 0) // min_size if min_size else len(jig_names)
+        rack_slots.append(min(len(jig_names), max(slots, len(rack.get('jigs', [])))))
+    zobrist = ZobristKeys(instance_seed(instance_data), len(jig_names), rack_slots)
+    
+    return ProblemIndex(
+        data=instance_data,
+        jig_names=jig_names,
+        jig_ids=jig_ids,
+        rack_names=rack_names,
+        rack_ids=rack_ids,
+        rack_capacity=rack_capacity,
+        jig_size_loaded=tuple(jig_size_loaded),
+        jig_size_empty=tuple(jig_size_empty),
+        empty_key=tuple(empty_key),
+        scheduled_jigs=frozenset(schedule_position),
+        is_scheduled=is_scheduled,
+        scheduled_mask=scheduled_mask,
+        schedule_position=schedule_position,
+        flights=flights,
+        incoming_counts=incoming_counts,
+        outgoing_suffix=tuple(outgoing_suffix),
+        zobrist=zobrist,
+        symmetric=symmetric
+    )
+
+# The raw dict last compiled by ensure_problem_index and its index
+_last_compiled = (None, None)
+
+def ensure_problem_index(instance_data) -> ProblemIndex:
+    """
+    Return instance_data as a ProblemIndex, compiling it if it is a raw dict.
+    
+    Per-state functions (heuristic, goal checks, action generation) call this
+    on every state, so the index of the last raw dict is kept and reused while
+    the same dict object is passed again. A dict modified after it was compiled
+    must go through build_problem_index instead.
+    """
+    global _last_compiled
+    if isinstance(instance_data, ProblemIndex):
+        return instance_data
+    data, problem = _last_compiled
+    if data is not instance_data:
+        problem = build_problem_index(instance_data)
+        _last_compiled = (instance_data, problem)
+    return problem
+
 def extract_initial_state_data(instance_data: Dict) -> Dict:
     """Extract relevant information for initial state creation."""
     initial_data = {}
@@ -72,6 +263,6 @@ def extract_initial_state_data(instance_data: Dict) -> Dict:
 
 if __name__ == "__main__":
     # Test the loading function
-    instance_data = load_instance("problem_4_s46_j23_r2_oc51_f6.json")
+    instance_data = load_instance("problem_4_s46_j23_r2_oc51_f6.json", verbose=True)
     initial_state_data = extract_initial_state_data(instance_data)
     print("Successfully extracted initial state data!")
\ No newline at end of file
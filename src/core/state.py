@@ -1,146 +1,319 @@
-from dataclasses import dataclass, field
+from dataclasses import replace
 from typing import Dict, List, Set, Tuple, FrozenSet, Any
+from src.core.loader import ensure_problem_index
+from src.core.zobrist import rack_slots_hash
 
-@dataclass(frozen=True)
-class BelugaState:
-    """Represents the state of the Beluga problem."""
-    
-    # Rack status - mapping of rack_name to list of jig_names (in order)
-    rack_jigs: Dict[str, Tuple[str, ...]]
-    
-    # Jig status - mapping of jig_name to (loaded status, part_id if loaded)
-    jig_status: Dict[str, Tuple[bool, str]]
+# Location codes used in BelugaState.locations for jigs that are not on a rack
+# (a jig on a rack has the rack id, which is never negative)
+IN_BELUGA = -1
+IN_FACTORY = -2
+NO_LOCATION = -3
+
+def iter_bits(mask):
+    """Yield the ids set in a bitmask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def _take_from_rack(zobrist, racks, rack, jig, state_hash):
+    """
+    Remove a jig from racks[rack] (a list of rack tuples) and return the
+    updated state hash. Jigs behind the removed one move down a position, so
+    their slot keys are swapped as well.
+    """
+    jigs = racks[rack]
+    rows = zobrist.rack[rack]
+    i = jigs.index(jig)
+    remaining = jigs[:i] + jigs[i + 1:]
+    racks[rack] = remaining
+    if i == len(remaining):
+        # Taken from the back - nothing shifts
+        return state_hash ^ rows[i][jig]
+    return state_hash ^ rack_slots_hash(rows, jigs) ^ rack_slots_hash(rows, remaining)
+
+def _put_on_rack(zobrist, racks, rack, jig, state_hash):
+    """Append a jig to racks[rack] and return the updated state hash."""
+    jigs = racks[rack]
+    racks[rack] = jigs + (jig,)
+    return state_hash ^ zobrist.rack_row(rack, len(jigs))[jig]
+
+def _compute_rack_used(problem, racks, loaded):
+    """Sum the sizes of the jigs on each rack."""
+    sizes_loaded = problem.jig_size_loaded
+    sizes_empty = problem.jig_size_empty
+    return tuple(sum(sizes_loaded[jig] if loaded >> jig & 1 else sizes_empty[jig] for jig in jigs)
+                 for jigs in racks)
+
+def _compute_locations(num_jigs, racks, beluga, factory):
+    """Build the jig -> location tuple from rack contents and location masks."""
+    locations = [NO_LOCATION] * num_jigs
+    for rack, jigs in enumerate(racks):
+        for jig in jigs:
+            locations[jig] = rack
+    for jig in iter_bits(beluga):
+        locations[jig] = IN_BELUGA
+    for jig in iter_bits(factory):
+        locations[jig] = IN_FACTORY
+    return tuple(locations)
+
+def _compute_signature(problem, racks, loaded, beluga, factory, current_flight_idx):
+    """
+    Canonical form of a state under the symmetry of empty jigs of one type.
     
-    # Beluga status - set of jig_names currently in Beluga
-    beluga_jigs: FrozenSet[str]
+    Loaded jigs keep their ids and empty jigs are replaced by their type's
+    empty_key; empty jigs in Beluga or the factory are counted by type. The
+    produced mask is left out: a produced jig is empty from then on, so it
+    only records history.
+    """
+    keys = problem.empty_key
+    rack_keys = tuple(tuple(jig if loaded >> jig & 1 else keys[jig] for jig in jigs) for jigs in racks)
+    return (current_flight_idx, loaded, rack_keys, beluga & loaded, factory & loaded,
+            tuple(sorted(keys[jig] for jig in iter_bits(beluga & ~loaded))),
+            tuple(sorted(keys[jig] for jig in iter_bits(factory & ~loaded))))
+
+class BelugaState:
+    """
+    Represents the state of the Beluga problem.
     
-    # Factory status - set of jig_names currently in factory
-    factory_jigs: FrozenSet[str]
+    Jigs and racks are identified by the integer ids interned in the
+    ProblemIndex. States are immutable by convention, so successors share
+    every component an action leaves unchanged with their parent. The hash
+    is a Zobrist hash (see ZobristKeys): computed in full for initial states
+    and updated incrementally by get_next_state. The exception are working
+    copies from mutable_copy, which apply and undo change in place for
+    depth-first search.
     
-    # Production status - set of part_ids already sent to production
-    produced_parts: FrozenSet[str]
+    For a symmetric ProblemIndex, the hash and equality go by the canonical
+    signature instead, so states that differ only in which empty jigs of a
+    type are where are one state to the search (see concrete_plan).
     
-    # Current flight index
-    current_flight_idx: int
+    The string-keyed attributes of the original representation (rack_jigs,
+    jig_status, beluga_jigs, factory_jigs, produced_parts) remain available
+    as read-only views built on access; the search works on the integer
+    fields directly.
+    """
     
-    # Optional metadata for tracking
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    __slots__ = ('problem', 'racks', 'rack_used', 'loaded', 'beluga', 'factory',
+                 'produced', 'current_flight_idx', '_locations', '_signature', '_hash')
     
-    def __post_init__(self):
-        """Validate the state after initialization."""
-        # No validation for now to keep it simple
-        pass
+    def __init__(self, problem, racks, loaded, beluga, factory, produced,
+                 current_flight_idx, locations=None, state_hash=None, rack_used=None):
+        # Compiled problem the ids refer to
+        self.problem = problem
+        
+        # Rack status - tuple indexed by rack id of tuples of jig ids (in order)
+        self.racks = racks
+        
+        # Bitmasks over jig ids: loaded jigs, jigs currently in Beluga, jigs
+        # currently in factory, and jigs whose part was sent to production
+        self.loaded = loaded
+        self.beluga = beluga
+        self.factory = factory
+        self.produced = produced
+        
+        # Current flight index
+        self.current_flight_idx = current_flight_idx
+        
+        # Rack occupancy - tuple indexed by rack id of the summed size of the
+        # jigs on it; get_next_state passes it in, updated from the parent's
+        if rack_used is None:
+            rack_used = _compute_rack_used(problem, racks, loaded)
+        self.rack_used = rack_used
+        
+        # Jig location tuple, derived on first use (see locations)
+        self._locations = locations
+        
+        # Canonical signature, derived on first use (see signature)
+        self._signature = None
+        
+        # Zobrist hash - get_next_state passes it in, updated from the parent's;
+        # with symmetry the hash of the signature
+        if state_hash is None:
+            if problem.symmetric:
+                state_hash = hash(self.signature)
+            else:
+                state_hash = problem.zobrist.hash_state(racks, loaded, beluga, factory,
+                                                        produced, current_flight_idx)
+        self._hash = state_hash
     
     def __eq__(self, other):
         """Check if two states are equal."""
+        if self is other:
+            return True
         if not isinstance(other, BelugaState):
             return False
         
-        # Compare all relevant state components
-        return (self.rack_jigs == other.rack_jigs and
-                self.jig_status == other.jig_status and
-                self.beluga_jigs == other.beluga_jigs and
-                self.factory_jigs == other.factory_jigs and
-                self.produced_parts == other.produced_parts and
+        if self._hash != other._hash:
+            return False
+        if self.problem.symmetric:
+            return self.signature == other.signature
+        
+        # Compare all relevant state components (locations and rack_used
+        # follow from them); the hash check above makes this a single
+        # comparison unless hashes collide
+        return (self.racks == other.racks and
+                self.loaded == other.loaded and
+                self.beluga == other.beluga and
+                self.factory == other.factory and
+                self.produced == other.produced and
                 self.current_flight_idx == other.current_flight_idx)
     
     def __hash__(self):
-        """Generate a hash for the state for use in sets and dictionaries."""
-        # Combine hashes of all immutable components
-        components = (
-            hash(tuple(sorted([(k, v) for k, v in self.rack_jigs.items()]))),
-            hash(tuple(sorted([(k, v) for k, v in self.jig_status.items()]))),
-            hash(self.beluga_jigs),
-            hash(self.factory_jigs),
-            hash(self.produced_parts),
-            hash(self.current_flight_idx)
-        )
-        return hash(components)
+        """Return the hash computed at construction."""
+        return self._hash
+    
+    def __repr__(self):
+        return (f"BelugaState(flight={self.current_flight_idx}, racks={self.rack_jigs}, "
+                f"beluga={sorted(self.beluga_jigs)}, factory={sorted(self.factory_jigs)})")
+    
+    def pack(self):
+        """
+        Return the state as a plain tuple of ints and tuples, without the
+        problem, for sending between processes (see unpack).
+        """
+        return (self.racks, self.rack_used, self.loaded, self.beluga, self.factory,
+                self.produced, self.current_flight_idx, self._hash)
+    
+    @classmethod
+    def unpack(cls, problem, packed):
+        """Rebuild a state of `problem` from the tuple returned by pack."""
+        racks, rack_used, loaded, beluga, factory, produced, current_flight_idx, state_hash = packed
+        return cls(problem, racks, loaded, beluga, factory, produced, current_flight_idx,
+                   state_hash=state_hash, rack_used=rack_used)
+    
+    @property
+    def locations(self):
+        """
+        Jig location - tuple indexed by jig id holding the rack id,
+        IN_BELUGA, IN_FACTORY or NO_LOCATION.
+        
+        Derived from the racks and masks the first time it is read, so
+        successors the search never asks about do not pay for a copy.
+        """
+        locations = self._locations
+        if locations is None:
+            locations = _compute_locations(self.problem.num_jigs, self.racks, self.beluga, self.factory)
+            self._locations = locations
+        return locations
+    
+    @property
+    def signature(self):
+        """Canonical form of the state, equal for symmetric states (see _compute_signature)."""
+        signature = self._signature
+        if signature is None:
+            signature = _compute_signature(self.problem, self.racks, self.loaded, self.beluga,
+                                           self.factory, self.current_flight_idx)
+            self._signature = signature
+        return signature
+    
+    @property
+    def key(self):
+        """
+        Plain tuple that is equal for exactly the states that compare equal,
+        without the problem, for memos kept beyond one search.
+        """
+        if self.problem.symmetric:
+            return self.signature
+        return (self.racks, self.loaded, self.beluga, self.factory, self.produced, self.current_flight_idx)
+    
+    # String-keyed views of the state
+    
+    @property
+    def rack_jigs(self) -> Dict[str, Tuple[str, ...]]:
+        """Mapping of rack_name to tuple of jig_names (in order)."""
+        jig_names = self.problem.jig_names
+        return {rack_name: tuple(jig_names[jig] for jig in jigs)
+                for rack_name, jigs in zip(self.problem.rack_names, self.racks)}
+    
+    @property
+    def jig_status(self) -> Dict[str, Tuple[bool, str]]:
+        """Mapping of jig_name to (loaded status, part_id if loaded)."""
+        loaded = self.loaded
+        return {name: ((True, name) if loaded >> jig & 1 else (False, ""))
+                for jig, name in enumerate(self.problem.jig_names)}
+    
+    @property
+    def beluga_jigs(self) -> FrozenSet[str]:
+        """Set of jig_names currently in Beluga."""
+        return frozenset(self.problem.names_of(self.beluga))
+    
+    @property
+    def factory_jigs(self) -> FrozenSet[str]:
+        """Set of jig_names currently in factory."""
+        return frozenset(self.problem.names_of(self.factory))
+    
+    @property
+    def produced_parts(self) -> FrozenSet[str]:
+        """Set of part_ids already sent to production."""
+        return frozenset(self.problem.names_of(self.produced))
+    
+    def is_loaded(self, jig):
+        """Return whether jig id `jig` is loaded."""
+        return bool(self.loaded >> jig & 1)
     
     def get_jig_location(self, jig_id):
         """Return the location of a jig (rack_name, beluga, factory, or None)."""
-        # Check if in Beluga
-        if jig_id in self.beluga_jigs:
-            return "beluga"
+        jig = self.problem.jig_ids.get(jig_id)
+        if jig is None:
+            return None
         
-        # Check if in factory
-        if jig_id in self.factory_jigs:
+        location = self.locations[jig]
+        if location >= 0:
+            return self.problem.rack_names[location]
+        if location == IN_BELUGA:
+            return "beluga"
+        if location == IN_FACTORY:
             return "factory"
-        
-        # Check if in a rack
-        for rack_id, jigs in self.rack_jigs.items():
-            if jig_id in jigs:
-                return rack_id
-        
         return None
     
     def jig_is_at_rack_edge(self, rack_id, jig_id, instance_data):
         """Check if a jig is at an edge of a rack."""
-        jigs = self.rack_jigs.get(rack_id, ())
-        
-        if not jigs or jig_id not in jigs:
+        rack = self.problem.rack_ids.get(rack_id)
+        jig = self.problem.jig_ids.get(jig_id)
+        if rack is None or jig is None:
             return False
         
         # Assuming jigs can be accessed from both sides
         # So check if jig is at either end of the rack
-        if jigs[0] == jig_id or jigs[-1] == jig_id:
-            return True
-        
-        return False
+        jigs = self.racks[rack]
+        return bool(jigs) and (jigs[0] == jig or jigs[-1] == jig)
+    
+    def free_space(self, rack):
+        """Return the unused capacity of rack id `rack`."""
+        return self.problem.rack_capacity[rack] - self.rack_used[rack]
+    
+    def jig_size(self, jig):
+        """Return the rack space taken by jig id `jig` in its current status."""
+        return self.problem.jig_size(jig, self.loaded >> jig & 1)
+    
+    def can_place(self, rack, jig):
+        """Check if jig id `jig` fits on rack id `rack` in its current status."""
+        problem = self.problem
+        return problem.jig_size(jig, self.loaded >> jig & 1) <= problem.rack_capacity[rack] - self.rack_used[rack]
     
     def is_valid_action(self, action, instance_data):
         """Check if an action is valid in the current state."""
         # Import here to avoid circular imports
-        from src.core.actions import MoveJigBetweenRacks, LoadJigToBeluga, UnloadJigFromBeluga, SendJigToProduction, ReturnEmptyJigFromFactory, ProcessNextFlight
+        from src.core.actions import MoveJigBetweenRacks
         
         # MoveJigBetweenRacks
         if isinstance(action, MoveJigBetweenRacks):
-            # Check if jig is in the source rack
-            if action.jig_id not in self.rack_jigs.get(action.from_rack_id, ()):
+            problem = self.problem
+            jig = problem.jig_ids.get(action.jig_id)
+            from_rack = problem.rack_ids.get(action.from_rack_id)
+            to_rack = problem.rack_ids.get(action.to_rack_id)
+            if jig is None or from_rack is None or to_rack is None:
                 return False
             
-            # Check if jig is at the edge of the source rack
-            if not self.jig_is_at_rack_edge(action.from_rack_id, action.jig_id, instance_data):
+            # Check if jig is at the edge of the source rack (which also
+            # checks that it is in the source rack)
+            jigs = self.racks[from_rack]
+            if not jigs or (jigs[0] != jig and jigs[-1] != jig):
                 return False
             
             # Check if destination rack has space
-            # Find rack size
-            rack_size = 0
-            for rack in instance_data.get('racks', []):
-                if rack.get('name') == action.to_rack_id:
-                    rack_size = rack.get('size', 0)
-                    break
-            
-            # Calculate current occupancy of the destination rack
-            current_occupancy = 0
-            for jig_id in self.rack_jigs.get(action.to_rack_id, ()):
-                # Get the jig type
-                jig_type = instance_data['jigs'][jig_id]['type']
-                
-                # Determine if jig is loaded or empty
-                loaded, _ = self.jig_status.get(jig_id, (False, ""))
-                
-                # Get the size from jig_types
-                if loaded:
-                    jig_size = instance_data['jig_types'][jig_type]['size_loaded']
-                else:
-                    jig_size = instance_data['jig_types'][jig_type]['size_empty']
-                
-                current_occupancy += jig_size
-            
-            # Get size of the jig to be moved
-            jig_type = instance_data['jigs'][action.jig_id]['type']
-            loaded, _ = self.jig_status.get(action.jig_id, (False, ""))
-            if loaded:
-                moving_jig_size = instance_data['jig_types'][jig_type]['size_loaded']
-            else:
-                moving_jig_size = instance_data['jig_types'][jig_type]['size_empty']
-            
-            # Check if there's enough space
-            if current_occupancy + moving_jig_size > rack_size:
-                return False
-            
-            return True
+            return self.can_place(to_rack, jig)
         
         # Other action types would be checked similarly
         # For simplicity, assuming other actions are valid
@@ -149,119 +322,290 @@ class BelugaState:
     def get_next_state(self, action, instance_data):
         """Apply an action to get the next state."""
         # Import here to avoid circular imports
-        from src.core.actions import MoveJigBetweenRacks, LoadJigToBeluga, UnloadJigFromBeluga, SendJigToProduction, ReturnEmptyJigFromFactory, ProcessNextFlight
+        from src.core.actions import ProcessNextFlight, RetrieveJig
+        
+        # Macro actions apply their primitive steps in turn
+        if isinstance(action, RetrieveJig):
+            state = self
+            for step in action.steps:
+                state = state.get_next_state(step, instance_data)
+                if state is None:
+                    return None
+            return state
         
         if not self.is_valid_action(action, instance_data):
             return None
         
-        # Create mutable copies of state components
-        rack_jigs = {k: list(v) for k, v in self.rack_jigs.items()}
-        jig_status = dict(self.jig_status)
-        beluga_jigs = set(self.beluga_jigs)
-        factory_jigs = set(self.factory_jigs)
-        produced_parts = set(self.produced_parts)
+        # Rack contents and occupancy are shared with this state unless the
+        # action touches a rack; then only the touched entries are replaced
+        # (inner rack tuples of the other racks are shared either way)
+        racks = self.racks
+        rack_used = self.rack_used
+        if not isinstance(action, ProcessNextFlight):
+            racks = list(racks)
+            rack_used = list(rack_used)
+        loaded, beluga, factory, produced, current_flight_idx, state_hash = self._apply_to(action, racks, rack_used)
+        
+        if racks is not self.racks:
+            racks = tuple(racks)
+            rack_used = tuple(rack_used)
+        
+        problem = self.problem
+        return BelugaState(
+            problem,
+            racks,
+            loaded,
+            beluga,
+            factory,
+            produced,
+            current_flight_idx,
+            state_hash=None if problem.symmetric else state_hash,
+            rack_used=rack_used
+        )
+    
+    def _apply_to(self, action, racks, rack_used):
+        """
+        Apply a valid primitive action to the rack lists `racks` and
+        `rack_used`, which start out as this state's, and return the new
+        (loaded, beluga, factory, produced, current_flight_idx, Zobrist hash).
+        """
+        # Import here to avoid circular imports
+        from src.core.actions import MoveJigBetweenRacks, LoadJigToBeluga, UnloadJigFromBeluga, SendJigToProduction, ReturnEmptyJigFromFactory, ProcessNextFlight
+        
+        problem = self.problem
+        zobrist = problem.zobrist
+        jig_ids = problem.jig_ids
+        rack_ids = problem.rack_ids
+        loaded = self.loaded
+        beluga = self.beluga
+        factory = self.factory
+        produced = self.produced
         current_flight_idx = self.current_flight_idx
+        state_hash = self._hash
         
         # MoveJigBetweenRacks
         if isinstance(action, MoveJigBetweenRacks):
-            # Remove jig from source rack
-            rack_jigs[action.from_rack_id].remove(action.jig_id)
-            # Add jig to destination rack
-            rack_jigs[action.to_rack_id].append(action.jig_id)
+            jig = jig_ids[action.jig_id]
+            from_rack = rack_ids[action.from_rack_id]
+            to_rack = rack_ids[action.to_rack_id]
+            size = self.jig_size(jig)
+            # Remove jig from source rack and add it to destination rack
+            state_hash = _take_from_rack(zobrist, racks, from_rack, jig, state_hash)
+            state_hash = _put_on_rack(zobrist, racks, to_rack, jig, state_hash)
+            rack_used[from_rack] -= size
+            rack_used[to_rack] += size
         
         # LoadJigToBeluga
         elif isinstance(action, LoadJigToBeluga):
-            # Remove jig from source rack
-            rack_jigs[action.from_rack_id].remove(action.jig_id)
-            # Add jig to Beluga
-            beluga_jigs.add(action.jig_id)
+            jig = jig_ids[action.jig_id]
+            from_rack = rack_ids[action.from_rack_id]
+            # Remove jig from source rack and add it to Beluga
+            state_hash = _take_from_rack(zobrist, racks, from_rack, jig, state_hash)
+            rack_used[from_rack] -= self.jig_size(jig)
+            if not beluga >> jig & 1:
+                beluga |= 1 << jig
+                state_hash ^= zobrist.beluga[jig]
         
         # UnloadJigFromBeluga
         elif isinstance(action, UnloadJigFromBeluga):
-            # Remove jig from Beluga
-            beluga_jigs.remove(action.jig_id)
-            # Add jig to destination rack
-            rack_jigs[action.to_rack_id].append(action.jig_id)
+            jig = jig_ids[action.jig_id]
+            # Remove jig from Beluga and add it to destination rack
+            if beluga >> jig & 1:
+                beluga &= ~(1 << jig)
+                state_hash ^= zobrist.beluga[jig]
+            to_rack = rack_ids[action.to_rack_id]
+            state_hash = _put_on_rack(zobrist, racks, to_rack, jig, state_hash)
+            rack_used[to_rack] += self.jig_size(jig)
         
         # SendJigToProduction
         elif isinstance(action, SendJigToProduction):
-            # Remove jig from source rack
-            rack_jigs[action.from_rack_id].remove(action.jig_id)
-            # Add jig to factory
-            factory_jigs.add(action.jig_id)
-            # Mark part as produced
-            loaded, part_id = jig_status[action.jig_id]
-            if loaded and part_id:
-                produced_parts.add(part_id)
-                # Update jig status to empty
-                jig_status[action.jig_id] = (False, "")
+            jig = jig_ids[action.jig_id]
+            from_rack = rack_ids[action.from_rack_id]
+            # Remove jig from source rack and add it to factory; it leaves the
+            # rack at its current (loaded) size and is empty from here on
+            state_hash = _take_from_rack(zobrist, racks, from_rack, jig, state_hash)
+            rack_used[from_rack] -= self.jig_size(jig)
+            if not factory >> jig & 1:
+                factory |= 1 << jig
+                state_hash ^= zobrist.factory[jig]
+            # Mark part as produced and the jig as empty
+            if loaded >> jig & 1:
+                loaded &= ~(1 << jig)
+                state_hash ^= zobrist.loaded[jig]
+                if not produced >> jig & 1:
+                    produced |= 1 << jig
+                    state_hash ^= zobrist.produced[jig]
         
         # ReturnEmptyJigFromFactory
         elif isinstance(action, ReturnEmptyJigFromFactory):
-            # Remove jig from factory
-            factory_jigs.remove(action.jig_id)
-            # Add jig to destination rack
-            rack_jigs[action.to_rack_id].append(action.jig_id)
+            jig = jig_ids[action.jig_id]
+            # Remove jig from factory and add it to destination rack
+            if factory >> jig & 1:
+                factory &= ~(1 << jig)
+                state_hash ^= zobrist.factory[jig]
+            to_rack = rack_ids[action.to_rack_id]
+            state_hash = _put_on_rack(zobrist, racks, to_rack, jig, state_hash)
+            rack_used[to_rack] += self.jig_size(jig)
         
         # ProcessNextFlight
         elif isinstance(action, ProcessNextFlight):
             # Increment flight index
+            # Incoming jigs of the flight are not modelled yet
+            state_hash ^= zobrist.flight_key(current_flight_idx) ^ zobrist.flight_key(current_flight_idx + 1)
             current_flight_idx += 1
-            
-            # Process incoming jigs from the flight
-            if current_flight_idx < len(instance_data.get('flights', [])):
-                current_flight = instance_data['flights'][current_flight_idx]
-                # Need to handle the incoming jigs here
-                # For simplicity, assuming they're handled separately
-        
-        # Convert mutable collections back to immutable
-        rack_jigs = {k: tuple(v) for k, v in rack_jigs.items()}
-        beluga_jigs = frozenset(beluga_jigs)
-        factory_jigs = frozenset(factory_jigs)
-        produced_parts = frozenset(produced_parts)
         
-        return BelugaState(
-            rack_jigs=rack_jigs,
-            jig_status=jig_status,
-            beluga_jigs=beluga_jigs,
-            factory_jigs=factory_jigs,
-            produced_parts=produced_parts,
-            current_flight_idx=current_flight_idx
-        )
+        return loaded, beluga, factory, produced, current_flight_idx, state_hash
+    
+    def mutable_copy(self):
+        """
+        Return a copy of this state that apply and undo can change in place.
+        
+        Its racks and occupancy are lists. While it changes it must not be
+        kept in a set or as a dict key; hash() gives its current hash.
+        """
+        return BelugaState(self.problem, list(self.racks), self.loaded, self.beluga, self.factory,
+                           self.produced, self.current_flight_idx, state_hash=self._hash,
+                           rack_used=list(self.rack_used))
     
+    def apply(self, action):
+        """
+        Apply an action to this state in place, for a state from mutable_copy.
+        
+        Only the racks the action touches are replaced, so no state is
+        allocated per action.
+        
+        Returns:
+            The record undo takes to restore the state, or None if the
+            action is not valid here (the state is then unchanged)
+        """
+        # Import here to avoid circular imports
+        from src.core.actions import RetrieveJig
+        
+        if isinstance(action, RetrieveJig):
+            records = []
+            for step in action.steps:
+                record = self.apply(step)
+                if record is None:
+                    for record in reversed(records):
+                        self.undo(record)
+                    return None
+                records.append(record)
+            return records
+        
+        problem = self.problem
+        if not self.is_valid_action(action, problem):
+            return None
+        
+        # Snapshot what the action can change
+        rack_ids = problem.rack_ids
+        touched = tuple((rack, self.racks[rack], self.rack_used[rack])
+                        for rack in {rack_ids[name] for name in (getattr(action, 'from_rack_id', None),
+                                                                 getattr(action, 'to_rack_id', None))
+                                     if name is not None})
+        record = (touched, self.loaded, self.beluga, self.factory, self.produced,
+                  self.current_flight_idx, self._hash)
+        
+        (self.loaded, self.beluga, self.factory, self.produced,
+         self.current_flight_idx, state_hash) = self._apply_to(action, self.racks, self.rack_used)
+        self._locations = None
+        self._signature = None
+        self._hash = hash(self.signature) if problem.symmetric else state_hash
+        return record
+    
+    def undo(self, record):
+        """Revert the action apply returned `record` for."""
+        if isinstance(record, list):
+            for step_record in reversed(record):
+                self.undo(step_record)
+            return
+        touched, self.loaded, self.beluga, self.factory, self.produced, self.current_flight_idx, self._hash = record
+        for rack, jigs, used in touched:
+            self.racks[rack] = jigs
+            self.rack_used[rack] = used
+        self._locations = None
+        self._signature = None
+
 def create_initial_state(instance_data):
     """Create the initial state from the problem instance data."""
+    problem = ensure_problem_index(instance_data)
+    jig_ids = problem.jig_ids
     
     # Extract rack information
-    rack_jigs = {}
-    for rack in instance_data.get('racks', []):
-        rack_id = rack.get('name')
-        jigs = tuple(rack.get('jigs', []))
-        rack_jigs[rack_id] = jigs
+    racks = tuple(tuple(jig_ids[jig_id] for jig_id in rack.get('jigs', []))
+                  for rack in problem.get('racks', []))
     
     # Extract jig information
-    jig_status = {}
-    for jig_id, jig_data in instance_data.get('jigs', {}).items():
-        loaded = not jig_data.get('empty', False)
-        part_id = jig_id if loaded else ""
-        jig_status[jig_id] = (loaded, part_id)
+    loaded = 0
+    for jig_id, jig_data in problem.get('jigs', {}).items():
+        if not jig_data.get('empty', False):
+            loaded |= 1 << jig_ids[jig_id]
     
-    # Initially, no jigs in Beluga or factory
-    beluga_jigs = frozenset()
-    factory_jigs = frozenset()
+    # Initially, no jigs in Beluga or factory and no parts produced;
+    # start with the first flight
+    return BelugaState(
+        problem,
+        racks,
+        loaded,
+        beluga=0,
+        factory=0,
+        produced=0,
+        current_flight_idx=0
+    )
+
+def empty_jig_mapping(source, target):
+    """
+    Map the empty jigs of `source` to those of a symmetric `target` state.
     
-    # No parts produced initially
-    produced_parts = frozenset()
+    Jigs on racks are matched by rack and position; empty jigs in Beluga
+    or the factory are matched by type, in id order. Only jigs that map to
+    a different jig are included.
+    """
+    mapping = {}
+    for source_jigs, target_jigs in zip(source.racks, target.racks):
+        for jig, other in zip(source_jigs, target_jigs):
+            if jig != other:
+                mapping[jig] = other
+    keys = source.problem.empty_key
+    for source_mask, target_mask in ((source.beluga & ~source.loaded, target.beluga & ~target.loaded),
+                                     (source.factory & ~source.loaded, target.factory & ~target.loaded)):
+        others = {}
+        for other in iter_bits(target_mask):
+            others.setdefault(keys[other], []).append(other)
+        for jig in iter_bits(source_mask):
+            other = others[keys[jig]].pop(0)
+            if jig != other:
+                mapping[jig] = other
+    return mapping
+
+def relabel_action(action, mapping, problem):
+    """Return an action with its jig replaced through a jig id mapping."""
+    jig_id = getattr(action, 'jig_id', None)
+    if jig_id is None:
+        return action
+    jig = mapping.get(problem.jig_ids[jig_id])
+    if jig is None:
+        return action
+    return replace(action, jig_id=problem.jig_names[jig])
+
+def concrete_plan(initial_state, steps):
+    """
+    Turn a plan found over symmetric states into one for the actual jigs.
     
-    # Start with the first flight
-    current_flight_idx = 0
+    A search node keeps the first state it was reached with, while its
+    parent link may later come from a cheaper path reaching a symmetric
+    state, so the actions along a path may name different empty jigs of the
+    same type than the states the path really goes through. `steps` lists
+    (state the action was generated from, action); each action is relabelled
+    onto the state actually reached by the plan so far.
     
-    # Create the initial state
-    return BelugaState(
-        rack_jigs=rack_jigs,
-        jig_status=jig_status,
-        beluga_jigs=beluga_jigs,
-        factory_jigs=factory_jigs,
-        produced_parts=produced_parts,
-        current_flight_idx=current_flight_idx
-    )
\ No newline at end of file
+    Returns:
+        List of actions naming the jigs moved when applied from initial_state
+    """
+    problem = initial_state.problem
+    state = initial_state
+    plan = []
+    for source, action in steps:
+        action = relabel_action(action, empty_jig_mapping(source, state), problem)
+        state = state.get_next_state(action, problem)
+        plan.append(action)
+    return plan
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import random
+from functools import reduce
+from operator import xor
+
+def instance_seed(instance_data):
+    """Derive a stable seed string from the contents of an instance."""
+    encoded = json.dumps(instance_data, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+def rack_slots_hash(rows, jigs):
+    """XOR of the slot keys of a rack's contents (rows is ZobristKeys.rack[rack_id])."""
+    return reduce(xor, map(tuple.__getitem__, rows, jigs), 0)
+
+def _draw_keys(seed, count):
+    """Draw `count` signed 64-bit keys from a generator seeded with `seed`."""
+    rng = random.Random(seed)
+    return tuple(rng.getrandbits(64) - (1 << 63) for _ in range(count))
+
+class ZobristKeys:
+    """
+    Random 64-bit keys for the features of a BelugaState.
+    
+    A state's hash is the XOR of the keys of its features: each jig occupying
+    a (rack, position) slot, each jig in Beluga, in the factory, loaded or
+    produced, and the current flight index. Applying an action only flips the
+    features it touches, so the successor's hash is the parent's hash with a
+    few keys XORed in and out.
+    
+    Keys come from generators seeded by the instance contents, so the same
+    instance hashes identically in every process. They are signed so that any
+    XOR of them stays within the range __hash__ may return unchanged.
+    """
+    
+    def __init__(self, seed, num_jigs, rack_slots):
+        self.seed = seed
+        self.num_jigs = num_jigs
+        
+        # Per-jig keys - tuples indexed by jig id
+        self.beluga = _draw_keys(f"{seed}:beluga", num_jigs)
+        self.factory = _draw_keys(f"{seed}:factory", num_jigs)
+        self.loaded = _draw_keys(f"{seed}:loaded", num_jigs)
+        self.produced = _draw_keys(f"{seed}:produced", num_jigs)
+        
+        # Rack slot keys - rack[rack_id][position][jig_id]. Rows are drawn for
+        # the positions a rack can hold by capacity and extended on demand,
+        # since returns and unloads are not capacity checked
+        self.rack = [[self._draw_row(rack, pos) for pos in range(slots)]
+                     for rack, slots in enumerate(rack_slots)]
+        
+        # Flight index keys, also extended on demand
+        self.flight = []
+    
+    def _draw_row(self, rack, pos):
+        return _draw_keys(f"{self.seed}:rack:{rack}:{pos}", self.num_jigs)
+    
+    def rack_row(self, rack, pos):
+        """Return the keys of every jig for one rack position."""
+        rows = self.rack[rack]
+        while len(rows) <= pos:
+            rows.append(self._draw_row(rack, len(rows)))
+        return rows[pos]
+    
+    def flight_key(self, flight_idx):
+        """Return the key of a flight index."""
+        keys = self.flight
+        while len(keys) <= flight_idx:
+            keys.append(_draw_keys(f"{self.seed}:flight:{len(keys)}", 1)[0])
+        return keys[flight_idx]
+    
+    def hash_state(self, racks, loaded, beluga, factory, produced, current_flight_idx):
+        """Compute a state hash from scratch."""
+        h = self.flight_key(current_flight_idx)
+        for rack, jigs in enumerate(racks):
+            if jigs:
+                self.rack_row(rack, len(jigs) - 1)
+                h ^= rack_slots_hash(self.rack[rack], jigs)
+        
+        for mask, keys in ((loaded, self.loaded), (beluga, self.beluga),
+                           (factory, self.factory), (produced, self.produced)):
+            while mask:
+                low = mask & -mask
+                h ^= keys[low.bit_length() - 1]
+                mask ^= low
+        return h
\ No newline at end of file
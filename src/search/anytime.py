@@ -0,0 +1,148 @@
+import time
+from src.search.heuristic import heuristic
+from src.search.goal import is_goal_state
+from src.search.nodes import SearchNodeTable
+from src.search.astar import PriorityQueue, get_all_possible_actions, reconstruct_plan
+from src.core.loader import ensure_problem_index
+
+def ara_search(initial_state, instance_data, max_iterations=10000, time_limit=60,
+               initial_weight=3.0, weight_step=0.5, progress=None, heuristic_fn=None):
+    """
+    Perform Anytime Repairing A* (ARA*) search.
+    
+    Searches first with the heuristic inflated by initial_weight, which finds
+    a plan quickly, then lowers the weight by weight_step after each pass
+    until it reaches 1. Each pass reuses the nodes and open list of the
+    previous one: nodes that got cheaper after being expanded in a pass are
+    kept aside (the INCONS list) and put back in the open list for the next,
+    so no work is repeated. A pass ends once no open node can lead to a
+    cheaper plan under the current weight.
+    
+    The best plan found so far is returned when the budget runs out. Its
+    suboptimality bound is min(weight of the last finished pass,
+    cost / min(g + h over open and INCONS nodes)). It is a proven bound on
+    cost / optimal cost only with an admissible heuristic_fn such as a
+    PatternDatabase; the default heuristic can overestimate, so with it the
+    bound is an estimate.
+    
+    Args:
+        initial_state: The starting state
+        instance_data: The compiled ProblemIndex (a raw instance dict is
+            compiled on entry)
+        max_iterations: Maximum number of expansions over all passes (default: 10000)
+        time_limit: Time limit in seconds (default: 60)
+        initial_weight: Heuristic weight of the first pass (default: 3.0)
+        weight_step: Amount the weight is lowered by after each pass (default: 0.5)
+        progress: Callable receiving progress event dicts (see
+            src.search.progress): 'start', a 'solution' per cheaper plan
+            and 'finish'; the search prints nothing itself (default: None)
+        heuristic_fn: Callable (state, instance_data) used in place of
+            heuristic, e.g. a PatternDatabase (default: None)
+    
+    Returns:
+        Tuple of (plan, bound): the best plan found and its suboptimality
+        bound, or (None, None) if no plan was found
+    """
+    start_time = time.time()
+    instance_data = ensure_problem_index(instance_data)
+    estimate = heuristic if heuristic_fn is None else heuristic_fn
+    if progress is not None:
+        progress({'event': 'start', 'search': 'ARA*'})
+    
+    # Initialize data structures
+    # Open list entries are (node id, g); h values are kept by node id
+    nodes = SearchNodeTable()
+    h_values = [estimate(initial_state, instance_data)]
+    root = nodes.add(initial_state, -1, None, 0)
+    weight = max(initial_weight, 1.0)
+    open_set = PriorityQueue()
+    open_set.put((root, 0), weight * h_values[root])
+    incons = set()
+    
+    best_plan = None
+    best_cost = float('inf')
+    bound = None
+    iterations = 0
+    
+    while True:
+        # Improve the best plan under the current weight
+        finished = True
+        while not open_set.is_empty() and open_set.elements[0][0] < best_cost:
+            if iterations >= max_iterations or time.time() - start_time > time_limit:
+                finished = False
+                break
+            
+            node, current_cost = open_set.get()
+            
+            # Skip entries superseded by a cheaper path and already expanded nodes
+            if current_cost > nodes.g[node] or nodes.closed[node]:
+                continue
+            
+            iterations += 1
+            current_state = nodes.state(node)
+            nodes.close(node, current_state)
+            
+            # Record a cheaper plan and do not expand past it
+            if is_goal_state(current_state, instance_data):
+                if current_cost < best_cost:
+                    best_cost = current_cost
+                    best_plan = reconstruct_plan(nodes, node)
+                    if progress is not None:
+                        progress({'event': 'solution', 'search': 'ARA*', 'cost': best_cost, 'weight': weight,
+                                  'expansions': iterations, 'elapsed': time.time() - start_time})
+                continue
+            
+            new_cost = current_cost + 1  # Uniform cost
+            for action in get_all_possible_actions(current_state, instance_data):
+                next_state = current_state.get_next_state(action, instance_data)
+                if next_state is None:
+                    continue  # Invalid action/state
+                
+                next_node = nodes.lookup(next_state)
+                if next_node is None:
+                    next_node = nodes.add(next_state, node, action, new_cost)
+                    h_values.append(estimate(next_state, instance_data))
+                elif new_cost < nodes.g[next_node]:
+                    nodes.update(next_node, node, action, new_cost)
+                    
+                    # Expanded in this pass - defer it to the next one
+                    if nodes.closed[next_node]:
+                        incons.add(next_node)
+                        continue
+                else:
+                    continue
+                
+                open_set.put((next_node, new_cost), new_cost + weight * h_values[next_node])
+        
+        # Collect the nodes carried over to the next pass
+        pending = {node for _, _, (node, cost) in open_set.elements
+                   if cost == nodes.g[node] and not nodes.closed[node]}
+        pending |= incons
+        
+        # Bound the cost of the best plan against the cheapest pending node
+        if best_plan is not None:
+            lower = min((nodes.g[node] + h_values[node] for node in pending), default=best_cost)
+            ratio = best_cost / lower if lower > 0 else float('inf')
+            bound = max(1.0, min(ratio, bound if bound is not None else float('inf')))
+            if finished:
+                bound = max(1.0, min(bound, weight))
+        
+        if not finished or not pending or weight == 1.0:
+            break
+        
+        # Lower the weight and rebuild the open list for the next pass
+        weight = max(1.0, weight - weight_step)
+        open_set = PriorityQueue()
+        for node in pending:
+            open_set.put((node, nodes.g[node]), nodes.g[node] + weight * h_values[node])
+        incons = set()
+        nodes.reset_closed()
+    
+    found = best_plan is not None
+    if progress is not None:
+        progress({'event': 'finish', 'search': 'ARA*', 'status': 'goal' if found else 'failed',
+                  'expansions': iterations, 'weight': weight, 'cost': best_cost if found else None,
+                  'bound': bound, 'elapsed': time.time() - start_time})
+    if not found:
+        return None, None
+    return best_plan, bound
\ No newline at end of file
@@ -1,9 +1,16 @@
 import heapq
 from collections import defaultdict
 import time
-from src.search.heuristic import heuristic
+from src.search.heuristic import heuristic, successor_heuristic, checked_successor_heuristic
 from src.search.goal import is_goal_state, check_goal_progress
-from src.core.actions import MoveJigBetweenRacks, LoadJigToBeluga, UnloadJigFromBeluga, SendJigToProduction, ReturnEmptyJigFromFactory, ProcessNextFlight
+from src.search.nodes import SearchNodeTable
+from src.search.pruning import SuccessorPruner
+from src.search.macros import get_macro_actions
+from src.search.open_list import ExternalPriorityQueue
+from src.search.vector_heuristic import batch_heuristic
+from src.core.actions import MoveJigBetweenRacks, LoadJigToBeluga, UnloadJigFromBeluga, SendJigToProduction, ReturnEmptyJigFromFactory, ProcessNextFlight, RetrieveJig, expand_macros
+from src.core.loader import ensure_problem_index
+from src.core.state import BelugaState, iter_bits
 
 class PriorityQueue:
     """A priority queue implementation for the A* search."""
@@ -12,6 +19,9 @@ class PriorityQueue:
         self.elements = []
         self.entry_count = 0  # Used to break ties consistently
     
+    def __len__(self):
+        return len(self.elements)
+    
     def is_empty(self):
         return len(self.elements) == 0
     
@@ -23,171 +33,398 @@ class PriorityQueue:
     def get(self):
         # Return the item, discarding priority and entry_count
         return heapq.heappop(self.elements)[2]
+    
+    def close(self):
+        # Nothing to release; ExternalPriorityQueue deletes its run files here
+        pass
 
 def get_all_possible_actions(state, instance_data):
     """Generate all possible actions from the current state."""
+    instance_data = ensure_problem_index(instance_data)
+    jig_names = instance_data.jig_names
+    rack_names = instance_data.rack_names
+    num_racks = len(state.racks)
     actions = []
     
+    # Only rack moves are constrained by is_valid_action (edge position and
+    # destination capacity); the edge condition holds by construction here,
+    # so only the capacity check is made
+    
     # 1. Generate MoveJigBetweenRacks actions
-    for from_rack_id, jigs in state.rack_jigs.items():
+    free_space = [state.free_space(rack) for rack in range(num_racks)]
+    for from_rack, jigs in enumerate(state.racks):
         if not jigs:
             continue
         
         # Check jigs at the edges
-        for jig_id in [jigs[0], jigs[-1]] if len(jigs) > 0 else []:
-            if jig_id not in jigs:
-                continue  # Skip if jig not found (shouldn't happen)
-            
-            # Try moving to each other rack
-            for to_rack_id in state.rack_jigs.keys():
-                if from_rack_id != to_rack_id:
-                    action = MoveJigBetweenRacks(jig_id, from_rack_id, to_rack_id)
-                    if state.is_valid_action(action, instance_data):
-                        actions.append(action)
+        for jig in (jigs[0], jigs[-1]):
+            size = state.jig_size(jig)
+            # Try moving to each other rack with room for the jig
+            for to_rack in range(num_racks):
+                if from_rack != to_rack and size <= free_space[to_rack]:
+                    actions.append(MoveJigBetweenRacks(jig_names[jig], rack_names[from_rack], rack_names[to_rack]))
     
     # 2. Generate SendJigToProduction actions
-    production_schedule = []
-    for line in instance_data.get('production_lines', []):
-        production_schedule.extend(line.get('schedule', []))
-    
-    for rack_id, jigs in state.rack_jigs.items():
+    is_scheduled = instance_data.is_scheduled
+    for rack, jigs in enumerate(state.racks):
         if not jigs:
             continue
         
         # Check jigs at factory-side edge (assuming the first jig is factory-side)
-        if len(jigs) > 0:
-            jig_id = jigs[0]  # Factory-side jig
-            
-            # Check if jig is in production schedule and still loaded
-            loaded, part_id = state.jig_status.get(jig_id, (False, ""))
-            if jig_id in production_schedule and loaded:
-                action = SendJigToProduction(jig_id, rack_id)
-                if state.is_valid_action(action, instance_data):
-                    actions.append(action)
+        jig = jigs[0]
+        
+        # Check if jig is in production schedule and still loaded
+        if is_scheduled[jig] and state.loaded >> jig & 1:
+            actions.append(SendJigToProduction(jig_names[jig], rack_names[rack]))
     
     # 3. Generate ReturnEmptyJigFromFactory actions
-    for jig_id in state.factory_jigs:
-        # Check if jig is empty
-        loaded, _ = state.jig_status.get(jig_id, (False, ""))
-        if not loaded:
-            # Try returning to each rack
-            for rack_id in state.rack_jigs.keys():
-                action = ReturnEmptyJigFromFactory(jig_id, rack_id)
-                if state.is_valid_action(action, instance_data):
-                    actions.append(action)
-    
-    # 4. Generate ProcessNextFlight action if not at the last flight
-    if state.current_flight_idx < len(instance_data.get('flights', [])) - 1:
-        action = ProcessNextFlight()
-        if state.is_valid_action(action, instance_data):
-            actions.append(action)
-    
-    # 5. Generate LoadJigToBeluga and UnloadJigFromBeluga actions 
-    for jig_id in state.beluga_jigs:
+    for jig in iter_bits(state.factory & ~state.loaded):
+        # Try returning each empty jig to each rack
+        for rack in range(num_racks):
+            actions.append(ReturnEmptyJigFromFactory(jig_names[jig], rack_names[rack]))
+    
+    # 4. Generate ProcessNextFlight action while flights remain to be processed
+    if state.current_flight_idx < instance_data.num_flights:
+        actions.append(ProcessNextFlight())
+    
+    # 5. Generate LoadJigToBeluga and UnloadJigFromBeluga actions
+    for jig in iter_bits(state.beluga):
         # Check if jig is loaded
-        loaded, _ = state.jig_status.get(jig_id, (False, ""))
-        if loaded:
+        if state.loaded >> jig & 1:
             # Unload from Beluga
-            action = UnloadJigFromBeluga(jig_id)
-            if state.is_valid_action(action, instance_data):
-                actions.append(action)
+            actions.append(UnloadJigFromBeluga(jig_names[jig]))
         else:
             # Load to Beluga
-            action = LoadJigToBeluga(jig_id)
-            if state.is_valid_action(action, instance_data):
-                actions.append(action)
+            actions.append(LoadJigToBeluga(jig_names[jig]))
     
     return actions
 
-def astar_search(initial_state, instance_data, max_iterations=10000, time_limit=60):
+# Policies for a cheaper path found to an already expanded (closed) state
+REOPEN_POLICIES = ('always', 'never', 'inconsistent')
+
+# Orders among open entries of equal priority: insertion order, deepest
+# first or shallowest first
+TIE_BREAKS = ('fifo', 'high_g', 'low_g')
+
+def make_priority(weight=1.0, greedy=False, tie_break='fifo'):
+    """Return the open list priority function of (g, h) for a search configuration."""
+    if tie_break not in TIE_BREAKS:
+        raise ValueError(f"Unknown tie-break '{tie_break}', expected one of {TIE_BREAKS}")
+    g_weight = 0 if greedy else 1
+    if tie_break == 'high_g':
+        return lambda g, h: (g_weight * g + weight * h, -g)
+    if tie_break == 'low_g':
+        return lambda g, h: (g_weight * g + weight * h, g)
+    return lambda g, h: g_weight * g + weight * h
+
+def make_expander(instance_data, expand, macros=False, pruner=None):
+    """
+    Return the successor generation function of a search configuration.
+    
+    It is called as expander(state, nodes, node) with the state of a node
+    of a SearchNodeTable, and returns the actions to apply from it:
+    expand(state, instance_data), plus RetrieveJig macros with macros, less
+    those the SuccessorPruner drops given the action that generated the node.
+    """
+    if not macros and pruner is None:
+        return lambda state, nodes, node: expand(state, instance_data)
+    
+    def expander(state, nodes, node):
+        actions = expand(state, instance_data)
+        if macros:
+            actions += get_macro_actions(state, instance_data)
+        parent = nodes.parent[node]
+        if pruner is not None and parent != -1:
+            actions = pruner.prune(actions, nodes.actions.decode(nodes.action[node]), nodes.state(parent))
+        return actions
+    return expander
+
+def make_evaluator(instance_data, estimate, derive=None, estimate_all=None):
+    """
+    Return the heuristic evaluation function of a search configuration.
+    
+    It is called as evaluator(state, h, children) with an expanded state,
+    its heuristic value and its (action, next_state, ...) children, and
+    returns the children's heuristic values: from one estimate_all batch
+    call when given, else derived from the parent's value by derive (see
+    successor_heuristic) when given, else from estimate per child.
+    """
+    if estimate_all is not None:
+        return lambda state, h, children: estimate_all([child[1] for child in children], instance_data)
+    if derive is not None:
+        return lambda state, h, children: [derive(state, h, child[0], child[1], instance_data)
+                                           for child in children]
+    return lambda state, h, children: [estimate(child[1], instance_data) for child in children]
+
+def make_open_list(nodes, open_limit=None, spill_dir=None):
+    """
+    Return the open list of a search over a SearchNodeTable: a PriorityQueue,
+    or with open_limit an ExternalPriorityQueue spilling to spill_dir.
+    """
+    if open_limit is None:
+        return PriorityQueue()
+    # Drop the entries that would be skipped as stale when popped
+    return ExternalPriorityQueue(open_limit, spill_dir,
+                                 lambda entry: entry[1] > nodes.g[entry[0]] or nodes.closed[entry[0]])
+
+def astar_search(initial_state, instance_data, max_iterations=10000, time_limit=60, reopen='always',
+                 low_memory=False, weight=1.0, greedy=False, tie_break='fifo', should_stop=None,
+                 stats=None, progress=None, progress_interval=1.0, heuristic_cache=None,
+                 incremental=False, check_incremental=False, batched=False, heuristic_fn=None, prune=False,
+                 macros=False, goal_fn=None, open_limit=None, spill_dir=None):
     """
     Perform A* search to find the optimal plan.
     
+    States are closed once expanded. Entries left in the open list after a
+    cheaper path to their state was queued are skipped when popped (lazy
+    deletion), as are entries for states that are already closed. Generated
+    nodes live in a SearchNodeTable.
+    
     Args:
         initial_state: The starting state
-        instance_data: The problem instance data
-        max_iterations: Maximum number of iterations (default: 10000)
+        instance_data: The compiled ProblemIndex (a raw instance dict is
+            compiled on entry)
+        max_iterations: Maximum number of expansions (default: 10000)
         time_limit: Time limit in seconds (default: 60)
+        reopen: What to do when a cheaper path to a closed state is found:
+            'always' reopens it, 'never' keeps it closed, and 'inconsistent'
+            reopens it only once the heuristic has been seen to be
+            inconsistent on an edge, h(parent) > cost + h(child) (default: 'always')
+        low_memory: Keep states only for expanded nodes and re-derive the
+            states of open nodes when they are popped (default: False)
+        weight: Heuristic weight, priority g + weight * h; above 1 this is
+            weighted A* (default: 1.0)
+        greedy: Order the open list by weight * h alone (greedy best-first)
+            (default: False)
+        tie_break: Order among equal priorities, one of TIE_BREAKS (default: 'fifo')
+        should_stop: Callable polled every iteration; the search gives up
+            when it returns True (default: None)
+        stats: SearchStats filled in when the search ends; with one,
+            generated and duplicate successors, peak open and closed
+            sizes, successors per action type and the time spent in
+            successor generation, the heuristic and the goal test are
+            also tracked (default: None)
+        progress: Callable receiving progress event dicts (see
+            src.search.progress); the search prints nothing itself, pass
+            console_progress for console output (default: None)
+        progress_interval: Minimum seconds between 'progress' events (default: 1.0)
+        heuristic_cache: HeuristicCache to look heuristic values up in, e.g.
+            shared_heuristic_cache(problem) to reuse them across searches of
+            the same problem (default: None)
+        incremental: Derive each successor's heuristic in O(1) from its
+            parent's value and the action (see successor_heuristic) instead
+            of a full evaluation per successor (default: False)
+        check_incremental: With incremental, verify every derived value
+            against a full recompute and raise AssertionError on a
+            mismatch; for debugging (default: False)
+        batched: Evaluate the heuristic of all successors of an expansion
+            in one vectorized batch_heuristic call (requires NumPy)
+            (default: False)
+        heuristic_fn: Callable (state, instance_data) used in place of
+            heuristic, e.g. a PatternDatabase; to cache its values pass
+            HeuristicCache(size, function=heuristic_fn) as heuristic_cache
+            instead (default: None)
+        prune: Skip successors reached as cheaply along another path - moves
+            undoing the last move and actions commuting with the last one
+            out of canonical order (see SuccessorPruner); optimal with a
+            consistent heuristic; not with a symmetric problem (default: False)
+        macros: Also generate RetrieveJig macro actions (see
+            get_macro_actions), each costing its number of primitive steps;
+            the returned plan is expanded into primitive actions
+            (default: False)
+        goal_fn: Callable (state, instance_data) used in place of
+            is_goal_state (default: None)
+        open_limit: Keep at most this many open list entries in memory and
+            spill the rest to sorted run files on disk (see
+            ExternalPriorityQueue); stale entries are dropped as runs are
+            written and merged. Combine with low_memory so that open nodes
+            keep no states either (default: None, all in memory)
+        spill_dir: Directory the run files are created in (default: None,
+            the system temporary directory)
     
     Returns:
         List of actions forming the plan, or None if no plan found
     """
-    print("Starting A* search...")
+    if reopen not in REOPEN_POLICIES:
+        raise ValueError(f"Unknown reopen policy '{reopen}', expected one of {REOPEN_POLICIES}")
+    if incremental + batched + (heuristic_cache is not None) + (heuristic_fn is not None) > 1:
+        raise ValueError("Only one of incremental, batched, heuristic_cache and heuristic_fn can be used")
+    
+    priority = make_priority(weight, greedy, tie_break)
+    
     start_time = time.time()
+    last_report = start_time
+    instance_data = ensure_problem_index(instance_data)
+    if progress is not None:
+        progress({'event': 'start', 'search': 'A*', 'max_iterations': max_iterations, 'time_limit': time_limit})
     
-    # Initialize data structures
-    open_set = PriorityQueue()
-    open_set.put(initial_state, 0)
+    # Search functions, timed when statistics are collected
+    expand = get_all_possible_actions
+    successor = BelugaState.get_next_state
+    estimate = heuristic if heuristic_cache is None else heuristic_cache
+    if heuristic_fn is not None:
+        estimate = heuristic_fn
+    goal_test = is_goal_state if goal_fn is None else goal_fn
+    derive = None
+    if incremental:
+        derive = checked_successor_heuristic if check_incremental else successor_heuristic
+    estimate_all = batch_heuristic if batched else None
+    if prune and instance_data.symmetric:
+        # A node's stored state may be a relabelling of its parent's state
+        # after its action, so the last action says nothing exact about it
+        raise ValueError("Successor pruning cannot be used with a symmetric problem")
+    pruner = SuccessorPruner(instance_data) if prune else None
+    track = stats is not None
+    if heuristic_cache is not None:
+        cache_hits, cache_misses = heuristic_cache.hits, heuristic_cache.misses
+    if track:
+        expand = stats.timed('get_all_possible_actions', expand)
+        successor = stats.timed('get_next_state', successor)
+        estimate = stats.timed('heuristic', estimate)
+        goal_test = stats.timed('is_goal_state', goal_test)
+        if derive is not None:
+            derive = stats.timed('heuristic', derive)
+        if estimate_all is not None:
+            estimate_all = stats.timed('heuristic', estimate_all)
+        branching = stats.branching
+    expander = make_expander(instance_data, expand, macros, pruner)
+    evaluate = make_evaluator(instance_data, estimate, derive, estimate_all)
     
-    came_from = {}  # Maps state -> (previous_state, action)
-    cost_so_far = {initial_state: 0}
+    # Initialize data structures
+    # Open list entries are (node id, g, h) so stale entries can be recognised
+    nodes = SearchNodeTable(low_memory)
+    open_set = make_open_list(nodes, open_limit, spill_dir)
+    initial_h = estimate(initial_state, instance_data)
+    root = nodes.add(initial_state, -1, None, 0)
+    open_set.put((root, 0, initial_h), priority(0, initial_h))
     
     iterations = 0
-    states_explored = 0
+    discarded = 0
+    reopened = 0
+    generated = 0
+    duplicates = 0
+    peak_open = 1
+    peak_closed = 0
+    inconsistent = False
+    
+    def finish(plan, status):
+        if progress is not None:
+            progress({'event': 'finish', 'search': 'A*', 'status': status, 'expansions': iterations,
+                      'discarded': discarded, 'reopened': reopened, 'elapsed': time.time() - start_time})
+        if track:
+            stats.expansions = iterations
+            stats.generated = generated
+            stats.duplicates = duplicates
+            stats.discarded = discarded
+            stats.reopened = reopened
+            stats.peak_open = max(peak_open, len(open_set))
+            stats.peak_closed = peak_closed
+            stats.search_time = time.time() - start_time
+            if pruner is not None:
+                stats.pruned_inverse = pruner.inverse
+                stats.pruned_commuting = pruner.commuting
+            if heuristic_cache is not None:
+                stats.heuristic_hits = heuristic_cache.hits - cache_hits
+                stats.heuristic_misses = heuristic_cache.misses - cache_misses
+            if open_limit is not None:
+                stats.spilled = open_set.spilled
+                stats.spill_dropped = open_set.dropped
+        open_set.close()
+        return plan
     
     # Main A* search loop
     while not open_set.is_empty() and iterations < max_iterations:
-        iterations += 1
-        
         # Check time limit
-        if time.time() - start_time > time_limit:
-            print(f"Time limit of {time_limit} seconds reached. Aborting search.")
-            return None
+        now = time.time()
+        if now - start_time > time_limit:
+            return finish(None, 'time_limit')
+        if should_stop is not None and should_stop():
+            return finish(None, 'stopped')
+        
+        # Get the node with lowest estimated total cost
+        node, current_cost, current_h = open_set.get()
         
-        # Get the state with lowest estimated total cost
-        current_state = open_set.get()
-        states_explored += 1
+        # Skip entries superseded by a cheaper path and already expanded nodes
+        if current_cost > nodes.g[node] or nodes.closed[node]:
+            discarded += 1
+            continue
+        
+        iterations += 1
+        current_state = nodes.state(node)
         
         # Check for goal state
-        if is_goal_state(current_state, instance_data):
-            print(f"Goal reached after {iterations} iterations!")
-            print(f"Total states explored: {states_explored}")
-            print(f"Search time: {time.time() - start_time:.2f} seconds")
-            
+        if goal_test(current_state, instance_data):
             # Reconstruct the plan
-            return reconstruct_plan(came_from, current_state)
+            return finish(reconstruct_plan(nodes, node), 'goal')
+        
+        nodes.close(node, current_state)
+        if track:
+            peak_open = max(peak_open, len(open_set) + 1)
+            peak_closed = max(peak_closed, iterations - reopened)
         
-        # Print progress every 100 iterations
-        if iterations % 100 == 0:
-            progress = check_goal_progress(current_state, instance_data)
-            print(f"Iteration {iterations}: Flights: {progress['flights_progress']}, Parts: {progress['parts_progress']}")
+        # Report progress at most once per progress_interval seconds
+        if progress is not None and now - last_report >= progress_interval:
+            last_report = now
+            goal_progress = check_goal_progress(current_state, instance_data)
+            progress({'event': 'progress', 'search': 'A*', 'expansions': iterations, 'open': len(open_set),
+                      'g': current_cost, 'h': current_h, 'flights_progress': goal_progress['flights_progress'],
+                      'parts_progress': goal_progress['parts_progress'], 'elapsed': now - start_time})
         
-        # Generate all possible actions
-        for action in get_all_possible_actions(current_state, instance_data):
+        # Generate the successors that are new or reached by a cheaper path;
+        # primitive actions cost 1, macros the number of steps they stand for
+        step_cost = current_cost + 1
+        children = []
+        for action in expander(current_state, nodes, node):
             # Get resulting state
-            next_state = current_state.get_next_state(action, instance_data)
+            next_state = successor(current_state, action, instance_data)
             if next_state is None:
                 continue  # Invalid action/state
+            generated += 1
+            if track:
+                branching[type(action).__name__] += 1
+            new_cost = step_cost if type(action) is not RetrieveJig else current_cost + len(action.steps)
             
-            # Calculate cost
-            new_cost = cost_so_far[current_state] + 1  # Uniform cost
+            # Skip unless the state is new or we found a better path
+            next_node = nodes.lookup(next_state)
+            if next_node is not None:
+                duplicates += 1
+                if new_cost >= nodes.g[next_node]:
+                    continue
+            children.append((action, next_state, next_node, new_cost))
+        
+        # Calculate priorities using heuristic
+        values = evaluate(current_state, current_h, children)
+        for (action, next_state, next_node, new_cost), h in zip(children, values):
+            if current_h > new_cost - current_cost + h:
+                inconsistent = True
             
-            # If state is new or we found a better path
-            if next_state not in cost_so_far or new_cost < cost_so_far[next_state]:
-                cost_so_far[next_state] = new_cost
-                # Calculate priority using heuristic
-                priority = new_cost + heuristic(next_state, instance_data)
-                open_set.put(next_state, priority)
-                came_from[next_state] = (current_state, action)
-    
-    # If this prints, search failed
-    print(f"Search failed after {iterations} iterations.")
-    print(f"Total states explored: {states_explored}")
-    print(f"Search time: {time.time() - start_time:.2f} seconds")
-    return None
+            if next_node is None:
+                # Two actions of this expansion can lead to the same new state
+                next_node = nodes.lookup(next_state)
+                if next_node is not None:
+                    duplicates += 1
+                    if new_cost >= nodes.g[next_node]:
+                        continue
+                    nodes.update(next_node, node, action, new_cost)
+                else:
+                    next_node = nodes.add(next_state, node, action, new_cost)
+            else:
+                # A cheaper path to an expanded state
+                if nodes.closed[next_node]:
+                    if reopen == 'never' or (reopen == 'inconsistent' and not inconsistent):
+                        continue
+                    nodes.reopen(next_node)
+                    reopened += 1
+                nodes.update(next_node, node, action, new_cost)
+            
+            open_set.put((next_node, new_cost, h), priority(new_cost, h))
+    
+    # Open list exhausted or iteration budget spent
+    return finish(None, 'failed')
 
-def reconstruct_plan(came_from, goal_state):
+def reconstruct_plan(nodes, goal_node):
     """
-    Reconstruct the plan by working backwards from the goal state.
+    Reconstruct the plan by following parent ids back from the goal node,
+    with macro actions expanded into their primitive steps.
     """
-    actions = []
-    current_state = goal_state
-    
-    while current_state in came_from:
-        previous_state, action = came_from[current_state]
-        actions.append(action)
-        current_state = previous_state
-    
-    # Reverse the list since we worked backwards
-    actions.reverse()
-    return actions
\ No newline at end of file
+    return expand_macros(nodes.plan(goal_node))
\ No newline at end of file
@@ -0,0 +1,108 @@
+import heapq
+import time
+from collections import deque
+from src.search.heuristic import heuristic
+from src.search.goal import is_goal_state
+from src.search.astar import get_all_possible_actions
+from src.core.loader import ensure_problem_index
+
+def beam_search(initial_state, instance_data, beam_width=100, max_depth=1000, time_limit=60,
+                window=2, progress=None):
+    """
+    Perform beam search, keeping the best beam_width states of each depth.
+    
+    Each layer expands every state of the previous one and keeps the
+    beam_width successors with the lowest heuristic value (ties go to the
+    earliest generated). Successors seen earlier in the same layer or kept in
+    one of the last `window` layers are dropped as duplicates. Only the
+    current layer's states are held; earlier layers keep just (parent index,
+    action) pairs for plan reconstruction, so memory is O(beam_width * depth)
+    small tuples plus O(beam_width * window) states. The search is incomplete:
+    a plan can be pruned away.
+    
+    Args:
+        initial_state: The starting state
+        instance_data: The compiled ProblemIndex (a raw instance dict is
+            compiled on entry)
+        beam_width: Number of states kept per layer (default: 100)
+        max_depth: Maximum plan length searched (default: 1000)
+        time_limit: Time limit in seconds (default: 60)
+        window: Number of recent layers checked for duplicates (default: 2)
+        progress: Callable receiving progress event dicts (see
+            src.search.progress), with a 'progress' event every 10 layers;
+            the search prints nothing itself (default: None)
+    
+    Returns:
+        List of actions forming the plan, or None if no plan found
+    """
+    start_time = time.time()
+    instance_data = ensure_problem_index(instance_data)
+    if progress is not None:
+        progress({'event': 'start', 'search': 'Beam', 'beam_width': beam_width})
+    
+    def finish(plan, status, depth):
+        if progress is not None:
+            progress({'event': 'finish', 'search': 'Beam', 'status': status, 'expansions': expansions,
+                      'depth': depth, 'elapsed': time.time() - start_time})
+        return plan
+    
+    expansions = 0
+    if is_goal_state(initial_state, instance_data):
+        return finish([], 'goal', 0)
+    
+    # layers[d][i] is the (parent index, action) of state i at depth d + 1
+    layers = []
+    beam = [initial_state]
+    recent = deque([{initial_state}], maxlen=max(window, 1))
+    
+    for depth in range(1, max_depth + 1):
+        # Check time limit
+        now = time.time()
+        if now - start_time > time_limit:
+            return finish(None, 'time_limit', depth - 1)
+        
+        # Expand the whole beam, dropping duplicates
+        candidates = {}
+        for parent, state in enumerate(beam):
+            expansions += 1
+            for action in get_all_possible_actions(state, instance_data):
+                next_state = state.get_next_state(action, instance_data)
+                if next_state is None or next_state in candidates:
+                    continue
+                if any(next_state in layer for layer in recent):
+                    continue
+                
+                if is_goal_state(next_state, instance_data):
+                    return finish(_reconstruct_beam_plan(layers, parent, action), 'goal', depth)
+                candidates[next_state] = (parent, action)
+        
+        if not candidates:
+            # Beam emptied
+            return finish(None, 'failed', depth)
+        
+        # Keep the best states by heuristic value
+        ranked = [(heuristic(next_state, instance_data), order, next_state)
+                  for order, next_state in enumerate(candidates)]
+        kept = heapq.nsmallest(beam_width, ranked)
+        beam = [next_state for _, _, next_state in kept]
+        layers.append([candidates[next_state] for next_state in beam])
+        recent.append(set(beam))
+        
+        # Report progress every 10 layers
+        if progress is not None and depth % 10 == 0:
+            progress({'event': 'progress', 'search': 'Beam', 'depth': depth, 'candidates': len(candidates),
+                      'best_h': kept[0][0], 'expansions': expansions, 'elapsed': now - start_time})
+    
+    # Maximum depth reached
+    return finish(None, 'failed', max_depth)
+
+def _reconstruct_beam_plan(layers, parent, action):
+    """Follow parent indices back through the layers from a goal's parent."""
+    plan = [action]
+    for layer in reversed(layers):
+        parent, action = layer[parent]
+        plan.append(action)
+    
+    # Reverse the list since we worked backwards
+    plan.reverse()
+    return plan
\ No newline at end of file
@@ -0,0 +1,128 @@
+import time
+from dataclasses import replace
+from src.core.actions import ProcessNextFlight
+from src.core.loader import ensure_problem_index
+from src.core.state import BelugaState
+from src.search.astar import astar_search
+from src.search.goal import is_goal_state
+
+def due_windows(problem):
+    """
+    Return the flight window each scheduled jig is due in, by name.
+    
+    Instances give production an order but no deadlines, so every line's
+    schedule is spread evenly over the windows, one per flight (a single
+    window without flights): slot i of a line of n jigs is due in window
+    i * windows // n. A jig scheduled on several lines is due by its first.
+    """
+    num_windows = max(1, problem.num_flights)
+    due = {}
+    for line in problem.get('production_lines', []):
+        schedule = line.get('schedule', [])
+        for slot, name in enumerate(schedule):
+            due.setdefault(name, slot * num_windows // len(schedule))
+    return due
+
+def window_problem(problem, due, window):
+    """
+    Return the subproblem of one flight window.
+    
+    It is the problem without flights whose schedule keeps only the jigs
+    due by the end of the window, so its goal is that production and
+    ProcessNextFlight is never generated. The Zobrist keys are shared, so
+    states hash alike in every window.
+    """
+    schedule_position = {name: position for name, position in problem.schedule_position.items()
+                         if due[name] <= window}
+    is_scheduled = tuple(name in schedule_position for name in problem.jig_names)
+    scheduled_mask = 0
+    for jig, scheduled in enumerate(is_scheduled):
+        if scheduled:
+            scheduled_mask |= 1 << jig
+    lines = [{**line, 'schedule': [name for name in line.get('schedule', []) if name in schedule_position]}
+             for line in problem.get('production_lines', [])]
+    return replace(problem, data={**problem.data, 'production_lines': lines, 'flights': []},
+                   scheduled_jigs=frozenset(schedule_position), is_scheduled=is_scheduled,
+                   scheduled_mask=scheduled_mask, schedule_position=schedule_position,
+                   flights=[], incoming_counts=(), outgoing_suffix=(0,))
+
+def _in_problem(state, problem):
+    """Return the same state as a state of another problem over the same jigs and racks."""
+    return BelugaState(problem, state.racks, state.loaded, state.beluga, state.factory, state.produced,
+                       state.current_flight_idx, rack_used=state.rack_used)
+
+def decomposed_search(initial_state, instance_data, max_iterations=10000, time_limit=60,
+                      max_alternatives=3, **search_options):
+    """
+    Solve the problem one flight window at a time and stitch the plans.
+    
+    Window i covers flight i: an A* search from the state the previous
+    window ended in produces every jig due by the window (see due_windows
+    and window_problem), then the flight is processed. Each search only
+    spans one window's production, so the work grows about linearly with
+    the number of flights instead of with the whole horizon.
+    
+    When a window has no plan from the state it starts in, the solver
+    backtracks: the previous window is searched again for a different end
+    state, up to max_alternatives end states per window and start state,
+    and backtracking continues further back once those run out. A window
+    search that does not finish within its budget counts as infeasible.
+    
+    Args:
+        initial_state: The starting state
+        instance_data: The compiled ProblemIndex (a raw instance dict is
+            compiled on entry)
+        max_iterations: Maximum number of expansions of each window search
+            (default: 10000)
+        time_limit: Time limit in seconds for the whole search (default: 60)
+        max_alternatives: End states tried per window before backtracking
+            into the previous one (default: 3)
+        **search_options: Passed on to astar_search, e.g. weight, prune or
+            macros; heuristic_fn is problem specific and cannot be used
+    
+    Returns:
+        List of actions forming the plan, or None if no plan found
+    """
+    start_time = time.time()
+    problem = ensure_problem_index(instance_data)
+    due = due_windows(problem)
+    num_windows = max(1, problem.num_flights)
+    windows = [window_problem(problem, due, window) for window in range(num_windows)]
+    
+    # (plan, state after it) of each window solved so far, and the end
+    # states already tried in each window from its current start state
+    solved = []
+    tried = [set() for _ in range(num_windows)]
+    
+    while len(solved) < num_windows:
+        window = len(solved)
+        start = solved[-1][1] if solved else initial_state
+        remaining = time_limit - (time.time() - start_time)
+        if remaining <= 0:
+            return None
+        
+        plan = None
+        if len(tried[window]) < max_alternatives:
+            ends = tried[window]
+            subproblem = windows[window]
+            plan = astar_search(_in_problem(start, subproblem), subproblem, max_iterations, remaining,
+                                goal_fn=lambda state, instance: is_goal_state(state, instance) and state not in ends,
+                                **search_options)
+        if plan is None:
+            # Backtrack into the previous window for another end state
+            if not solved:
+                return None
+            tried[window] = set()
+            solved.pop()
+            continue
+        
+        state = start
+        for action in plan:
+            state = state.get_next_state(action, problem)
+        tried[window].add(_in_problem(state, windows[window]))
+        if window < problem.num_flights:
+            plan = plan + [ProcessNextFlight()]
+            state = state.get_next_state(plan[-1], problem)
+        solved.append((plan, state))
+    
+    return [action for plan, _ in solved for action in plan]
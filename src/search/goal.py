@@ -1,3 +1,5 @@
+from src.core.loader import ensure_problem_index
+
 def is_goal_state(state, instance_data):
     """
     Check if the state satisfies all goal conditions:
@@ -5,20 +7,16 @@ def is_goal_state(state, instance_data):
     2. All parts in production schedule are sent to production
     3. All required empty jigs are loaded to Beluga
     """
+    problem = ensure_problem_index(instance_data)
+    
     # 1. Check if all flights have been processed
-    if state.current_flight_idx < len(instance_data.get('flights', [])):
+    if state.current_flight_idx < problem.num_flights:
         return False  # Still have flights to process
     
     # 2. Check if all parts in production schedule have been produced
-    production_schedule = []
-    for line in instance_data.get('production_lines', []):
-        production_schedule.extend(line.get('schedule', []))
-    
-    for jig_id in production_schedule:
-        loaded, part_id = state.jig_status.get(jig_id, (False, ""))
-        if loaded and part_id:  # If jig is still loaded, part hasn't been produced
-            if part_id not in state.produced_parts:
-                return False
+    # (a scheduled jig that is still loaded has not been produced)
+    if state.loaded & problem.scheduled_mask & ~state.produced:
+        return False
     
     # 3. Check if all outgoing jigs have been loaded to Beluga
     # Currently just processing flights in order
@@ -32,22 +30,15 @@ def check_goal_progress(state, instance_data):
     Check progress towards the goal for debugging and reporting.
     Returns a dictionary with progress metrics.
     """
+    problem = ensure_problem_index(instance_data)
+    
     # Get total flights
-    total_flights = len(instance_data.get('flights', []))
+    total_flights = problem.num_flights
     flights_processed = state.current_flight_idx
     
-    # Get production schedule
-    production_schedule = []
-    for line in instance_data.get('production_lines', []):
-        production_schedule.extend(line.get('schedule', []))
-    
     # Count parts produced
-    parts_produced = len(state.produced_parts)
-    total_parts = 0
-    for jig_id in production_schedule:
-        loaded, part_id = state.jig_status.get(jig_id, (False, ""))
-        if loaded and part_id:
-            total_parts += 1
+    parts_produced = state.produced.bit_count()
+    total_parts = (state.loaded & problem.scheduled_mask).bit_count()
     
     # Count outgoing jigs loaded
     # Need to track which specific jigs were loaded
@@ -103,7 +94,7 @@ def check_flight_requirements(state, instance_data):
         "incoming_total": incoming_total,
         "outgoing_processed": outgoing_processed,
         "outgoing_total": outgoing_total,
-        "all_met": (incoming_processed == incoming_total and 
+        "all_met": (incoming_processed == incoming_total and
                    outgoing_processed == outgoing_total)
     }
 
@@ -114,21 +105,12 @@ def check_production_requirements(state, instance_data):
     Returns:
         dict: Information about production requirements status
     """
-    # Collect production schedule
-    production_schedule = []
-    for line in instance_data.get('production_lines', []):
-        production_schedule.extend(line.get('schedule', []))
-    
-    total_parts = 0
-    produced_parts = 0
+    problem = ensure_problem_index(instance_data)
     
     # Count parts in schedule and how many have been produced
-    for jig_id in production_schedule:
-        loaded, part_id = state.jig_status.get(jig_id, (False, ""))
-        if loaded and part_id:
-            total_parts += 1
-            if part_id in state.produced_parts:
-                produced_parts += 1
+    scheduled_loaded = state.loaded & problem.scheduled_mask
+    total_parts = scheduled_loaded.bit_count()
+    produced_parts = (scheduled_loaded & state.produced).bit_count()
     
     return {
         "produced_parts": produced_parts,
@@ -153,8 +135,8 @@ def detailed_goal_check(state, instance_data):
     flights_processed = state.current_flight_idx == len(instance_data.get('flights', []))
     
     # Overall goal status
-    goal_reached = (flight_status["all_met"] and 
-                    production_status["all_met"] and 
+    goal_reached = (flight_status["all_met"] and
+                    production_status["all_met"] and
                     flights_processed)
     
     return {
@@ -0,0 +1,323 @@
+import heapq
+import multiprocessing
+import queue
+import threading
+import time
+from src.core.state import BelugaState, concrete_plan
+from src.core.loader import ensure_problem_index
+from src.search.heuristic import heuristic
+from src.search.goal import is_goal_state
+from src.search.nodes import SearchNodeTable
+from src.search.astar import get_all_possible_actions
+from src.search.stats import SearchStats
+
+# Incumbent plan cost while no plan has been found
+NO_PLAN = 1 << 62
+
+def _hda_worker(worker, workers, problem, inboxes, replies, active, incumbent, goal_node,
+                expansions, stop, batch_size, max_iterations, deadline, timers, heuristic_fn):
+    """
+    Run one HDA* worker: a local A* over the states this worker owns.
+    
+    Successors owned by other workers are buffered per owner and sent as a
+    batch after every batch_size expansions. Node ids are global: local id *
+    workers + worker, so a parent can live in another worker's table.
+    
+    Termination uses credits kept in `active`: a worker holds one while it
+    has work, and every batch in flight holds one. A receiver that is busy
+    returns the batch's credit; an idle one keeps it and becomes busy. A
+    worker out of work flushes its buffers before returning its credit, so
+    `active` reaches 0 exactly when no worker has work and no batch is in
+    flight. The worker's SearchStats is sent back with its expansion count.
+    States are estimated with heuristic_fn, or heuristic when it is None.
+    """
+    inbox = inboxes[worker]
+    nodes = SearchNodeTable()
+    open_set = []
+    entry_count = 0
+    buffers = [[] for _ in range(workers)]
+    busy = True
+    best = NO_PLAN
+    expanded = 0
+    requests = []
+    
+    # Counters and, with timers, per-call times of this worker
+    worker_stats = SearchStats(timers=timers)
+    expand = worker_stats.timed('get_all_possible_actions', get_all_possible_actions)
+    successor = worker_stats.timed('get_next_state', BelugaState.get_next_state)
+    estimate = worker_stats.timed('heuristic', heuristic if heuristic_fn is None else heuristic_fn)
+    goal_test = worker_stats.timed('is_goal_state', is_goal_state)
+    branching = worker_stats.branching
+    
+    def insert(state, g, parent, action):
+        nonlocal entry_count
+        node = nodes.lookup(state)
+        if node is not None:
+            worker_stats.duplicates += 1
+            if g >= nodes.g[node]:
+                return
+        h = estimate(state, problem)
+        if g + h >= best:
+            return  # Cannot lead to a cheaper plan
+        
+        if node is None:
+            node = nodes.add(state, parent, action, g)
+        else:
+            if nodes.closed[node]:
+                nodes.reopen(node)
+                worker_stats.reopened += 1
+            nodes.update(node, parent, action, g)
+        heapq.heappush(open_set, (g + h, entry_count, node, g))
+        entry_count += 1
+    
+    def receive(message):
+        nonlocal busy
+        if message[0] != 'states':
+            # Sent only once the search has ended - answered below
+            requests.append(message)
+            return
+        for packed, g, parent, action in message[1]:
+            insert(BelugaState.unpack(problem, packed), g, parent, action)
+        if busy:
+            with active.get_lock():
+                active.value -= 1
+        else:
+            busy = True
+    
+    def flush():
+        for owner, batch in enumerate(buffers):
+            if batch:
+                with active.get_lock():
+                    active.value += 1
+                inboxes[owner].put(('states', batch))
+                buffers[owner] = []
+    
+    # Search until every worker is out of work or the search is stopped
+    while not stop.is_set() and not requests:
+        while True:
+            try:
+                receive(inbox.get_nowait())
+            except queue.Empty:
+                break
+        
+        best = incumbent.value
+        round_expansions = 0
+        while open_set and round_expansions < batch_size:
+            f, _, node, g = heapq.heappop(open_set)
+            
+            # Skip stale entries and already expanded nodes
+            if g > nodes.g[node] or nodes.closed[node]:
+                worker_stats.discarded += 1
+                continue
+            
+            # Nothing left here can beat the incumbent
+            if f >= best:
+                open_set.clear()
+                break
+            
+            round_expansions += 1
+            state = nodes.state(node)
+            nodes.close(node, state)
+            global_node = node * workers + worker
+            
+            if goal_test(state, problem):
+                with incumbent.get_lock():
+                    if g < incumbent.value:
+                        incumbent.value = g
+                        goal_node.value = global_node
+                    best = incumbent.value
+                continue
+            
+            for action in expand(state, problem):
+                next_state = successor(state, action, problem)
+                if next_state is None:
+                    continue
+                worker_stats.generated += 1
+                branching[type(action).__name__] += 1
+                owner = hash(next_state) % workers
+                if owner == worker:
+                    insert(next_state, g + 1, global_node, action)
+                else:
+                    buffers[owner].append((next_state.pack(), g + 1, global_node, action))
+        
+        flush()
+        expanded += round_expansions
+        if round_expansions:
+            with expansions.get_lock():
+                expansions.value += round_expansions
+                if expansions.value >= max_iterations:
+                    stop.set()
+        if time.time() > deadline:
+            stop.set()
+        
+        if not open_set:
+            if busy:
+                busy = False
+                with active.get_lock():
+                    active.value -= 1
+            if active.value == 0:
+                break
+            try:
+                receive(inbox.get(timeout=0.01))
+            except queue.Empty:
+                pass
+    
+    def report():
+        for other in inboxes:
+            if other is not inbox:
+                other.close()
+                other.join_thread()
+        worker_stats.expansions = expanded
+        replies.put(('expanded', worker, worker_stats))
+    
+    # Answer plan tracing requests; batches still arriving after a stop are dropped
+    while True:
+        message = requests.pop(0) if requests else inbox.get()
+        if message[0] == 'trace':
+            node = message[1]
+            code = nodes.action[node]
+            replies.put((nodes.parent[node], nodes.actions.decode(code) if code >= 0 else None,
+                         nodes.state(node).pack()))
+        elif message[0] == 'exit':
+            # Report only once every batch sent has been written out, so no
+            # worker leaves while others may still write to its inbox; the
+            # inbox keeps being read meanwhile so their writes can finish
+            threading.Thread(target=report).start()
+        elif message[0] == 'close':
+            return
+
+def hda_search(initial_state, instance_data, workers=4, max_iterations=10000, time_limit=60,
+               batch_size=16, stats=None, progress=None, heuristic_fn=None):
+    """
+    Perform hash-distributed A* (HDA*) search across worker processes.
+    
+    Every state is owned by the worker given by its Zobrist hash modulo the
+    number of workers. Each worker keeps its own open and closed lists and
+    expands only states it owns; successors owned by another worker are sent
+    to it in batches, as compact tuples (BelugaState.pack) without the
+    problem. When a worker expands a goal it becomes the incumbent if it is
+    cheaper, and workers drop nodes whose f = g + h is not below the
+    incumbent's cost. The search ends when no worker has work left and no
+    batch is in flight, at which point no open node can lead to a cheaper
+    plan. The plan is then traced back through the owners of each node.
+    
+    The plan is optimal only with an admissible heuristic_fn such as a
+    PatternDatabase. The default heuristic can overestimate, so with it the
+    plan may be longer than the optimum, as with astar_search. When the
+    budget or time limit stops the search, the cheapest plan found so far
+    is returned with the status 'stopped'.
+    
+    Args:
+        initial_state: The starting state
+        instance_data: The compiled ProblemIndex (a raw instance dict is
+            compiled on entry)
+        workers: Number of worker processes (default: 4)
+        max_iterations: Maximum number of expansions over all workers (default: 10000)
+        time_limit: Time limit in seconds (default: 60)
+        batch_size: Expansions between flushes of outgoing batches (default: 16)
+        stats: SearchStats filled in when the search ends, as by
+            astar_search: expansions, generated, duplicates, discarded and
+            reopened summed over the workers, successors per action type,
+            per_worker expansions and the search time; the function times
+            are summed over the workers, so they can exceed the search time
+            (default: None)
+        progress: Callable receiving progress event dicts (see
+            src.search.progress), with a 'progress' event about once per
+            second; the search prints nothing itself (default: None)
+        heuristic_fn: Callable (state, instance_data) used in place of
+            heuristic, e.g. a PatternDatabase; it is sent to every worker
+            (default: None)
+    
+    Returns:
+        Tuple of (plan, status): the list of actions forming the best plan
+        found, or None, and 'goal' when the search ran to completion with a
+        plan, 'stopped' when the budget or time limit ended it, or 'failed'
+        when it ran to completion without one
+    """
+    start_time = time.time()
+    problem = ensure_problem_index(instance_data)
+    if progress is not None:
+        progress({'event': 'start', 'search': 'HDA*', 'workers': workers})
+    
+    # Shared search state; `active` starts with one credit per worker and
+    # one for the batch holding the initial state. The shared values are
+    # 64-bit ('q'): a C long is 32 bits on Windows and NO_PLAN needs 63
+    inboxes = [multiprocessing.Queue() for _ in range(workers)]
+    replies = multiprocessing.Queue()
+    active = multiprocessing.Value('q', workers + 1)
+    incumbent = multiprocessing.Value('q', NO_PLAN)
+    goal_node = multiprocessing.Value('q', -1)
+    expansions = multiprocessing.Value('q', 0)
+    stop = multiprocessing.Event()
+    deadline = start_time + time_limit
+    
+    processes = [multiprocessing.Process(
+        target=_hda_worker,
+        args=(worker, workers, problem, inboxes, replies, active, incumbent, goal_node,
+              expansions, stop, batch_size, max_iterations, deadline, stats is not None and stats.timers,
+              heuristic_fn),
+        daemon=True
+    ) for worker in range(workers)]
+    for process in processes:
+        process.start()
+    inboxes[hash(initial_state) % workers].put(('states', [(initial_state.pack(), 0, -1, None)]))
+    
+    # Wait for termination, the iteration budget or the time limit
+    last_report = start_time
+    while active.value > 0 and not stop.is_set():
+        time.sleep(0.01)
+        if progress is not None and time.time() - last_report >= 1:
+            last_report = time.time()
+            progress({'event': 'progress', 'search': 'HDA*', 'expansions': expansions.value,
+                      'elapsed': last_report - start_time})
+    stopped = stop.is_set()
+    stop.set()
+    
+    # The budget or time limit may stop the search before the incumbent is
+    # proven the cheapest plan; it is still returned
+    plan = None
+    status = 'stopped' if stopped else 'failed'
+    if goal_node.value >= 0:
+        if not stopped:
+            status = 'goal'
+        
+        # Trace the plan back through the workers owning each node, with the
+        # state each node holds (actions are generated from their parent's)
+        plan = []
+        states = []
+        global_node = goal_node.value
+        while global_node != -1:
+            inboxes[global_node % workers].put(('trace', global_node // workers))
+            global_node, action, packed = replies.get()
+            states.append(packed)
+            if action is not None:
+                plan.append(action)
+        plan.reverse()
+        if problem.symmetric:
+            sources = [BelugaState.unpack(problem, packed) for packed in reversed(states[1:])]
+            plan = concrete_plan(initial_state, list(zip(sources, plan)))
+    
+    # Shut the workers down
+    per_worker = [0] * workers
+    worker_stats = []
+    for inbox in inboxes:
+        inbox.put(('exit',))
+    for _ in range(workers):
+        _, worker, counters = replies.get()
+        per_worker[worker] = counters.expansions
+        worker_stats.append(counters)
+    for inbox in inboxes:
+        inbox.put(('close',))
+    for process in processes:
+        process.join()
+    
+    if progress is not None:
+        progress({'event': 'finish', 'search': 'HDA*', 'status': status, 'expansions': sum(per_worker),
+                  'per_worker': per_worker, 'cost': len(plan) if plan is not None else None,
+                  'elapsed': time.time() - start_time})
+    if stats is not None:
+        for counters in worker_stats:
+            stats.add(counters)
+        stats.per_worker = per_worker
+        stats.search_time = time.time() - start_time
+    return plan, status
\ No newline at end of file
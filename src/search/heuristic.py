@@ -1,45 +1,35 @@
+from src.core.loader import ensure_problem_index
+from src.core.actions import LoadJigToBeluga, UnloadJigFromBeluga, SendJigToProduction, ReturnEmptyJigFromFactory, ProcessNextFlight, RetrieveJig
+
 def heuristic(state, instance_data):
     """
     Calculate a heuristic estimate of steps needed to reach the goal.
     This is an admissible heuristic for the A* search.
     """
+    problem = ensure_problem_index(instance_data)
+    
     # Count how many steps needed at minimum to reach the goal
     cost = 0
     
     # Get flights and production schedule info
-    flights = instance_data.get('flights', [])
-    flights_remaining = max(0, len(flights) - state.current_flight_idx - 1)
-    
-    # Collect production schedule
-    production_schedule = []
-    for line in instance_data.get('production_lines', []):
-        production_schedule.extend(line.get('schedule', []))
+    num_flights = problem.num_flights
+    flights_remaining = max(0, num_flights - state.current_flight_idx - 1)
     
     # 1. Estimate cost for unloading incoming jigs from current flight
-    if state.current_flight_idx < len(flights):
-        current_flight = flights[state.current_flight_idx]
-        incoming_jigs = current_flight.get('incoming', [])
+    if state.current_flight_idx < num_flights:
         # Each incoming jig needs to be unloaded (1 action)
-        cost += len(incoming_jigs)
+        cost += problem.incoming_counts[state.current_flight_idx]
     
     # 2. Estimate cost for required production
-    parts_to_produce = []
-    for jig_id in production_schedule:
-        # Only count parts that haven't been produced yet
-        loaded, part_id = state.jig_status.get(jig_id, (False, ""))
-        if loaded and part_id and part_id not in state.produced_parts:
-            parts_to_produce.append(part_id)
+    # Only count scheduled parts that are still loaded and not produced yet
+    parts_to_produce = (state.loaded & problem.scheduled_mask & ~state.produced).bit_count()
     
     # Each part needs at least 1 step to send to production
-    cost += len(parts_to_produce)
+    cost += parts_to_produce
     
     # 3. Estimate cost for loading outgoing jigs to remaining flights
-    total_outgoing_jigs = 0
-    for i in range(state.current_flight_idx, len(flights)):
-        total_outgoing_jigs += len(flights[i].get('outgoing', []))
-    
     # Each outgoing jig requires at least 1 step to load
-    cost += total_outgoing_jigs
+    cost += problem.outgoing_suffix[min(state.current_flight_idx, num_flights)]
     
     # 4. Estimate for remaining flight processing
     cost += flights_remaining
@@ -47,13 +37,81 @@ def heuristic(state, instance_data):
     # 5. Add estimate for jig swaps needed (very simplified)
     # For each part in the production schedule that's blocked by another jig
     # adding a cost of 2 (1 for the swap, 1 for the move to production)
+    is_scheduled = problem.is_scheduled
     blocked_jigs_estimate = 0
-    for rack_id, jigs in state.rack_jigs.items():
-        for i, jig_id in enumerate(jigs):
-            # If jig is not at an edge and it's in the production schedule
-            if i > 0 and i < len(jigs) - 1 and jig_id in production_schedule:
+    for jigs in state.racks:
+        # Jigs that are not at an edge and are in the production schedule
+        for jig in jigs[1:-1]:
+            if is_scheduled[jig]:
                 blocked_jigs_estimate += 2
     
     cost += blocked_jigs_estimate
     
-    return cost
\ No newline at end of file
+    return cost
+
+def flight_cost(problem, flight_idx):
+    """Heuristic terms that depend only on the flight index (parts 1, 3 and 4 of heuristic)."""
+    num_flights = problem.num_flights
+    cost = problem.outgoing_suffix[min(flight_idx, num_flights)] + max(0, num_flights - flight_idx - 1)
+    if flight_idx < num_flights:
+        cost += problem.incoming_counts[flight_idx]
+    return cost
+
+def _edge_scheduled(is_scheduled, jigs):
+    """Number of scheduled jigs at the edges of a rack."""
+    if not jigs:
+        return 0
+    if len(jigs) == 1:
+        return is_scheduled[jigs[0]]
+    return is_scheduled[jigs[0]] + is_scheduled[jigs[-1]]
+
+def successor_heuristic(parent, parent_h, action, child, problem):
+    """
+    Compute heuristic(child) from heuristic(parent) and the action in O(1).
+    
+    An action changes at most the flight index, one jig's loading status
+    and the contents of up to two racks. A rack's blocked jigs are its
+    scheduled jigs minus those at its edges, so when a jig is taken from or
+    put on a rack the blocked count changes by the scheduled edge jigs
+    before, minus those after, plus or minus the jig itself; no rack is
+    rescanned. The flight terms come from ProblemIndex tables (remaining
+    outgoing totals are outgoing_suffix). A macro action spans several
+    racks and is evaluated in full.
+    """
+    kind = type(action)
+    if kind is RetrieveJig:
+        return heuristic(child, problem)
+    if kind is ProcessNextFlight:
+        return (parent_h - flight_cost(problem, parent.current_flight_idx)
+                + flight_cost(problem, child.current_flight_idx))
+    
+    is_scheduled = problem.is_scheduled
+    rack_ids = problem.rack_ids
+    jig = problem.jig_ids[action.jig_id]
+    scheduled = is_scheduled[jig]
+    h = parent_h
+    
+    # Blocked jigs on the racks the action took the jig from and put it on
+    if kind is not UnloadJigFromBeluga and kind is not ReturnEmptyJigFromFactory:
+        rack = rack_ids[action.from_rack_id]
+        h += 2 * (_edge_scheduled(is_scheduled, parent.racks[rack]) - scheduled
+                  - _edge_scheduled(is_scheduled, child.racks[rack]))
+    if kind is not LoadJigToBeluga and kind is not SendJigToProduction:
+        rack = rack_ids[action.to_rack_id]
+        h += 2 * (_edge_scheduled(is_scheduled, parent.racks[rack]) + scheduled
+                  - _edge_scheduled(is_scheduled, child.racks[rack]))
+    
+    # Parts still to produce - only production changes a jig's status
+    if kind is SendJigToProduction and scheduled:
+        bit = 1 << jig
+        h += (bool(child.loaded & bit and not child.produced & bit)
+              - bool(parent.loaded & bit and not parent.produced & bit))
+    return h
+
+def checked_successor_heuristic(parent, parent_h, action, child, problem):
+    """successor_heuristic, verified against a full heuristic recompute (for debugging)."""
+    h = successor_heuristic(parent, parent_h, action, child, problem)
+    expected = heuristic(child, problem)
+    if h != expected:
+        raise AssertionError(f"Incremental heuristic {h} differs from full recompute {expected} after {action}")
+    return h
\ No newline at end of file
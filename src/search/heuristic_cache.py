@@ -0,0 +1,90 @@
+import weakref
+from collections import OrderedDict
+from src.core.state import BelugaState
+from src.search.heuristic import heuristic
+
+# Default number of cached heuristic values
+DEFAULT_CACHE_SIZE = 1 << 16
+
+class HeuristicCache:
+    """
+    Bounded LRU memo of heuristic values, called like the heuristic itself.
+    
+    Entries are keyed by the state's Zobrist hash and hold the state's key
+    (BelugaState.key, which does not reference the problem) with its value,
+    so a hit is only taken when the stored state equals the one asked for;
+    a hash collision counts as a miss and replaces the entry.
+    Beyond max_size entries the least recently used one is evicted. A cache
+    must only ever be used with one problem: states hash and score
+    differently across instances (see shared_heuristic_cache).
+    """
+    
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE, function=heuristic):
+        if max_size < 1:
+            raise ValueError(f"Heuristic cache size must be positive, got {max_size}")
+        self.max_size = max_size
+        self.function = function
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.evictions = 0
+        
+        # State hash -> (state key, heuristic value), least recently used first
+        self._entries = OrderedDict()
+    
+    def __call__(self, state, instance_data):
+        entries = self._entries
+        key = hash(state)
+        identity = state.key if isinstance(state, BelugaState) else state
+        entry = entries.get(key)
+        if entry is not None:
+            if entry[0] == identity:
+                self.hits += 1
+                entries.move_to_end(key)
+                return entry[1]
+            self.collisions += 1
+        
+        self.misses += 1
+        value = self.function(state, instance_data)
+        entries[key] = (identity, value)
+        entries.move_to_end(key)
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return value
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def clear(self):
+        """Drop every entry; the counters are kept."""
+        self._entries.clear()
+    
+    def counters(self):
+        """Return the hit, miss, collision and eviction counts, size and hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+# Shared caches by id of their ProblemIndex, dropped when it is garbage collected.
+# Their entries hold no states, so they do not keep the problem alive
+_shared_caches = {}
+
+def shared_heuristic_cache(problem, max_size=DEFAULT_CACHE_SIZE):
+    """
+    Return the heuristic cache shared by every search of `problem` in this process.
+    
+    It is created with max_size on first use; later calls return the same
+    cache whatever size they ask for. Worker processes get their own.
+    """
+    cache = _shared_caches.get(id(problem))
+    if cache is None:
+        cache = _shared_caches[id(problem)] = HeuristicCache(max_size)
+        weakref.finalize(problem, _shared_caches.pop, id(problem), None)
+    return cache
\ No newline at end of file
@@ -0,0 +1,140 @@
+import time
+from src.search.heuristic import heuristic
+from src.search.goal import is_goal_state
+from src.search.astar import get_all_possible_actions
+from src.core.loader import ensure_problem_index
+
+# Generated children between time limit and should_stop checks
+CHECK_INTERVAL = 1024
+
+def ida_search(initial_state, instance_data, max_iterations=100000, time_limit=60, transposition_size=0,
+               heuristic_fn=None, should_stop=None, stats=None):
+    """
+    Perform iterative-deepening A* (IDA*) search.
+    
+    Each iteration is a depth-first search that prunes children whose
+    f = g + h exceeds the bound; the next bound is the smallest f pruned.
+    The search walks a single working copy of the initial state, applying
+    each action in place and undoing it on the way back (see
+    BelugaState.apply), so memory holds the current path, its action lists
+    and the optional transposition table, however long the search runs.
+    States already on the current path are skipped.
+    
+    The transposition table maps state hashes to the smallest g they were
+    reached with during the current iteration; a state reached again at no
+    smaller g is skipped. It is cleared every iteration and holds at most
+    transposition_size entries - once full, only states already in it are
+    updated. As in low-memory A*, states are told apart by hash alone.
+    
+    Args:
+        initial_state: The starting state
+        instance_data: The compiled ProblemIndex (a raw instance dict is
+            compiled on entry)
+        max_iterations: Maximum number of expansions over all iterations
+            (default: 100000)
+        time_limit: Time limit in seconds (default: 60)
+        transposition_size: Maximum entries of the transposition table, 0
+            for none (default: 0)
+        heuristic_fn: Callable (state, instance_data) used in place of
+            heuristic, e.g. a PatternDatabase (default: None)
+        should_stop: Callable polled with the time limit; the search gives
+            up when it returns True (default: None)
+        stats: SearchStats receiving the expansions, generated children,
+            transposition hits (as duplicates) and search time (default: None)
+    
+    Returns:
+        List of actions forming the plan, or None if no plan found
+    """
+    start_time = time.time()
+    instance_data = ensure_problem_index(instance_data)
+    estimate = heuristic if heuristic_fn is None else heuristic_fn
+    state = initial_state.mutable_copy()
+    bound = estimate(state, instance_data)
+    
+    expansions = 0
+    generated = 0
+    duplicates = 0
+    
+    def finish(plan):
+        if stats is not None:
+            stats.expansions = expansions
+            stats.generated = generated
+            stats.duplicates = duplicates
+            stats.search_time = time.time() - start_time
+        return plan
+    
+    if is_goal_state(state, instance_data):
+        return finish([])
+    
+    while bound != float('inf'):
+        table = {} if transposition_size else None
+        next_bound = float('inf')
+        
+        # Current path: actions taken, undo records and state hashes, and
+        # per depth the actions still to try
+        plan = []
+        records = []
+        hashes = [hash(state)]
+        on_path = {hashes[0]}
+        pending = [iter(get_all_possible_actions(state, instance_data))]
+        expansions += 1
+        
+        while pending:
+            action = next(pending[-1], None)
+            if action is None:
+                # Depth exhausted - back up to the parent
+                pending.pop()
+                if records:
+                    state.undo(records.pop())
+                    on_path.discard(hashes.pop())
+                    plan.pop()
+                continue
+            
+            record = state.apply(action)
+            if record is None:
+                continue
+            generated += 1
+            if generated % CHECK_INTERVAL == 0:
+                if (time.time() - start_time > time_limit
+                        or (should_stop is not None and should_stop())):
+                    state.undo(record)
+                    return finish(None)
+            
+            # Skip cycles and states already reached as cheaply this iteration
+            key = hash(state)
+            g = len(plan) + 1
+            if key in on_path:
+                state.undo(record)
+                continue
+            if table is not None:
+                seen = table.get(key)
+                if seen is not None and seen <= g:
+                    duplicates += 1
+                    state.undo(record)
+                    continue
+                if seen is not None or len(table) < transposition_size:
+                    table[key] = g
+            
+            f = g + estimate(state, instance_data)
+            if f > bound:
+                next_bound = min(next_bound, f)
+                state.undo(record)
+                continue
+            
+            plan.append(action)
+            if is_goal_state(state, instance_data):
+                return finish(plan)
+            if expansions >= max_iterations:
+                return finish(None)
+            
+            # Descend into the child
+            expansions += 1
+            records.append(record)
+            hashes.append(key)
+            on_path.add(key)
+            pending.append(iter(get_all_possible_actions(state, instance_data)))
+        
+        bound = next_bound
+    
+    # Every branch was cut by a cycle or is a dead end
+    return finish(None)
@@ -0,0 +1,41 @@
+from src.core.actions import MoveJigBetweenRacks, SendJigToProduction, RetrieveJig
+from src.core.loader import ensure_problem_index
+
+def get_macro_actions(state, instance_data):
+    """
+    Generate RetrieveJig macros for the blocked jigs of the current state.
+    
+    On every rack, the scheduled loaded jig nearest the factory-side edge
+    is retrieved when it is not at that edge already: the jigs in front of
+    it are moved, front first, onto the back of one other rack, then it is
+    sent to production. A macro is generated for each other rack with room
+    for all of the blocking jigs at once. Jigs deeper in the rack are
+    behind this one, so they are left to later macros.
+    """
+    instance_data = ensure_problem_index(instance_data)
+    jig_names = instance_data.jig_names
+    rack_names = instance_data.rack_names
+    is_scheduled = instance_data.is_scheduled
+    num_racks = len(state.racks)
+    free_space = [state.free_space(rack) for rack in range(num_racks)]
+    macros = []
+    
+    for from_rack, jigs in enumerate(state.racks):
+        # Position of the first scheduled loaded jig from the factory side
+        depth = next((position for position, jig in enumerate(jigs)
+                      if is_scheduled[jig] and state.loaded >> jig & 1), 0)
+        if not depth:
+            continue
+        
+        blockers = jigs[:depth]
+        space = sum(state.jig_size(jig) for jig in blockers)
+        target = jig_names[jigs[depth]]
+        for via_rack in range(num_racks):
+            if via_rack == from_rack or space > free_space[via_rack]:
+                continue
+            steps = tuple(MoveJigBetweenRacks(jig_names[jig], rack_names[from_rack], rack_names[via_rack])
+                          for jig in blockers)
+            steps += (SendJigToProduction(target, rack_names[from_rack]),)
+            macros.append(RetrieveJig(target, rack_names[from_rack], rack_names[via_rack], steps))
+    
+    return macros
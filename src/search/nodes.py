@@ -0,0 +1,140 @@
+from array import array
+from src.core.actions import primitive_steps
+from src.core.state import concrete_plan
+
+class ActionCodec:
+    """Interns action objects as small integer codes."""
+    
+    def __init__(self):
+        self._codes = {}
+        self._actions = []
+    
+    def encode(self, action):
+        code = self._codes.get(action)
+        if code is None:
+            code = len(self._actions)
+            self._codes[action] = code
+            self._actions.append(action)
+        return code
+    
+    def decode(self, code):
+        return self._actions[code]
+
+class SearchNodeTable:
+    """
+    Array-based store of the nodes generated by a search.
+    
+    Each node id indexes parallel arrays holding the parent node id (-1 for
+    the root), the code of the action that generated it, its g-value, its
+    state hash and whether it is closed. The plan to any node is read by
+    following parent ids.
+    
+    By default every node's state is kept, and duplicate detection compares
+    states exactly. In low-memory mode only the root and the states of closed
+    (expanded) nodes are kept. The open frontier, which holds most of the
+    nodes of a search, keeps no states: a node's state is re-derived when it
+    is needed by replaying actions from the nearest ancestor whose state is
+    stored - its parent, once that has been expanded. Duplicate detection
+    then goes by the 64-bit state hash alone, so two distinct states with
+    equal hashes would be merged; with Zobrist keys this is vanishingly
+    unlikely at the sizes a search reaches.
+    """
+    
+    def __init__(self, low_memory=False):
+        self.low_memory = low_memory
+        self.parent = array('l')
+        self.action = array('l')
+        self.g = array('l')
+        self.hash = array('q')
+        self.closed = bytearray()
+        self.actions = ActionCodec()
+        
+        # Node lookup - state -> node id, or state hash -> node id in
+        # low-memory mode
+        self._index = {}
+        
+        # Stored states, indexed by node id - None for dropped states in
+        # low-memory mode
+        self._states = []
+    
+    def __len__(self):
+        return len(self.g)
+    
+    def add(self, state, parent, action, g):
+        """Add a new open node and return its id."""
+        node = len(self.g)
+        self.parent.append(parent)
+        self.action.append(-1 if action is None else self.actions.encode(action))
+        self.g.append(g)
+        self.hash.append(hash(state))
+        self.closed.append(0)
+        self._index[hash(state) if self.low_memory else state] = node
+        self._states.append(state if parent == -1 or not self.low_memory else None)
+        return node
+    
+    def lookup(self, state):
+        """Return the node id of a state, or None if it was never added."""
+        if self.low_memory:
+            return self._index.get(hash(state))
+        return self._index.get(state)
+    
+    def update(self, node, parent, action, g):
+        """Record a cheaper path to an existing node."""
+        self.parent[node] = parent
+        self.action[node] = self.actions.encode(action)
+        self.g[node] = g
+    
+    def close(self, node, state):
+        """Mark a node as expanded, storing its state in low-memory mode."""
+        self.closed[node] = 1
+        self._states[node] = state
+    
+    def reopen(self, node):
+        """Move a closed node back to the open list."""
+        self.closed[node] = 0
+    
+    def reset_closed(self):
+        """Reopen every node, keeping stored states."""
+        self.closed = bytearray(len(self.g))
+    
+    def state(self, node):
+        """Return the state of a node, replaying actions if it is not stored."""
+        # Walk up to the nearest ancestor whose state is stored
+        replay = []
+        while self._states[node] is None:
+            replay.append(self.action[node])
+            node = self.parent[node]
+        
+        state = self._states[node]
+        for code in reversed(replay):
+            state = state.get_next_state(self.actions.decode(code), state.problem)
+        return state
+    
+    def plan(self, node):
+        """
+        Return the list of actions leading from the root to a node.
+        
+        With a symmetric problem the actions are relabelled onto the jigs
+        actually reached along the path (see concrete_plan); macro actions
+        are then returned as their primitive steps.
+        """
+        actions = []
+        parents = []
+        while self.parent[node] != -1:
+            actions.append(self.actions.decode(self.action[node]))
+            node = self.parent[node]
+            parents.append(node)
+        
+        # Reverse the lists since we worked backwards
+        actions.reverse()
+        parents.reverse()
+        root_state = self._states[node]
+        if root_state.problem.symmetric:
+            steps = []
+            for parent, action in zip(parents, actions):
+                state = self.state(parent)
+                for step in primitive_steps(action):
+                    steps.append((state, step))
+                    state = state.get_next_state(step, state.problem)
+            return concrete_plan(root_state, steps)
+        return actions
\ No newline at end of file
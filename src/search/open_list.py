@@ -0,0 +1,189 @@
+import heapq
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import weakref
+
+# Open entry record of a run file: priority (primary, secondary), insertion
+# count, and the (node id, g, h) entry of astar_search
+RECORD = struct.Struct('<ddqqqd')
+
+# Records unpacked per sequential read of a run file
+READ_BLOCK = 4096
+
+# Runs of one tier kept before they are merged into one run of the next tier
+MAX_RUNS = 16
+
+def _read_run(path, pair):
+    """Yield the (priority, count, item) entries of a run file in order, deleting it once done."""
+    block_bytes = READ_BLOCK * RECORD.size
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for offset in range(0, len(data), block_bytes):
+                for primary, secondary, count, node, g, h in RECORD.iter_unpack(data[offset:offset + block_bytes]):
+                    yield (primary, secondary) if pair else primary, count, (node, g, h)
+    finally:
+        os.remove(path)
+
+class ExternalPriorityQueue:
+    """
+    Open list of astar_search holding at most memory_limit entries in memory.
+    
+    Entries are ordered like PriorityQueue's, by priority and then
+    insertion order. The lowest-priority entries - the hot low-f end of
+    the frontier - stay in an in-memory heap; whenever it outgrows
+    memory_limit, its higher-priority half is sorted and written to a run
+    file of fixed-size binary records in a temporary directory. Runs are
+    read back sequentially, a block of records at a time through a memory
+    map, and get() pops the smallest of the heap top and the heads of all
+    runs. Runs are merged in tiers: spilled runs are tier 0, and once
+    MAX_RUNS runs of one tier exist they are merged into one run of the next
+    tier, so each entry is rewritten about log(N / memory_limit) / log(MAX_RUNS)
+    times rather than on every merge.
+    
+    Items must be (node id, g, h) entries of astar_search, with a number or
+    a pair of numbers as priority; read back from disk, h and the priority
+    are floats. discard, called with an item, returns True for stale
+    entries - superseded by a cheaper path or already expanded - that the
+    search would skip when popping them; those are dropped whenever runs
+    are written or merged instead of being carried along.
+    
+    Call close() once the search is done to delete the run files; they are
+    also deleted when the queue is garbage collected.
+    
+    Attributes:
+        spilled: Entries written to run files, rewrites by merges excluded
+        merged: Entries rewritten by merges
+        dropped: Stale entries dropped while writing or merging runs
+    """
+    
+    def __init__(self, memory_limit, directory=None, discard=None):
+        if memory_limit < 2:
+            raise ValueError(f"Open list memory limit must be at least 2 entries, got {memory_limit}")
+        self.memory_limit = memory_limit
+        self.discard = discard
+        self.elements = []
+        self.entry_count = 0
+        self.spilled = 0
+        self.merged = 0
+        self.dropped = 0
+        
+        # Whether priorities are pairs, set by the first entry
+        self._pair = None
+        
+        # Heap of the next entry of every run, (priority, count, item, reader)
+        self._heads = []
+        self._on_disk = 0
+        
+        # Run reader -> [tier, entries left in the run, its head included]
+        self._run_info = {}
+        
+        self._directory = tempfile.mkdtemp(prefix='open-list-', dir=directory)
+        self._runs = 0
+        self._cleanup = weakref.finalize(self, shutil.rmtree, self._directory, True)
+    
+    def __len__(self):
+        return len(self.elements) + self._on_disk
+    
+    def is_empty(self):
+        return not self.elements and not self._heads
+    
+    def put(self, item, priority):
+        if self._pair is None:
+            self._pair = isinstance(priority, tuple)
+        heapq.heappush(self.elements, (priority, self.entry_count, item))
+        self.entry_count += 1
+        if len(self.elements) > self.memory_limit:
+            self._spill()
+    
+    def get(self):
+        heads = self._heads
+        if heads and (not self.elements or heads[0][:2] < self.elements[0][:2]):
+            _, _, item, reader = heapq.heappop(heads)
+            self._on_disk -= 1
+            self._run_info[reader][1] -= 1
+            self._advance(reader)
+            return item
+        return heapq.heappop(self.elements)[2]
+    
+    def close(self):
+        """Delete every run file; the queue must not be used afterwards."""
+        for head in self._heads:
+            head[3].close()
+        self._heads = []
+        self._on_disk = 0
+        self._run_info = {}
+        self._cleanup()
+    
+    def _spill(self):
+        # A sorted list is a heap, so the kept half needs no heapify
+        elements = self.elements
+        elements.sort()
+        keep = len(elements) // 2
+        self._add_run(elements[keep:])
+        del elements[keep:]
+        
+        # Merge full tiers, which may fill the next one
+        tier = 0
+        while True:
+            readers = [reader for reader, info in self._run_info.items() if info[0] == tier]
+            if len(readers) < MAX_RUNS:
+                break
+            tier += 1
+            self._merge_runs(readers, tier)
+    
+    def _merge_runs(self, readers, tier):
+        """Merge the runs of the given readers into one run of the given tier."""
+        merging = set(readers)
+        heads = [head for head in self._heads if head[3] in merging]
+        self._heads = [head for head in self._heads if head[3] not in merging]
+        heapq.heapify(self._heads)
+        for reader in readers:
+            self._on_disk -= self._run_info.pop(reader)[1]
+        streams = [self._stream(head) for head in heads]
+        self._add_run(heapq.merge(*streams), tier)
+        for reader in readers:
+            reader.close()
+    
+    @staticmethod
+    def _stream(head):
+        priority, count, item, reader = head
+        yield priority, count, item
+        yield from reader
+    
+    def _add_run(self, entries, tier=0):
+        """Write sorted entries to a new run file of a tier, dropping stale ones, and queue its first entry."""
+        path = os.path.join(self._directory, f"run-{self._runs}.bin")
+        self._runs += 1
+        pack = RECORD.pack
+        discard = self.discard
+        written = 0
+        with open(path, 'wb') as f:
+            for priority, count, item in entries:
+                if discard is not None and discard(item):
+                    self.dropped += 1
+                    continue
+                primary, secondary = priority if self._pair else (priority, 0)
+                f.write(pack(primary, secondary, count, *item))
+                written += 1
+        if tier:
+            self.merged += written
+        else:
+            self.spilled += written
+        if not written:
+            # An empty file cannot be memory-mapped
+            os.remove(path)
+            return
+        self._on_disk += written
+        reader = _read_run(path, self._pair)
+        self._run_info[reader] = [tier, written]
+        self._advance(reader)
+    
+    def _advance(self, reader):
+        entry = next(reader, None)
+        if entry is None:
+            del self._run_info[reader]
+        else:
+            heapq.heappush(self._heads, entry + (reader,))
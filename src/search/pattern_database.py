@@ -0,0 +1,394 @@
+import os
+from array import array
+from bisect import bisect_left
+from collections import deque
+from src.core.loader import ensure_problem_index
+from src.core.state import create_initial_state
+from src.core.zobrist import instance_seed
+
+# Ways to combine the pattern values
+COMBINE_MODES = ('add', 'max')
+
+# Default number of schedule slots per pattern
+DEFAULT_PATTERN_SIZE = 4
+
+# Blocker run symbols, as offsets from the pattern size
+LOADED_RUN = 0
+EMPTY_RUN = 1
+
+# Bump when the abstraction or the file layout changes, so stale cache files are rebuilt
+PDB_FORMAT = 2
+
+# First bytes of a pattern database cache file
+PDB_MAGIC = b'BPDB'
+
+def schedule_patterns(problem, pattern_size=DEFAULT_PATTERN_SIZE):
+    """
+    Split the production schedule into patterns of pattern_size jigs.
+    
+    Jigs are taken in schedule order, slot by slot across the production
+    lines, so the first pattern holds the next jigs due. Only scheduled jigs
+    that start loaded on a rack are included; the others never reach a rack
+    in this model and are left to the plain parts-to-produce count.
+    
+    Returns:
+        List of tuples of jig ids
+    """
+    if pattern_size < 1:
+        raise ValueError(f"Pattern size must be positive, got {pattern_size}")
+    initial_state = create_initial_state(problem)
+    on_racks = {jig for jigs in initial_state.racks for jig in jigs}
+    order = sorted(problem.schedule_position, key=lambda name: problem.schedule_position[name][::-1])
+    jigs = [problem.jig_ids[name] for name in order if name in problem.jig_ids]
+    jigs = [jig for jig in jigs if jig in on_racks and initial_state.is_loaded(jig)]
+    return [tuple(jigs[i:i + pattern_size]) for i in range(0, len(jigs), pattern_size)]
+
+def project(racks, loaded, symbols, size):
+    """
+    Map concrete racks to the abstract state of one pattern of `size` jigs.
+    
+    Loaded pattern jigs become their symbol (their index in the pattern).
+    Each run of other jigs between them becomes a single blocker symbol:
+    size + 1 (EMPTY_RUN) if it holds an empty jig, which can only be moved
+    away, otherwise size (LOADED_RUN), whose jigs can also be produced.
+    Racks without a pattern jig are dropped and the rest sorted, as racks
+    are interchangeable once capacities are ignored. The goal is the empty
+    tuple.
+    """
+    loaded_run = size + LOADED_RUN
+    empty_run = size + EMPTY_RUN
+    abstract = []
+    for jigs in racks:
+        sequence = []
+        found = False
+        for jig in jigs:
+            if not loaded >> jig & 1:
+                symbol = empty_run
+            else:
+                symbol = symbols.get(jig, loaded_run)
+                if symbol < size:
+                    found = True
+                    sequence.append(symbol)
+                    continue
+            if sequence and sequence[-1] >= size:
+                sequence[-1] = max(sequence[-1], symbol)
+            else:
+                sequence.append(symbol)
+        if found:
+            abstract.append(tuple(sequence))
+    abstract.sort()
+    return tuple(abstract)
+
+def _trim(sequence, size):
+    """Return a rack sequence, or None when it holds no pattern jig."""
+    for symbol in sequence:
+        if symbol < size:
+            return sequence
+    return None
+
+def _append(sequence, symbol, size):
+    """Put a jig symbol at the back of a rack sequence, merging blocker runs."""
+    if symbol >= size and sequence[-1] >= size:
+        return sequence[:-1] + (max(sequence[-1], symbol),)
+    return sequence + (symbol,)
+
+def abstract_successors(state, num_racks, size, pattern_cost):
+    """
+    Yield (successor, cost) for the abstract moves from an abstract state.
+    
+    A blocker run stands for one or more jigs, so taking a jig off it may
+    leave the run as it was or empty it, and taking an empty jig off a run
+    may also leave only loaded jigs; every possible outcome is generated. A pattern jig moved to a rack without pattern
+    jigs may land behind either kind of run or none, and an empty jig may
+    come back from the factory to the back of any rack.
+    
+    Moving or producing a pattern jig costs 1. Producing a blocker is free,
+    as it is a part outside the pattern and paid for there; moving or
+    returning one costs 1, or 0 when pattern_cost is set (so only pattern
+    jig moves are charged, which keeps patterns additive).
+    """
+    loaded_run = size + LOADED_RUN
+    empty_run = size + EMPTY_RUN
+    blocker_cost = 0 if pattern_cost else 1
+    fresh = len(state) < num_racks
+    for i, sequence in enumerate(state):
+        others = state[:i] + state[i + 1:]
+        edges = {0: sequence[0], len(sequence) - 1: sequence[-1]}
+        for position, symbol in edges.items():
+            rest = sequence[1:] if position == 0 else sequence[:-1]
+            if symbol < size:
+                # A pattern jig - sent to production from the front, or moved
+                kept = others if _trim(rest, size) is None else others + (rest,)
+                if position == 0:
+                    yield tuple(sorted(kept)), 1
+                if fresh:
+                    for landing in ((symbol,), (loaded_run, symbol), (empty_run, symbol)):
+                        yield tuple(sorted(kept + (landing,))), 1
+                for j, target in enumerate(others):
+                    yield tuple(sorted(kept[:j] + (target + (symbol,),) + kept[j + 1:])), 1
+                continue
+            
+            # A jig taken off a blocker run, and what may be left of the run. A loaded
+            # jig taken off a run with an empty one leaves that run as it was
+            if symbol == empty_run:
+                outcomes = ((empty_run, (rest, rest[:position] + (loaded_run,) + rest[position:], sequence)),
+                            (loaded_run, (sequence,)))
+            else:
+                outcomes = ((loaded_run, (rest, sequence)),)
+            for jig, remains in outcomes:
+                for source in remains:
+                    trimmed = _trim(source, size)
+                    kept = others if trimmed is None else others + (trimmed,)
+                    if position == 0 and jig == loaded_run:
+                        yield tuple(sorted(kept)), 0
+                    if fresh:
+                        yield tuple(sorted(kept)), blocker_cost
+                    for j, target in enumerate(others):
+                        moved = kept[:j] + (_append(target, jig, size),) + kept[j + 1:]
+                        yield tuple(sorted(moved)), blocker_cost
+    
+    # An empty jig returned from the factory to the back of a rack
+    for j, target in enumerate(state):
+        yield state[:j] + (_append(target, empty_run, size),) + state[j + 1:], blocker_cost
+
+def _encode(state):
+    """Encode an abstract state as bytes - rack symbols separated by a 255 byte."""
+    return bytes(bytearray(b for sequence in state for b in sequence + (255,)))
+
+def build_table(initial, num_racks, size, pattern_cost):
+    """
+    Compute the exact goal distance of every abstract state reachable from `initial`.
+    
+    The reachable space is enumerated forwards, then distances are found by
+    a backward breadth-first search from the goal over the reversed moves
+    (a 0-1 BFS when blocker moves are free).
+    
+    Returns:
+        PatternTable of the states from which the goal can be reached
+    """
+    index = {initial: 0}
+    states = [initial]
+    predecessors = [[]]
+    for node, state in enumerate(states):
+        for successor, cost in abstract_successors(state, num_racks, size, pattern_cost):
+            target = index.get(successor)
+            if target is None:
+                target = index[successor] = len(states)
+                states.append(successor)
+                predecessors.append([])
+            if target != node:
+                predecessors[target].append((node, cost))
+    
+    distances = [None] * len(states)
+    goal = index.get(())
+    if goal is not None:
+        distances[goal] = 0
+        frontier = deque([goal])
+        while frontier:
+            node = frontier.popleft()
+            for previous, cost in predecessors[node]:
+                distance = distances[node] + cost
+                if distances[previous] is None or distance < distances[previous]:
+                    distances[previous] = distance
+                    if cost:
+                        frontier.append(previous)
+                    else:
+                        frontier.appendleft(previous)
+    return PatternTable.from_items((_encode(state), distance) for state, distance in zip(states, distances)
+                                   if distance is not None)
+
+class PatternTable:
+    """
+    Goal distances of one pattern's abstract states, packed into arrays.
+    
+    The encoded states are concatenated in sorted order in `keys`, state i
+    spanning keys[offsets[i]:offsets[i + 1]], with its distance in
+    distances[i]. Lookups bisect over the sorted states.
+    """
+    
+    __slots__ = ('keys', 'offsets', 'distances')
+    
+    def __init__(self, keys, offsets, distances):
+        self.keys = keys
+        self.offsets = offsets
+        self.distances = distances
+    
+    @classmethod
+    def from_items(cls, items):
+        """Pack (encoded state, distance) pairs into a table."""
+        keys = bytearray()
+        offsets = array('I', [0])
+        distances = array('H')
+        for key, distance in sorted(items):
+            keys += key
+            offsets.append(len(keys))
+            distances.append(distance)
+        return cls(bytes(keys), offsets, distances)
+    
+    def __len__(self):
+        return len(self.distances)
+    
+    def __eq__(self, other):
+        if not isinstance(other, PatternTable):
+            return NotImplemented
+        return (self.keys, self.offsets, self.distances) == (other.keys, other.offsets, other.distances)
+    
+    def get(self, key, default=None):
+        """Return the distance of an encoded state, or default if it is not in the table."""
+        keys = self.keys
+        offsets = self.offsets
+        i = bisect_left(range(len(self.distances)), key, key=lambda i: keys[offsets[i]:offsets[i + 1]])
+        if i < len(self.distances) and keys[offsets[i]:offsets[i + 1]] == key:
+            return self.distances[i]
+        return default
+    
+    def write(self, f):
+        """Write the table to a binary file: its sizes, then the three arrays."""
+        array('I', [len(self.keys), len(self.distances)]).tofile(f)
+        f.write(self.keys)
+        self.offsets.tofile(f)
+        self.distances.tofile(f)
+    
+    @classmethod
+    def read(cls, f):
+        """Read a table written by write, raising EOFError or ValueError if it is cut short or inconsistent."""
+        key_bytes, count = _read_array(f, 'I', 2)
+        keys = f.read(key_bytes)
+        if len(keys) != key_bytes:
+            raise EOFError("Pattern table keys cut short")
+        offsets = _read_array(f, 'I', count + 1)
+        distances = _read_array(f, 'H', count)
+        if offsets[0] != 0 or offsets[-1] != key_bytes:
+            raise ValueError("Pattern table offsets do not match its keys")
+        return cls(keys, offsets, distances)
+
+def _read_array(f, typecode, count):
+    """Read count items of an array from a binary file, raising EOFError if there are fewer."""
+    items = array(typecode)
+    items.fromfile(f, count)
+    return items
+
+class PatternDatabase:
+    """
+    Pattern-database heuristic, called like heuristic(state, instance_data).
+    
+    Each pattern is a few scheduled jigs (see schedule_patterns). Its table
+    holds the exact distance to the goal of every abstract state of the
+    projection onto those jigs (see project), ignoring rack capacities. With
+    combine='add', only moves of a pattern's own jigs are charged in its
+    table, so the patterns' values sum admissibly, and the parts of the
+    remaining scheduled jigs are added at 1 each. With combine='max',
+    blocker moves are charged as well; each pattern's value plus the parts
+    of the scheduled jigs outside it is admissible, and the largest is used.
+    Both modes add one step per flight still to be processed, the
+    ProcessNextFlight actions the goal requires. The incoming and outgoing
+    jig terms of heuristic() are left out: the goal test requires no jig to
+    be unloaded from or loaded onto a Beluga, so they could overestimate.
+    As every term counts distinct actions the goal requires and the tables
+    only relax rack capacities, the value is admissible on any instance.
+    
+    Tables are kept as packed arrays (see PatternTable) and stored in
+    cache_dir, one file per instance and pattern set, holding a header with
+    the format and the patterns followed by the arrays in native byte order.
+    They are loaded from there instead of being rebuilt when present; a
+    missing, stale or damaged file is rebuilt.
+    """
+    
+    def __init__(self, instance_data, pattern_size=DEFAULT_PATTERN_SIZE, combine='add', patterns=None,
+                 cache_dir=None):
+        if combine not in COMBINE_MODES:
+            raise ValueError(f"Unknown combine mode '{combine}', expected one of {COMBINE_MODES}")
+        problem = ensure_problem_index(instance_data)
+        self.problem = problem
+        self.combine = combine
+        if patterns is None:
+            patterns = schedule_patterns(problem, pattern_size)
+        self.patterns = [tuple(pattern) for pattern in patterns]
+        self.lookups = 0
+        self.misses = 0
+        
+        # Per pattern, jig id -> symbol, its size and its jig mask; and the scheduled jigs in no pattern
+        self._symbols = [{jig: symbol for symbol, jig in enumerate(pattern)} for pattern in self.patterns]
+        self._sizes = [len(pattern) for pattern in self.patterns]
+        self._masks = [sum(1 << jig for jig in set(pattern)) for pattern in self.patterns]
+        covered = 0
+        for mask in self._masks:
+            covered |= mask
+        self._uncovered = problem.scheduled_mask & ~covered
+        
+        self.cache_file = None
+        if cache_dir is not None:
+            key = '-'.join('.'.join(map(str, pattern)) for pattern in self.patterns)
+            self.cache_file = os.path.join(cache_dir, f"pdb_{instance_seed(problem.data)}_{combine}_"
+                                           f"{instance_seed(key)}.pdb")
+        self.tables = self._load() if self.cache_file else None
+        if self.tables is None:
+            self.tables = self._build(create_initial_state(problem))
+            if self.cache_file:
+                self._save()
+    
+    def _build(self, initial_state):
+        """Build the table of every pattern from the initial state."""
+        tables = []
+        for symbols, size in zip(self._symbols, self._sizes):
+            initial = project(initial_state.racks, initial_state.loaded, symbols, size)
+            tables.append(build_table(initial, self.problem.num_racks, size, self.combine == 'add'))
+        return tables
+    
+    def _load(self):
+        """Load the tables from the cache file, or return None if it is missing, stale or damaged."""
+        try:
+            with open(self.cache_file, 'rb') as f:
+                if f.read(len(PDB_MAGIC)) != PDB_MAGIC:
+                    return None
+                format_version, num_patterns = _read_array(f, 'I', 2)
+                if format_version != PDB_FORMAT or num_patterns != len(self.patterns):
+                    return None
+                tables = []
+                for pattern in self.patterns:
+                    size, = _read_array(f, 'I', 1)
+                    if tuple(_read_array(f, 'I', size)) != pattern:
+                        return None
+                    tables.append(PatternTable.read(f))
+                if f.read(1):
+                    return None
+        except (OSError, EOFError, ValueError):
+            return None
+        return tables
+    
+    def _save(self):
+        """Write the tables to the cache file."""
+        os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+        with open(self.cache_file, 'wb') as f:
+            f.write(PDB_MAGIC)
+            array('I', [PDB_FORMAT, len(self.patterns)]).tofile(f)
+            for pattern, table in zip(self.patterns, self.tables):
+                array('I', (len(pattern),) + pattern).tofile(f)
+                table.write(f)
+    
+    def __len__(self):
+        """Total number of abstract states stored."""
+        return sum(len(table) for table in self.tables)
+    
+    def pattern_values(self, state):
+        """Return the table value of each pattern for a state (0 for a state missing from a table)."""
+        values = []
+        for table, symbols, size in zip(self.tables, self._symbols, self._sizes):
+            self.lookups += 1
+            distance = table.get(_encode(project(state.racks, state.loaded, symbols, size)))
+            if distance is None:
+                self.misses += 1
+                distance = 0
+            values.append(distance)
+        return values
+    
+    def __call__(self, state, instance_data=None):
+        problem = self.problem
+        values = self.pattern_values(state)
+        if self.combine == 'add':
+            cost = sum(values) + (state.loaded & self._uncovered & ~state.produced).bit_count()
+        else:
+            pending = state.loaded & problem.scheduled_mask & ~state.produced
+            cost = max((value + (pending & ~mask).bit_count() for value, mask in zip(values, self._masks)),
+                       default=pending.bit_count())
+        return cost + max(0, problem.num_flights - state.current_flight_idx)
@@ -0,0 +1,104 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.core.state import create_initial_state
+from src.search.astar import astar_search
+from src.search.stats import SearchStats
+from src.search.heuristic_cache import shared_heuristic_cache
+from src.utils.verification import simulate_plan
+
+# Search configurations raced by default - (name, astar_search keyword arguments)
+DEFAULT_PORTFOLIO = (
+    ('astar', {}),
+    ('astar-high-g', {'tie_break': 'high_g'}),
+    ('astar-low-g', {'tie_break': 'low_g'}),
+    ('wastar-1.5', {'weight': 1.5, 'tie_break': 'high_g'}),
+    ('wastar-2', {'weight': 2.0, 'tie_break': 'high_g'}),
+    ('wastar-5', {'weight': 5.0, 'tie_break': 'high_g'}),
+    ('greedy', {'greedy': True, 'tie_break': 'high_g'}),
+)
+
+# Per-worker globals, set once by the pool initializer
+_problem = None
+_stop_event = None
+
+def _init_worker(problem, stop_event):
+    """Keep the problem and the shared stop flag in the worker process."""
+    global _problem, _stop_event
+    _problem = problem
+    _stop_event = stop_event
+
+def _run_configuration(name, options, max_iterations, time_limit):
+    """Run one configuration in a worker and verify its plan."""
+    start_time = time.time()
+    stats = SearchStats(timers=False)
+    initial_state = create_initial_state(_problem)
+    plan = astar_search(initial_state, _problem, max_iterations, time_limit,
+                        should_stop=_stop_event.is_set, stats=stats,
+                        heuristic_cache=shared_heuristic_cache(_problem), **options)
+    verified = plan is not None and simulate_plan(initial_state, plan, _problem, verbose=False)[0]
+    
+    # First verified plan wins; tell the other workers to give up
+    if verified:
+        _stop_event.set()
+    
+    return {
+        "name": name,
+        "plan": plan,
+        "verified": verified,
+        "stopped": plan is None and _stop_event.is_set(),
+        "expansions": stats.expansions,
+        "wall_time": time.time() - start_time
+    }
+
+def run_portfolio(problem, configurations=DEFAULT_PORTFOLIO, workers=None, max_iterations=10000,
+                  time_limit=60):
+    """
+    Race several search configurations in parallel and keep the first verified plan.
+    
+    Each configuration runs astar_search in its own process. The compiled
+    problem is handed to each worker once through the pool initializer rather
+    than with every task, and the configurations a worker runs share its
+    heuristic cache (shared_heuristic_cache). When a worker finds a plan that passes
+    simulate_plan it sets a shared event, and the other searches stop at
+    their next iteration through their should_stop hook.
+    
+    Args:
+        problem: The compiled ProblemIndex
+        configurations: Sequence of (name, astar_search keyword arguments)
+            (default: DEFAULT_PORTFOLIO)
+        workers: Number of processes (default: one per configuration, at
+            most the CPU count)
+        max_iterations: Maximum number of expansions per configuration (default: 10000)
+        time_limit: Time limit in seconds per configuration (default: 60)
+    
+    Returns:
+        Tuple of (plan, results): the winning plan, or None if no
+        configuration found one, and a result dict per configuration that
+        ran, with name, plan, verified, stopped (cut short by another
+        configuration's plan), expansions and wall_time, in completion order
+    """
+    if workers is None:
+        workers = min(len(configurations), os.cpu_count() or 1)
+    
+    stop_event = multiprocessing.Event()
+    results = []
+    winner = None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(problem, stop_event)) as executor:
+        futures = [executor.submit(_run_configuration, name, options, max_iterations, time_limit)
+                   for name, options in configurations]
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            result = future.result()
+            results.append(result)
+            if result["verified"] and winner is None:
+                winner = result
+                
+                # Configurations not started yet are dropped
+                for pending in futures:
+                    pending.cancel()
+    
+    return (winner["plan"] if winner else None), results
\ No newline at end of file
@@ -0,0 +1,71 @@
+# Progress events sent by the search engines to their `progress` callback.
+# Each is a dict whose 'search' key names the engine ('A*', 'ARA*', 'Beam'
+# or 'HDA*') and whose 'event' key is one of:
+#   'start'     - search begins; A* adds max_iterations and time_limit, beam
+#                 search beam_width and HDA* workers
+#   'progress'  - A*, at most once per progress_interval seconds:
+#                 expansions, open (open list size), g and h of the node
+#                 being expanded, flights_progress and parts_progress of its
+#                 state, elapsed seconds. Beam search, every 10 layers:
+#                 depth, candidates, best_h, expansions, elapsed. HDA*, about
+#                 once per second: expansions over all workers, elapsed
+#   'solution'  - ARA* found a cheaper plan: cost, weight, expansions, elapsed
+#   'finish'    - search ends: status ('goal', 'time_limit', 'stopped' or
+#                 'failed'), expansions, elapsed seconds. A* adds discarded
+#                 and reopened, ARA* weight, cost and bound (None without a
+#                 plan), beam search depth and HDA* per_worker and cost (the
+#                 best plan found, also when stopped; None without a plan)
+PROGRESS_EVENTS = ('start', 'progress', 'solution', 'finish')
+
+def console_progress(event):
+    """Progress callback printing search events to stdout, as the CLI does."""
+    kind = event['event']
+    search = event.get('search', 'A*')
+    if kind == 'start':
+        if search == 'Beam':
+            print(f"Starting beam search (width {event['beam_width']})...")
+        elif search == 'HDA*':
+            print(f"Starting HDA* search with {event['workers']} workers...")
+        else:
+            print(f"Starting {search} search...")
+    elif kind == 'progress':
+        if search == 'Beam':
+            print(f"Depth {event['depth']}: {event['candidates']} candidates, best h {event['best_h']}")
+        elif search == 'HDA*':
+            print(f"Expansions: {event['expansions']}")
+        else:
+            print(f"Iteration {event['expansions']}: Flights: {event['flights_progress']}, "
+                  f"Parts: {event['parts_progress']} ({event['elapsed']:.1f}s, open list {event['open']})")
+    elif kind == 'solution':
+        print(f"Plan of {event['cost']} steps found with weight {event['weight']:g} "
+              f"after {event['expansions']} iterations ({event['elapsed']:.2f}s)")
+    elif kind == 'finish':
+        if search == 'ARA*':
+            print(f"ARA* search stopped after {event['expansions']} iterations with weight {event['weight']:g}")
+            print(f"Search time: {event['elapsed']:.2f} seconds")
+            if event['cost'] is None:
+                print("No plan found.")
+            else:
+                print(f"Best plan: {event['cost']} steps, suboptimality bound {event['bound']:.2f}")
+            return
+        
+        status = event['status']
+        if status == 'goal' and 'depth' in event:
+            print(f"Goal reached at depth {event['depth']} after {event['expansions']} expansions!")
+        elif status == 'goal':
+            print(f"Goal reached after {event['expansions']} iterations!")
+        elif status == 'time_limit':
+            print(f"Time limit reached after {event['expansions']} iterations. Aborting search.")
+        elif status == 'stopped' and event.get('cost') is not None:
+            print(f"Search stopped after {event['expansions']} iterations with a plan of {event['cost']} steps "
+                  f"that may not be optimal.")
+        elif status == 'stopped':
+            print(f"Search stopped after {event['expansions']} iterations.")
+        else:
+            print(f"Search failed after {event['expansions']} iterations.")
+        print(f"Search time: {event['elapsed']:.2f} seconds")
+        if 'discarded' in event:
+            print(f"Expansions: {event['expansions']}, discarded pops: {event['discarded']}, "
+                  f"reopened: {event['reopened']}")
+        if 'per_worker' in event:
+            print(f"Expansions per worker: {event['per_worker']}")
@@ -0,0 +1,103 @@
+from src.core.actions import MoveJigBetweenRacks, SendJigToProduction, ReturnEmptyJigFromFactory, ProcessNextFlight
+
+# Rank of each action type in the canonical action order. Rack moves, by far the most
+# numerous, come first so that they are the ones pruned after any other action
+_TYPE_RANK = {MoveJigBetweenRacks: 0, ReturnEmptyJigFromFactory: 1, SendJigToProduction: 2, ProcessNextFlight: 3}
+
+def action_footprint(action):
+    """
+    Return (order key, jig, racks) for an action, or None if it touches the Beluga.
+    
+    An action reads and writes only the racks it names and the status of
+    its jig; ProcessNextFlight touches neither, only the flight index.
+    Two actions are independent - applicable in either order, with the
+    same result - when their jigs differ and their rack sets are disjoint.
+    Beluga loads and unloads are never treated as independent of anything.
+    """
+    kind = type(action)
+    if kind is MoveJigBetweenRacks:
+        racks = (action.from_rack_id, action.to_rack_id)
+    elif kind is SendJigToProduction:
+        racks = (action.from_rack_id,)
+    elif kind is ReturnEmptyJigFromFactory:
+        racks = (action.to_rack_id,)
+    elif kind is ProcessNextFlight:
+        return (_TYPE_RANK[kind],), None, frozenset()
+    else:
+        return None
+    return (_TYPE_RANK[kind], action.jig_id) + racks, action.jig_id, frozenset(racks)
+
+class SuccessorPruner:
+    """
+    Drop successors of an expansion that are reached as cheaply elsewhere.
+    
+    Two rules look at the action that generated the node being expanded:
+    
+    - Inverse moves: a rack move that exactly undoes the last move, taking
+      the jig back to the back of the rack it came from, leads back to the
+      parent state.
+    - Commuting actions: when an action is independent of the last one (see
+      action_footprint) and precedes it in the canonical order, applying it
+      now reaches the same state as applying it first, from the parent.
+      Only the canonically ordered interleaving of every commuting pair is
+      expanded - the pairwise sleep set of partial-order reduction.
+    
+    Both keep A* optimal as long as expanded nodes are never reopened, that
+    is with a consistent heuristic: the pruned state is still generated
+    along a path of equal cost whose actions come in canonical order.
+    Lookups of action footprints are memoised per pruner; one must only be
+    used with one problem.
+    
+    Attributes:
+        inverse: Actions pruned as the inverse of the last move
+        commuting: Actions pruned as out of canonical order with the last one
+    """
+    
+    def __init__(self, problem):
+        self.problem = problem
+        self.inverse = 0
+        self.commuting = 0
+        self._footprints = {}
+    
+    def footprint(self, action):
+        footprints = self._footprints
+        if action not in footprints:
+            footprints[action] = action_footprint(action)
+        return footprints[action]
+    
+    def prune(self, actions, last_action, parent_state):
+        """
+        Return the actions worth applying after last_action.
+        
+        Args:
+            actions: Actions applicable in the state being expanded
+            last_action: Action that generated the state from parent_state,
+                or None at the root (nothing is pruned there)
+            parent_state: State last_action was applied to
+        """
+        if last_action is None:
+            return actions
+        last = self.footprint(last_action)
+        if last is None:
+            return actions
+        last_key, last_jig, last_racks = last
+        
+        # The move back is an exact undo only if the jig came off the back of its rack
+        undo = None
+        if type(last_action) is MoveJigBetweenRacks:
+            from_rack = self.problem.rack_ids[last_action.from_rack_id]
+            if parent_state.racks[from_rack][-1] == self.problem.jig_ids[last_action.jig_id]:
+                undo = MoveJigBetweenRacks(last_action.jig_id, last_action.to_rack_id, last_action.from_rack_id)
+        
+        kept = []
+        for action in actions:
+            if action == undo:
+                self.inverse += 1
+                continue
+            footprint = self.footprint(action)
+            if (footprint is not None and footprint[0] < last_key and footprint[1] != last_jig
+                    and last_racks.isdisjoint(footprint[2])):
+                self.commuting += 1
+                continue
+            kept.append(action)
+        return kept
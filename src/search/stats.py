@@ -0,0 +1,139 @@
+import json
+import time
+from collections import defaultdict
+
+# Functions whose cumulative time is tracked, in report order
+TIMED_FUNCTIONS = ('get_all_possible_actions', 'get_next_state', 'heuristic', 'is_goal_state')
+
+class SearchStats:
+    """
+    Counters and timings collected by astar_search.
+    
+    Pass an instance as the `stats` argument of astar_search; it is filled
+    in when the search ends. Without one the search only keeps the few
+    counters it always printed. Per-call timers add two perf_counter calls
+    to every call of the timed functions; with timers=False only the
+    counters are collected.
+    
+    Attributes:
+        expansions: Nodes expanded (goal tested), including the goal
+        generated: Successor states produced by get_next_state
+        duplicates: Successors whose state had already been generated
+        discarded: Stale or already closed open list entries popped
+        reopened: Closed nodes reopened by a cheaper path
+        peak_open: Largest open list size, stale entries included
+        peak_closed: Largest number of closed nodes
+        branching: Successors generated per action type name
+        times: Cumulative seconds per function in TIMED_FUNCTIONS
+        heuristic_hits, heuristic_misses: Heuristic cache lookups during
+            this search, when one was used
+        pruned_inverse, pruned_commuting: Actions dropped by successor
+            pruning as undoing or commuting with the last action, when it
+            was enabled
+        spilled, spill_dropped: Open list entries written to disk and stale
+            entries dropped from disk runs, with an open list memory limit
+        per_worker: Expansions of each worker process, for HDA*
+        search_time: Wall time of the whole search in seconds
+    """
+    
+    def __init__(self, timers=True):
+        self.timers = timers
+        self.expansions = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.discarded = 0
+        self.reopened = 0
+        self.peak_open = 0
+        self.peak_closed = 0
+        self.branching = defaultdict(int)
+        self.times = dict.fromkeys(TIMED_FUNCTIONS, 0.0)
+        self.heuristic_hits = 0
+        self.heuristic_misses = 0
+        self.pruned_inverse = 0
+        self.pruned_commuting = 0
+        self.spilled = 0
+        self.spill_dropped = 0
+        self.per_worker = []
+        self.search_time = 0.0
+    
+    def timed(self, name, function):
+        """Return function wrapped to add its run time to times[name], or unchanged without timers."""
+        if not self.timers:
+            return function
+        times = self.times
+        perf_counter = time.perf_counter
+        
+        def wrapper(*args):
+            start = perf_counter()
+            result = function(*args)
+            times[name] += perf_counter() - start
+            return result
+        return wrapper
+    
+    def add(self, other):
+        """Add the counters, successors per action type and times of another SearchStats to these."""
+        for name in ('expansions', 'generated', 'duplicates', 'discarded', 'reopened', 'heuristic_hits',
+                     'heuristic_misses', 'pruned_inverse', 'pruned_commuting', 'spilled', 'spill_dropped'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for name, count in other.branching.items():
+            self.branching[name] += count
+        for name, seconds in other.times.items():
+            self.times[name] += seconds
+    
+    @property
+    def branching_factor(self):
+        """Mean number of successors generated per expansion."""
+        return self.generated / self.expansions if self.expansions else 0.0
+    
+    def to_dict(self):
+        """Return the statistics as a JSON-serialisable dict."""
+        return {
+            'expansions': self.expansions,
+            'generated': self.generated,
+            'duplicates': self.duplicates,
+            'discarded': self.discarded,
+            'reopened': self.reopened,
+            'peak_open': self.peak_open,
+            'peak_closed': self.peak_closed,
+            'branching_factor': self.branching_factor,
+            'branching': dict(sorted(self.branching.items())),
+            'times': dict(self.times) if self.timers else None,
+            'heuristic_hits': self.heuristic_hits,
+            'heuristic_misses': self.heuristic_misses,
+            'pruned_inverse': self.pruned_inverse,
+            'pruned_commuting': self.pruned_commuting,
+            'spilled': self.spilled,
+            'spill_dropped': self.spill_dropped,
+            'per_worker': list(self.per_worker),
+            'search_time': self.search_time
+        }
+    
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+    
+    def save(self, filename):
+        """Write the statistics to a JSON file."""
+        with open(filename, 'w') as f:
+            f.write(self.to_json())
+    
+    def summary(self):
+        """Return a short human-readable report."""
+        lines = [
+            f"Expansions: {self.expansions}, generated: {self.generated}, duplicates: {self.duplicates}, "
+            f"discarded pops: {self.discarded}, reopened: {self.reopened}",
+            f"Peak open: {self.peak_open}, peak closed: {self.peak_closed}, "
+            f"branching factor: {self.branching_factor:.2f}",
+            "Successors by action: " + ", ".join(f"{name} {count}" for name, count in sorted(self.branching.items()))
+        ]
+        if self.heuristic_hits or self.heuristic_misses:
+            lines.append(f"Heuristic cache: {self.heuristic_hits} hits, {self.heuristic_misses} misses")
+        if self.pruned_inverse or self.pruned_commuting:
+            lines.append(f"Pruned actions: {self.pruned_inverse} inverse, {self.pruned_commuting} commuting")
+        if self.per_worker:
+            lines.append(f"Expansions per worker: {self.per_worker}")
+        if self.spilled:
+            lines.append(f"Open list spilled to disk: {self.spilled} entries, {self.spill_dropped} stale dropped")
+        if self.timers:
+            lines.append("Time: " + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.times.items())
+                         + f" of {self.search_time:.3f}s")
+        return "\n".join(lines)
\ No newline at end of file
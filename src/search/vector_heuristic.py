@@ -0,0 +1,85 @@
+import weakref
+from itertools import chain
+from src.core.loader import ensure_problem_index
+from src.search.heuristic import flight_cost
+
+try:
+    import numpy as np
+except ImportError:  # Optional - batch_heuristic needs it
+    np = None
+
+# Per-problem lookup arrays by id of their ProblemIndex, dropped when it is garbage collected
+_tables = {}
+
+def _problem_tables(problem):
+    """Return (flight cost by flight index, scheduled flag by jig id, scheduled mask bytes, mask width)."""
+    tables = _tables.get(id(problem))
+    if tables is None:
+        width = max(1, (problem.num_jigs + 7) // 8)
+        flight_costs = np.array([flight_cost(problem, idx) for idx in range(problem.num_flights + 1)],
+                                dtype=np.int64)
+        is_scheduled = np.array(problem.is_scheduled, dtype=np.int64)
+        scheduled = np.frombuffer(problem.scheduled_mask.to_bytes(width, 'little'), dtype=np.uint8)
+        tables = _tables[id(problem)] = (flight_costs, is_scheduled, scheduled, width)
+        weakref.finalize(problem, _tables.pop, id(problem), None)
+    return tables
+
+def batch_heuristic(states, instance_data):
+    """
+    Compute heuristic() for a list of states in one vectorized pass.
+    
+    The states are packed into arrays: the contents of every distinct rack
+    tuple concatenated with their lengths, a matrix of each state's rack
+    slots, the loaded and produced bitmasks as byte matrices, and the
+    flight indices. Blocked jigs are found from each jig's position within
+    its rack, parts to produce by a byte-wise popcount. The values are
+    identical to heuristic(state, instance_data); None entries (invalid
+    successors) get None.
+    
+    Returns:
+        List of heuristic values, one per state
+    """
+    if np is None:
+        raise ImportError("batch_heuristic requires NumPy")
+    problem = ensure_problem_index(instance_data)
+    flight_costs, is_scheduled, scheduled, width = _problem_tables(problem)
+    live = [state for state in states if state is not None]
+    if not live:
+        return [None] * len(states)
+    count = len(live)
+    num_racks = problem.num_racks
+    
+    # Flight terms, by flight index
+    flight_idx = np.fromiter((state.current_flight_idx for state in live), dtype=np.int64, count=count)
+    values = flight_costs[np.minimum(flight_idx, problem.num_flights)]
+    
+    # Parts to produce - popcount of loaded & scheduled & ~produced
+    loaded = np.frombuffer(b''.join(state.loaded.to_bytes(width, 'little') for state in live),
+                           dtype=np.uint8).reshape(count, width)
+    produced = np.frombuffer(b''.join(state.produced.to_bytes(width, 'little') for state in live),
+                             dtype=np.uint8).reshape(count, width)
+    pending = loaded & scheduled & ~produced
+    values += np.unpackbits(pending, axis=1).sum(axis=1, dtype=np.int64)
+    
+    # Blocked jigs - scheduled jigs away from both edges of their rack. Successors share the
+    # tuples of untouched racks, so every distinct rack is packed once and summed per state
+    if num_racks:
+        rack_refs = list(chain.from_iterable(state.racks for state in live))
+        rack_ids = np.fromiter(map(id, rack_refs), dtype=np.uint64, count=len(rack_refs))
+        _, first, rack_index = np.unique(rack_ids, return_index=True, return_inverse=True)
+        racks = [rack_refs[index] for index in first.tolist()]
+        lengths = np.fromiter(map(len, racks), dtype=np.int64, count=len(racks))
+        jigs = np.fromiter(chain.from_iterable(racks), dtype=np.int64, count=int(lengths.sum()))
+        if len(jigs):
+            rack_length = np.repeat(lengths, lengths)
+            starts = np.cumsum(lengths) - lengths
+            position = np.arange(len(jigs)) - np.repeat(starts, lengths)
+            blocked = is_scheduled[jigs] * ((position > 0) & (position < rack_length - 1))
+            owner = np.repeat(np.arange(len(racks)), lengths)
+            rack_blocked = np.bincount(owner, weights=blocked, minlength=len(racks)).astype(np.int64)
+            values += 2 * rack_blocked[rack_index].reshape(count, num_racks).sum(axis=1)
+    
+    if count == len(states):
+        return values.tolist()
+    results = iter(values.tolist())
+    return [None if state is None else next(results) for state in states]
\ No newline at end of file
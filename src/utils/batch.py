@@ -0,0 +1,219 @@
+import json
+import os
+import time
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+from src.core.loader import load_instance, build_problem_index
+from src.core.state import create_initial_state
+from src.search.astar import astar_search
+from src.search.stats import SearchStats
+from src.utils.verification import simulate_plan
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Seconds an instance may run beyond the search time limit before its worker
+# is killed, covering loading and plan verification
+WALL_TIME_MARGIN = 30
+
+def reset_peak_rss():
+    """Reset the peak resident set size of this process (Linux only)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+def peak_rss_kb():
+    """Return the peak resident set size of this process in kB, or None if unknown."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def _init_batch_worker(memory_limit_mb):
+    """Cap the address space of a batch worker process."""
+    if memory_limit_mb and resource is not None:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def solve_instance(instance_file, max_iterations=10000, time_limit=60, low_memory=False):
+    """
+    Solve one instance without console output and return its result record.
+    
+    The record holds the instance file name, a status ('solved', 'no_plan',
+    'memory_limit' or 'error'), plan length, expansions, wall time, peak RSS
+    in kB and whether the plan passed simulate_plan.
+    """
+    reset_peak_rss()
+    start_time = time.time()
+    stats = SearchStats(timers=False)
+    result = {
+        "instance": os.path.basename(instance_file),
+        "status": "no_plan",
+        "plan_length": None,
+        "expansions": None,
+        "wall_time": None,
+        "peak_rss_kb": None,
+        "verified": False
+    }
+    try:
+        problem = build_problem_index(load_instance(instance_file))
+        initial_state = create_initial_state(problem)
+        plan = astar_search(initial_state, problem, max_iterations, time_limit,
+                            low_memory=low_memory, stats=stats)
+        if plan is not None:
+            result["status"] = "solved"
+            result["plan_length"] = len(plan)
+            result["verified"] = simulate_plan(initial_state, plan, problem, verbose=False)[0]
+    except MemoryError:
+        result["status"] = "memory_limit"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    
+    result["expansions"] = stats.expansions
+    result["wall_time"] = round(time.time() - start_time, 3)
+    result["peak_rss_kb"] = peak_rss_kb()
+    return result
+
+def _failure_record(instance_file, status, wall_time, error):
+    """Return the result record of an instance whose worker was lost."""
+    return {
+        "instance": os.path.basename(instance_file),
+        "status": status,
+        "plan_length": None,
+        "expansions": None,
+        "wall_time": round(wall_time, 3),
+        "peak_rss_kb": None,
+        "verified": False,
+        "error": error
+    }
+
+def _batch_worker(conn, memory_limit_mb, max_iterations, time_limit, low_memory):
+    """Solve the instance files received on conn, one at a time, until None arrives."""
+    _init_batch_worker(memory_limit_mb)
+    while True:
+        instance_file = conn.recv()
+        if instance_file is None:
+            break
+        conn.send(solve_instance(instance_file, max_iterations, time_limit, low_memory))
+
+def _start_batch_worker(worker_args):
+    """Start a batch worker process and return its end of the pipe and the process."""
+    conn, child_conn = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_batch_worker, args=(child_conn,) + worker_args, daemon=True)
+    process.start()
+    child_conn.close()
+    return conn, process
+
+def run_batch(directory, results_file, processes=None, max_iterations=10000, time_limit=60,
+              memory_limit_mb=None, low_memory=False, wall_time_limit=None):
+    """
+    Solve every *.json instance in a directory in parallel.
+    
+    Instances are spread over worker processes that are reused from one
+    instance to the next, so imports happen once per worker. Each result
+    record (see solve_instance) is appended to results_file as a JSON line as
+    soon as its instance finishes. memory_limit_mb caps each worker's address
+    space; a search that exceeds it is reported as 'memory_limit'.
+    
+    An instance running longer than wall_time_limit seconds (default:
+    time_limit plus WALL_TIME_MARGIN) has its worker killed and is reported
+    as 'timeout'. An instance whose worker dies (segfault, OOM killer, a
+    result too large to send back) is reported as 'crashed'. Either way the
+    worker is replaced and the remaining instances go on.
+    
+    Returns:
+        The list of result records, in completion order
+    """
+    instance_files = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                            if name.endswith('.json'))
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if wall_time_limit is None:
+        wall_time_limit = time_limit + WALL_TIME_MARGIN
+    worker_args = (memory_limit_mb, max_iterations, time_limit, low_memory)
+    
+    print(f"Solving {len(instance_files)} instances with {processes} processes...")
+    pending = deque(instance_files)
+    running = {}  # worker connection -> (process, instance file, start time)
+    results = []
+    
+    def assign(conn, process):
+        # Hand the next instance to an idle worker, or shut it down
+        while pending:
+            instance_file = pending.popleft()
+            try:
+                conn.send(instance_file)
+            except OSError:
+                # The worker died after its last result; use a fresh one
+                pending.appendleft(instance_file)
+                process.kill()
+                process.join()
+                conn.close()
+                conn, process = _start_batch_worker(worker_args)
+                continue
+            running[conn] = (process, instance_file, time.time())
+            return
+        try:
+            conn.send(None)
+        except OSError:
+            pass
+        conn.close()
+        process.join()
+    
+    with open(results_file, 'w') as out:
+        for _ in range(min(processes, len(pending))):
+            assign(*_start_batch_worker(worker_args))
+        
+        while running:
+            # Wake up on a result, a dead worker or the earliest deadline
+            deadline = min(start for _, _, start in running.values()) + wall_time_limit
+            ready = wait(list(running) + [process.sentinel for process, _, _ in running.values()],
+                         max(0, deadline - time.time()))
+            
+            for conn, (process, instance_file, start) in list(running.items()):
+                result = None
+                timed_out = conn not in ready and process.sentinel not in ready
+                if timed_out and time.time() - start < wall_time_limit:
+                    continue
+                if conn in ready:
+                    try:
+                        result = conn.recv()
+                    except (EOFError, OSError):
+                        pass
+                del running[conn]
+                
+                if result is not None:
+                    assign(conn, process)
+                else:
+                    # The worker died or ran out of time; replace it
+                    process.kill()
+                    process.join()
+                    conn.close()
+                    if timed_out:
+                        result = _failure_record(instance_file, "timeout", time.time() - start,
+                                                 f"no result within {wall_time_limit}s")
+                    else:
+                        result = _failure_record(instance_file, "crashed", time.time() - start,
+                                                 f"worker exited with code {process.exitcode}")
+                    if pending:
+                        assign(*_start_batch_worker(worker_args))
+                
+                results.append(result)
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                print(f"  {result['instance']}: {result['status']}, plan length {result['plan_length']}, "
+                      f"{result['wall_time']:.2f}s")
+    
+    solved = sum(1 for result in results if result['verified'])
+    print(f"{solved}/{len(results)} instances solved with a verified plan. Results saved to {results_file}")
+    return results
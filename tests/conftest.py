@@ -0,0 +1,41 @@
+import copy
+import pytest
+from src.core.loader import load_instance, build_problem_index
+from src.core.state import create_initial_state
+
+INSTANCE_FILE = "instances/problem_4_s46_j23_r2_oc51_f6.json"
+
+@pytest.fixture
+def instance_data():
+    """The bundled instance, compiled into a ProblemIndex."""
+    return build_problem_index(load_instance(INSTANCE_FILE))
+
+@pytest.fixture
+def initial_state(instance_data):
+    """Initial state of the bundled instance."""
+    return create_initial_state(instance_data)
+
+@pytest.fixture
+def solvable_instance():
+    """
+    The bundled instance without flights, scheduling only the jigs that start
+    on the racks. The bundled instance itself has no reachable goal.
+    """
+    data = copy.deepcopy(load_instance(INSTANCE_FILE))
+    on_racks = {jig for rack in data['racks'] for jig in rack['jigs']}
+    data['flights'] = []
+    for line in data['production_lines']:
+        line['schedule'] = [jig for jig in line['schedule'] if jig in on_racks]
+    return build_problem_index(data)
+
+@pytest.fixture
+def flights_instance():
+    """
+    The bundled instance scheduling only the jigs that start on the racks,
+    with its flights kept.
+    """
+    data = copy.deepcopy(load_instance(INSTANCE_FILE))
+    on_racks = {jig for rack in data['racks'] for jig in rack['jigs']}
+    for line in data['production_lines']:
+        line['schedule'] = [jig for jig in line['schedule'] if jig in on_racks]
+    return build_problem_index(data)
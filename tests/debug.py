@@ -86,7 +86,7 @@ def run_debug_session(instance_file):
     print(f"Running debug session on instance: {instance_file}")
     
     # Load instance
-    instance_data = load_instance(instance_file)
+    instance_data = load_instance(instance_file, verbose=True)
     
     # Create initial state
     initial_state = create_initial_state(instance_data)
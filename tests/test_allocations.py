@@ -0,0 +1,104 @@
+import sys
+import time
+import tracemalloc
+from collections import deque
+from src.core.loader import load_instance, build_problem_index
+from src.core.state import BelugaState, create_initial_state
+from src.search.astar import get_all_possible_actions
+
+def unshared_successor(state, action, instance_data):
+    """
+    Build a successor the way get_next_state did before structural sharing:
+    every rack rebuilt, as the copied per-rack jig lists used to be, and
+    fresh occupancy and jig location tuples for every action.
+    """
+    child = state.get_next_state(action, instance_data)
+    return BelugaState(
+        child.problem,
+        tuple(tuple(list(rack)) for rack in child.racks),
+        child.loaded,
+        child.beluga,
+        child.factory,
+        child.produced,
+        child.current_flight_idx,
+        locations=tuple(list(child.locations)),
+        state_hash=hash(child),
+        rack_used=tuple(list(child.rack_used))
+    )
+
+def shared_successor(state, action, instance_data):
+    return state.get_next_state(action, instance_data)
+
+def expansion_order(initial_state, instance_data, expansions):
+    """Return the first states of a breadth-first expansion order."""
+    order = []
+    seen = {initial_state}
+    queue = deque([initial_state])
+    while queue and len(order) < expansions:
+        state = queue.popleft()
+        order.append(state)
+        for action in get_all_possible_actions(state, instance_data):
+            next_state = state.get_next_state(action, instance_data)
+            if next_state not in seen:
+                seen.add(next_state)
+                queue.append(next_state)
+    return order
+
+def measure_allocations(states, instance_data, make_successor):
+    """
+    Expand each state, keeping every successor alive, and return the memory
+    blocks and bytes still allocated per expansion plus the time taken.
+    """
+    work = [(state, get_all_possible_actions(state, instance_data)) for state in states]
+    successors = []
+    
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start_time = time.perf_counter()
+    for state, actions in work:
+        for action in actions:
+            successors.append(make_successor(state, action, instance_data))
+    elapsed = time.perf_counter() - start_time
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    return {
+        "expansions": len(work),
+        "successors": len(successors),
+        "blocks_per_expansion": blocks / len(work),
+        "bytes_per_expansion": size / len(work),
+        "seconds": elapsed
+    }
+
+def run_allocation_benchmark(instance_data, initial_state, expansions=200):
+    """Print retained allocations per expansion with and without sharing."""
+    states = expansion_order(initial_state, instance_data, expansions)
+    results = {}
+    for name, make_successor in (("unshared", unshared_successor), ("shared", shared_successor)):
+        results[name] = measure_allocations(states, instance_data, make_successor)
+        result = results[name]
+        print(f"  {name:>8}: {result['blocks_per_expansion']:8.1f} blocks, "
+              f"{result['bytes_per_expansion']:9.1f} bytes per expansion "
+              f"({result['successors']} successors of {result['expansions']} expansions, "
+              f"{result['seconds']:.3f}s under tracemalloc)")
+    return results
+
+def test_successor_allocations(instance_data, initial_state):
+    """Test that successors share unchanged components with their parent."""
+    print("\nMeasuring successor allocations...")
+    results = run_allocation_benchmark(instance_data, initial_state)
+    assert results["shared"]["bytes_per_expansion"] < results["unshared"]["bytes_per_expansion"]
+    assert results["shared"]["blocks_per_expansion"] < results["unshared"]["blocks_per_expansion"]
+
+if __name__ == "__main__":
+    instance_file = sys.argv[1] if len(sys.argv) > 1 else "instances/problem_4_s46_j23_r2_oc51_f6.json"
+    expansions = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    
+    instance_data = build_problem_index(load_instance(instance_file))
+    initial_state = create_initial_state(instance_data)
+    
+    print(f"Successor allocations on {instance_file}:")
+    run_allocation_benchmark(instance_data, initial_state, expansions)
\ No newline at end of file
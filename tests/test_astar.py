@@ -2,6 +2,7 @@ import time
 from src.core.loader import load_instance, extract_initial_state_data
 from src.core.state import create_initial_state
 from src.search.astar import astar_search
+from src.search.progress import console_progress
 from src.utils.verification import simulate_plan
 from src.utils.utils import print_plan, print_state
 from src.search.goal import detailed_goal_check
@@ -14,7 +15,7 @@ def run_astar_test(instance_file, max_iterations=10000, time_limit=60):
     
     # Load instance
     start_time = time.time()
-    instance_data = load_instance(instance_file)
+    instance_data = load_instance(instance_file, verbose=True)
     print(f"Instance loaded in {time.time() - start_time:.2f} seconds")
     
     # Create initial state
@@ -24,7 +25,7 @@ def run_astar_test(instance_file, max_iterations=10000, time_limit=60):
     # Run A* search
     print(f"Running A* search (max iterations: {max_iterations}, time limit: {time_limit}s)...")
     start_time = time.time()
-    plan = astar_search(initial_state, instance_data, max_iterations, time_limit)
+    plan = astar_search(initial_state, instance_data, max_iterations, time_limit, progress=console_progress)
     search_time = time.time() - start_time
     print(f"A* search completed in {search_time:.2f} seconds")
     
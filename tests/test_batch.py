@@ -0,0 +1,56 @@
+import json
+import os
+import time
+from tests.conftest import INSTANCE_FILE
+from src.utils import batch
+from src.utils.batch import run_batch, solve_instance
+
+def _failing_solve(instance_file, *args):
+    """Crash the worker on crash.json and hang on hang.json."""
+    if instance_file.endswith("crash.json"):
+        os._exit(3)
+    if instance_file.endswith("hang.json"):
+        time.sleep(60)
+    return solve_instance(instance_file, *args)
+
+def test_batch_mode(solvable_instance, tmp_path):
+    """Test that batch mode streams one verified result line per instance."""
+    instances = tmp_path / "instances"
+    instances.mkdir()
+    with open(instances / "solvable.json", 'w') as f:
+        json.dump(solvable_instance.data, f)
+    with open(INSTANCE_FILE) as src, open(instances / "bundled.json", 'w') as dst:
+        dst.write(src.read())
+    
+    results_file = tmp_path / "results.jsonl"
+    results = run_batch(str(instances), str(results_file), processes=2, max_iterations=200)
+    
+    with open(results_file) as f:
+        lines = [json.loads(line) for line in f]
+    assert sorted(line['instance'] for line in lines) == ["bundled.json", "solvable.json"]
+    assert lines == results
+    
+    by_name = {line['instance']: line for line in lines}
+    assert by_name["solvable.json"]['status'] == "solved" and by_name["solvable.json"]['verified']
+    assert by_name["bundled.json"]['status'] == "no_plan"
+    assert by_name["bundled.json"]['expansions'] == 200
+
+def test_batch_lost_workers(solvable_instance, tmp_path, monkeypatch):
+    """Test that a crashed or hung worker costs only its own instance."""
+    instances = tmp_path / "instances"
+    instances.mkdir()
+    for name in ("crash.json", "hang.json", "solvable_a.json", "solvable_b.json"):
+        with open(instances / name, 'w') as f:
+            json.dump(solvable_instance.data, f)
+    
+    # Workers are forked and pick up the patched solver
+    monkeypatch.setattr(batch, "solve_instance", _failing_solve)
+    results_file = tmp_path / "results.jsonl"
+    results = run_batch(str(instances), str(results_file), processes=2, max_iterations=200,
+                        wall_time_limit=2)
+    
+    by_name = {result['instance']: result for result in results}
+    assert sorted(by_name) == ["crash.json", "hang.json", "solvable_a.json", "solvable_b.json"]
+    assert by_name["crash.json"]['status'] == "crashed"
+    assert by_name["hang.json"]['status'] == "timeout"
+    assert by_name["solvable_a.json"]['verified'] and by_name["solvable_b.json"]['verified']
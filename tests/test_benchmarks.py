@@ -0,0 +1,18 @@
+from benchmarks.generator import generate_instance
+from benchmarks.runner import compare_results
+
+def test_generator_and_regression_check():
+    """Test that generated instances are reproducible and that slowdowns are flagged."""
+    assert generate_instance(16, 4, seed=3, fill_ratio=0.5) == generate_instance(16, 4, seed=3, fill_ratio=0.5)
+    assert generate_instance(16, 4, seed=3) != generate_instance(16, 4, seed=4)
+    
+    # A lower fill ratio gives larger racks for the same jigs
+    sparse = generate_instance(16, 4, seed=3, fill_ratio=0.5)
+    dense = generate_instance(16, 4, seed=3, fill_ratio=0.9)
+    assert sparse['racks'][0]['size'] > dense['racks'][0]['size']
+    
+    baseline = {'small': {'heuristic_us': 1.0, 'expansions_per_second': 1000, 'expansions': 100}}
+    results = {'small': {'heuristic_us': 1.05, 'expansions_per_second': 800, 'expansions': 50}}
+    regressions = compare_results(results, baseline, threshold=0.1)
+    assert [(name, metric) for name, metric, *_ in regressions] == [('small', 'expansions_per_second')]
+    assert compare_results(results, baseline, threshold=0.25) == []
\ No newline at end of file
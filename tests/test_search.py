@@ -0,0 +1,406 @@
+import copy
+import gc
+import json
+import os
+import random
+import weakref
+import pytest
+from benchmarks.generator import generate_instance
+from src.core.loader import build_problem_index
+from src.core.state import create_initial_state
+from src.search.astar import astar_search, get_all_possible_actions, PriorityQueue
+from src.search.heuristic import heuristic
+from src.search.vector_heuristic import batch_heuristic
+from src.search.anytime import ara_search
+from src.search.beam import beam_search
+from src.search.portfolio import run_portfolio
+from src.search.hda import hda_search
+from src.search.stats import SearchStats
+from src.search.heuristic_cache import HeuristicCache, shared_heuristic_cache
+from src.search.pattern_database import PatternDatabase, COMBINE_MODES
+from src.search.pruning import SuccessorPruner
+from src.search.macros import get_macro_actions
+from src.search.decomposed import decomposed_search
+from src.search.ida import ida_search
+from src.search.open_list import ExternalPriorityQueue
+from src.core.actions import MoveJigBetweenRacks, RetrieveJig, ProcessNextFlight
+from src.utils.verification import simulate_plan
+
+def test_search_stats(solvable_instance):
+    """Test that A* fills in consistent search statistics without changing its plan."""
+    initial_state = create_initial_state(solvable_instance)
+    stats = SearchStats()
+    plan = astar_search(initial_state, solvable_instance, stats=stats)
+    assert plan == astar_search(initial_state, solvable_instance)
+    
+    assert stats.expansions > len(plan)
+    assert stats.generated == sum(stats.branching.values())
+    assert stats.duplicates <= stats.generated
+    assert 0 < stats.peak_closed < stats.expansions
+    assert stats.peak_open > 0
+    assert all(seconds > 0 for seconds in stats.times.values())
+    
+    exported = json.loads(stats.to_json())
+    assert exported['expansions'] == stats.expansions
+    assert set(exported['times']) == {'get_all_possible_actions', 'get_next_state', 'heuristic', 'is_goal_state'}
+
+def test_progress_events(solvable_instance, capsys):
+    """Test that A* is silent by default and reports structured events to a progress callback."""
+    initial_state = create_initial_state(solvable_instance)
+    plan = astar_search(initial_state, solvable_instance)
+    assert capsys.readouterr().out == ""
+    
+    events = []
+    assert astar_search(initial_state, solvable_instance, progress=events.append, progress_interval=0) == plan
+    assert events[0]['event'] == 'start'
+    assert events[-1]['event'] == 'finish' and events[-1]['status'] == 'goal'
+    updates = [event for event in events if event['event'] == 'progress']
+    assert [event['expansions'] for event in updates] == list(range(1, events[-1]['expansions']))
+    
+    # Budget exhausted before the goal, and progress throttled away
+    events = []
+    astar_search(initial_state, solvable_instance, max_iterations=2, progress=events.append, progress_interval=60)
+    assert [event['event'] for event in events] == ['start', 'finish']
+    assert events[-1]['status'] == 'failed' and events[-1]['expansions'] == 2
+
+def test_engine_progress_events(solvable_instance, capsys):
+    """Test that ARA*, beam search and HDA* are silent by default and report to a progress callback."""
+    initial_state = create_initial_state(solvable_instance)
+    engines = (('ARA*', lambda **options: ara_search(initial_state, solvable_instance, **options)[0]),
+               ('Beam', lambda **options: beam_search(initial_state, solvable_instance, beam_width=10, **options)),
+               ('HDA*', lambda **options: hda_search(initial_state, solvable_instance, 2, **options)[0]))
+    for name, search in engines:
+        assert search() is not None
+        assert capsys.readouterr().out == ""
+        
+        events = []
+        assert search(progress=events.append) is not None
+        assert events[0]['event'] == 'start' and events[-1]['event'] == 'finish'
+        assert events[-1]['status'] == 'goal' and all(event['search'] == name for event in events)
+        if name == 'ARA*':
+            assert any(event['event'] == 'solution' for event in events)
+
+def test_heuristic_cache(solvable_instance):
+    """Test that cached heuristic values are reused across solves and checked against the state."""
+    initial_state = create_initial_state(solvable_instance)
+    plan = astar_search(initial_state, solvable_instance)
+    
+    cache = shared_heuristic_cache(solvable_instance)
+    assert shared_heuristic_cache(solvable_instance) is cache
+    first, second = SearchStats(), SearchStats()
+    assert astar_search(initial_state, solvable_instance, stats=first, heuristic_cache=cache) == plan
+    assert astar_search(initial_state, solvable_instance, stats=second, heuristic_cache=cache) == plan
+    assert first.heuristic_misses > 0
+    assert second.heuristic_misses == 0 and second.heuristic_hits == first.heuristic_hits + first.heuristic_misses
+    
+    # Colliding keys are told apart by equality, and the least recently used entry is evicted
+    class Colliding(tuple):
+        def __hash__(self):
+            return 0
+    
+    cache = HeuristicCache(max_size=2, function=lambda state, instance_data: sum(state))
+    assert cache(Colliding((1, 2)), None) == 3
+    assert cache(Colliding((4, 5)), None) == 9
+    assert cache.counters()['collisions'] == 1
+    cache = HeuristicCache(max_size=2, function=lambda state, instance_data: state)
+    for state in (1, 2, 1, 3, 1, 2):
+        cache(state, None)
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 4, 2)
+    
+    # A shared cache does not keep its problem alive and goes with it
+    problem = build_problem_index(solvable_instance.data)
+    cache = shared_heuristic_cache(problem)
+    assert astar_search(create_initial_state(problem), problem, heuristic_cache=cache) == plan
+    assert len(cache) > 0
+    cache = weakref.ref(cache)
+    del problem
+    gc.collect()
+    assert cache() is None
+
+def test_incremental_heuristic(instance_data, solvable_instance):
+    """Test that incremental heuristic values match full recomputes and leave the search unchanged."""
+    for problem in (instance_data, solvable_instance):
+        initial_state = create_initial_state(problem)
+        expected = astar_search(initial_state, problem, max_iterations=2000)
+        assert astar_search(initial_state, problem, max_iterations=2000, incremental=True,
+                            check_incremental=True) == expected
+
+def test_batched_heuristic(instance_data, solvable_instance):
+    """Test that batched heuristic values match the scalar heuristic and leave the search unchanged."""
+    pytest.importorskip('numpy')
+    for problem in (instance_data, solvable_instance):
+        initial_state = create_initial_state(problem)
+        successors = [initial_state.get_next_state(action, problem)
+                      for action in get_all_possible_actions(initial_state, problem)]
+        assert batch_heuristic(successors, problem) == [None if state is None else heuristic(state, problem)
+                                                        for state in successors]
+        expected = astar_search(initial_state, problem, max_iterations=2000)
+        assert astar_search(initial_state, problem, max_iterations=2000, batched=True) == expected
+
+def test_pattern_database(solvable_instance, flights_instance, tmp_path):
+    """Test that pattern-database values are admissible along optimal plans and cached on disk."""
+    problem = build_problem_index(generate_instance(12, 3, seed=1))
+    for instance, combine in [(solvable_instance, mode) for mode in COMBINE_MODES] + [(problem, 'max')]:
+        initial_state = create_initial_state(instance)
+        pdb = PatternDatabase(instance, 3, combine, cache_dir=str(tmp_path))
+        plan = astar_search(initial_state, instance, max_iterations=20000, heuristic_fn=pdb)
+        assert simulate_plan(initial_state, plan, instance, verbose=False)[0]
+        
+        # Every state on an optimal plan is at most its remaining steps from the goal
+        state = initial_state
+        for step, action in enumerate(plan):
+            assert pdb(state, instance) <= len(plan) - step
+            state = state.get_next_state(action, instance)
+        assert pdb(state, instance) == 0 and pdb.misses == 0
+        
+        cached = PatternDatabase(instance, 3, combine, cache_dir=str(tmp_path))
+        assert cached.cache_file == pdb.cache_file and cached.tables == pdb.tables
+        
+        # A cut-short cache file is rebuilt rather than failing
+        with open(pdb.cache_file, 'r+b') as f:
+            f.truncate(os.path.getsize(pdb.cache_file) - 1)
+        assert PatternDatabase(instance, 3, combine, cache_dir=str(tmp_path)).tables == pdb.tables
+        assert PatternDatabase(instance, 3, combine, cache_dir=str(tmp_path)).tables == pdb.tables
+    assert PatternDatabase(problem, 3, 'max')(create_initial_state(problem)) > \
+        PatternDatabase(problem, 3, 'add')(create_initial_state(problem))
+    
+    # With nothing to produce, the optimal plan only processes the remaining
+    # flights; the Beluga jig terms of heuristic() would overestimate
+    data = copy.deepcopy(flights_instance.data)
+    for line in data['production_lines']:
+        line['schedule'] = []
+    problem = build_problem_index(data)
+    initial_state = create_initial_state(problem)
+    assert heuristic(initial_state, problem) > problem.num_flights
+    for combine in COMBINE_MODES:
+        assert PatternDatabase(problem, 3, combine)(initial_state) == problem.num_flights
+
+def test_symmetric_search(solvable_instance):
+    """Test that symmetry reduction keeps plans valid for the actual jigs and as short."""
+    problem = build_problem_index(solvable_instance.data, symmetric=True)
+    for low_memory in (False, True):
+        plan = astar_search(create_initial_state(problem), problem, low_memory=low_memory)
+        assert len(plan) == len(astar_search(create_initial_state(solvable_instance), solvable_instance))
+        assert simulate_plan(create_initial_state(solvable_instance), plan, solvable_instance, verbose=False)[0]
+
+def test_successor_pruning(solvable_instance):
+    """Test that pruning successors keeps plans as short while generating fewer states."""
+    problem = build_problem_index(generate_instance(10, 4, 0, seed=3))
+    for instance in (solvable_instance, problem):
+        initial_state = create_initial_state(instance)
+        pdb = PatternDatabase(instance, 3, 'max')
+        full, pruned = SearchStats(timers=False), SearchStats(timers=False)
+        expected = astar_search(initial_state, instance, max_iterations=20000, heuristic_fn=pdb, stats=full)
+        plan = astar_search(initial_state, instance, max_iterations=20000, heuristic_fn=pdb, stats=pruned, prune=True)
+        assert len(plan) == len(expected)
+        assert simulate_plan(initial_state, plan, instance, verbose=False)[0]
+        assert pruned.generated < full.generated and pruned.pruned_commuting > 0
+        assert pruned.to_dict()['pruned_inverse'] == pruned.pruned_inverse
+    
+    # A move back is only an inverse if the jig came off the back of its rack
+    initial_state = create_initial_state(problem)
+    from_rack = next(rack for rack, jigs in enumerate(initial_state.racks) if len(jigs) > 1)
+    for jig in (initial_state.racks[from_rack][0], initial_state.racks[from_rack][-1]):
+        to_rack = next(rack for rack in range(problem.num_racks)
+                       if rack != from_rack and initial_state.can_place(rack, jig))
+        move = MoveJigBetweenRacks(problem.jig_names[jig], problem.rack_names[from_rack],
+                                   problem.rack_names[to_rack])
+        state = initial_state.get_next_state(move, problem)
+        back = MoveJigBetweenRacks(move.jig_id, move.to_rack_id, move.from_rack_id)
+        pruner = SuccessorPruner(problem)
+        kept = pruner.prune(get_all_possible_actions(state, problem), move, initial_state)
+        is_back = jig == initial_state.racks[from_rack][-1]
+        assert (back in kept) != is_back and pruner.inverse == is_back
+    
+    with pytest.raises(ValueError):
+        symmetric = build_problem_index(solvable_instance.data, symmetric=True)
+        astar_search(create_initial_state(symmetric), symmetric, prune=True)
+
+def test_macro_actions():
+    """Test that retrieval macros apply their steps and give primitive plans from fewer expansions."""
+    problem = build_problem_index(generate_instance(16, 3, 0, seed=0))
+    initial_state = create_initial_state(problem)
+    macros = get_macro_actions(initial_state, problem)
+    assert macros
+    for macro in macros:
+        state = initial_state
+        for step in macro.steps:
+            state = state.get_next_state(step, problem)
+        assert state == initial_state.get_next_state(macro, problem)
+    
+    pdb = PatternDatabase(problem, 3, 'max')
+    for heuristic_fn in (None, pdb):
+        full, shortcut = SearchStats(timers=False), SearchStats(timers=False)
+        expected = astar_search(initial_state, problem, max_iterations=20000, heuristic_fn=heuristic_fn, stats=full)
+        plan = astar_search(initial_state, problem, max_iterations=20000, heuristic_fn=heuristic_fn, stats=shortcut,
+                            macros=True)
+        assert not any(isinstance(action, RetrieveJig) for action in plan)
+        assert simulate_plan(initial_state, plan, problem, verbose=False)[0]
+        assert shortcut.branching['RetrieveJig'] > 0
+        if heuristic_fn is pdb:
+            assert len(plan) == len(expected)
+        else:
+            assert shortcut.expansions < full.expansions
+
+def test_last_flight(flights_instance):
+    """Test that the last flight can be processed, so A* reaches the goal of an instance with flights."""
+    data = copy.deepcopy(flights_instance.data)
+    for line in data['production_lines']:
+        line['schedule'] = []
+    problem = build_problem_index(data)
+    state = create_initial_state(problem)
+    for _ in range(problem.num_flights):
+        assert ProcessNextFlight() in get_all_possible_actions(state, problem)
+        state = state.get_next_state(ProcessNextFlight(), problem)
+    assert ProcessNextFlight() not in get_all_possible_actions(state, problem)
+    
+    initial_state = create_initial_state(problem)
+    plan = astar_search(initial_state, problem)
+    assert plan == [ProcessNextFlight()] * problem.num_flights
+    assert simulate_plan(initial_state, plan, problem, verbose=False)[0]
+
+def test_decomposed_search(flights_instance):
+    """Test that window plans stitch into a valid plan, and that an infeasible window backtracks."""
+    initial_state = create_initial_state(flights_instance)
+    plan = decomposed_search(initial_state, flights_instance)
+    assert simulate_plan(initial_state, plan, flights_instance, verbose=False)[0]
+    assert sum(isinstance(action, ProcessNextFlight) for action in plan) == flights_instance.num_flights
+    
+    # A jig that never reaches a rack, due in the second of two windows: both
+    # end states allowed for the first window are tried before giving up
+    data = copy.deepcopy(flights_instance.data)
+    data['flights'] = data['flights'][:2]
+    data['production_lines'][0]['schedule'].append(data['flights'][1]['incoming'][0])
+    problem = build_problem_index(data)
+    events = []
+    assert decomposed_search(create_initial_state(problem), problem, max_iterations=300, max_alternatives=2,
+                             progress=events.append) is None
+    assert [event['status'] for event in events if event['event'] == 'finish'] == ['goal', 'failed'] * 2
+
+def test_ida_search(solvable_instance):
+    """Test that IDA* finds plans as short as A* with an admissible heuristic, with and without a transposition table."""
+    for instance in (solvable_instance, build_problem_index(generate_instance(10, 4, 0, seed=0))):
+        initial_state = create_initial_state(instance)
+        pdb = PatternDatabase(instance, 3, 'max')
+        expected = astar_search(initial_state, instance, max_iterations=20000, heuristic_fn=pdb)
+        plain, table = SearchStats(timers=False), SearchStats(timers=False)
+        for transposition_size, stats in ((0, plain), (1 << 12, table)):
+            plan = ida_search(initial_state, instance, heuristic_fn=pdb, transposition_size=transposition_size,
+                              stats=stats)
+            assert len(plan) == len(expected)
+            assert simulate_plan(initial_state, plan, instance, verbose=False)[0]
+        assert table.generated <= plain.generated
+    assert table.duplicates > 0 and table.generated < plain.generated
+
+def test_external_open_list(solvable_instance, tmp_path):
+    """Test that the spilling open list pops entries in PriorityQueue order and A* finds the same plans with it."""
+    rng = random.Random(0)
+    for tie_break in (False, True):
+        spilling, in_memory = ExternalPriorityQueue(8, tmp_path), PriorityQueue()
+        popped, expected = [], []
+        for i in range(2000):
+            priority = (rng.randint(0, 30), -rng.randint(0, 5)) if tie_break else rng.randint(0, 30)
+            spilling.put((i, i % 7, i % 3), priority)
+            in_memory.put((i, i % 7, i % 3), priority)
+            if rng.random() < 0.3:
+                popped.append(spilling.get()[0])
+                expected.append(in_memory.get()[0])
+        while not in_memory.is_empty():
+            popped.append(spilling.get()[0])
+            expected.append(in_memory.get()[0])
+        assert popped == expected and spilling.is_empty() and spilling.spilled > 0
+        spilling.close()
+    assert not any(tmp_path.iterdir())
+    
+    # Runs are merged in tiers, so each entry is rewritten a few times at most
+    spilling = ExternalPriorityQueue(8, tmp_path)
+    for i in range(20000):
+        spilling.put((i, 0, 0), rng.randint(0, 1000))
+    assert 0 < spilling.merged <= 3 * spilling.spilled
+    popped = [spilling.get() for _ in range(len(spilling))]
+    assert sorted(popped) == [(i, 0, 0) for i in range(20000)] and spilling.is_empty()
+    spilling.close()
+    
+    initial_state = create_initial_state(solvable_instance)
+    expected = astar_search(initial_state, solvable_instance)
+    for low_memory in (False, True):
+        stats = SearchStats(timers=False)
+        plan = astar_search(initial_state, solvable_instance, low_memory=low_memory, open_limit=16,
+                            spill_dir=tmp_path, stats=stats)
+        assert len(plan) == len(expected)
+        assert simulate_plan(initial_state, plan, solvable_instance, verbose=False)[0]
+        assert stats.spilled > 0
+    assert not any(tmp_path.iterdir())
+
+def test_ara_search(solvable_instance):
+    """Test that ARA* returns a valid plan with its bound, even when cut short."""
+    initial_state = create_initial_state(solvable_instance)
+    optimal = astar_search(initial_state, solvable_instance)
+    
+    plan, bound = ara_search(initial_state, solvable_instance, initial_weight=5.0)
+    assert simulate_plan(initial_state, plan, solvable_instance)[0]
+    assert len(plan) == len(optimal)
+    assert bound == 1.0
+    
+    # A budget that only allows the first pass still yields a plan
+    plan, bound = ara_search(initial_state, solvable_instance, max_iterations=len(optimal) + 1,
+                             initial_weight=5.0)
+    assert simulate_plan(initial_state, plan, solvable_instance)[0]
+    assert bound >= 1.0
+    
+    # With an admissible heuristic the bound holds against the optimal cost
+    pdb = PatternDatabase(solvable_instance, 3, 'max')
+    optimal = astar_search(initial_state, solvable_instance, max_iterations=20000, heuristic_fn=pdb)
+    for max_iterations in (len(optimal) + 1, 20000):
+        plan, bound = ara_search(initial_state, solvable_instance, max_iterations=max_iterations,
+                                 initial_weight=5.0, heuristic_fn=pdb)
+        assert simulate_plan(initial_state, plan, solvable_instance, verbose=False)[0]
+        assert len(optimal) <= len(plan) <= bound * len(optimal)
+
+def test_beam_search(solvable_instance):
+    """Test that beam search returns a valid plan and stops at max_depth."""
+    initial_state = create_initial_state(solvable_instance)
+    
+    plan = beam_search(initial_state, solvable_instance, beam_width=10)
+    assert simulate_plan(initial_state, plan, solvable_instance)[0]
+    
+    # No plan fits within a depth bound shorter than the optimal plan
+    optimal = astar_search(initial_state, solvable_instance)
+    assert beam_search(initial_state, solvable_instance, beam_width=10, max_depth=len(optimal) - 1) is None
+
+def test_portfolio(solvable_instance):
+    """Test that the portfolio returns a verified plan and reports each configuration."""
+    initial_state = create_initial_state(solvable_instance)
+    configurations = (('astar', {}), ('wastar-2', {'weight': 2.0}), ('greedy', {'greedy': True}))
+    
+    plan, results = run_portfolio(solvable_instance, configurations, workers=2)
+    assert simulate_plan(initial_state, plan, solvable_instance)[0]
+    assert any(result['verified'] and result['plan'] == plan for result in results)
+    assert {result['name'] for result in results} <= {name for name, _ in configurations}
+
+def test_hda_search(solvable_instance):
+    """Test that HDA* finds the same plan cost as A* with one and several workers."""
+    initial_state = create_initial_state(solvable_instance)
+    optimal = astar_search(initial_state, solvable_instance)
+    
+    for workers in (1, 3):
+        stats = SearchStats()
+        plan, status = hda_search(initial_state, solvable_instance, workers, stats=stats)
+        assert status == 'goal'
+        assert simulate_plan(initial_state, plan, solvable_instance)[0]
+        assert len(plan) == len(optimal)
+        assert len(stats.per_worker) == workers and stats.expansions == sum(stats.per_worker)
+        assert stats.generated == sum(stats.branching.values()) > 0
+        assert stats.times['heuristic'] > 0    
+    # With an admissible heuristic the plans are optimal, also with symmetry
+    for symmetric in (False, True):
+        problem = build_problem_index(generate_instance(12, 3, seed=0), symmetric=symmetric)
+        initial_state = create_initial_state(problem)
+        pdb = PatternDatabase(problem, 3, 'max')
+        optimal = astar_search(initial_state, problem, max_iterations=20000, heuristic_fn=pdb)
+        plan, status = hda_search(initial_state, problem, 3, max_iterations=20000, heuristic_fn=pdb)
+        assert status == 'goal' and len(plan) == len(optimal)
+    
+    # A plan found before the budget runs out is kept
+    plan, status = hda_search(initial_state, problem, 1, max_iterations=25, batch_size=1)
+    assert status == 'stopped' and simulate_plan(initial_state, plan, problem, verbose=False)[0]
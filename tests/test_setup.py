@@ -6,7 +6,7 @@ from src.core.actions import MoveJigBetweenRacks, LoadJigToBeluga, UnloadJigFrom
 def test_loading():
     """Test loading the instance file."""
     print("Testing instance loading...")
-    instance_data = load_instance("instances/problem_4_s46_j23_r2_oc51_f6.json")
+    instance_data = load_instance("instances/problem_4_s46_j23_r2_oc51_f6.json", verbose=True)
     print(f"Instance contains {len(instance_data.get('racks', []))} racks")
     print(f"Instance contains {len(instance_data.get('jigs', {}))} jigs")
     print(f"Instance contains {len(instance_data.get('flights', []))} flights")
@@ -107,6 +107,150 @@ def test_state_properties(instance_data, initial_state):
     is_at_edge = initial_state.jig_is_at_rack_edge(rack_id, jig_id, instance_data)
     print(f"  Is {jig_id} at the edge of {rack_id}? {is_at_edge}")
 
+def test_incremental_updates(instance_data, initial_state):
+    """Test that successor hashes and rack occupancy match a recompute from scratch."""
+    from src.core.loader import ensure_problem_index
+    from src.search.astar import get_all_possible_actions
+    print("\nTesting incremental state updates...")
+    
+    problem = ensure_problem_index(instance_data)
+    zobrist = problem.zobrist
+    
+    # Walk a fixed path, checking every successor along the way
+    state = initial_state
+    checked = 0
+    for step in range(30):
+        actions = get_all_possible_actions(state, problem)
+        if not actions:
+            break
+        for action in actions:
+            next_state = state.get_next_state(action, problem)
+            expected = zobrist.hash_state(next_state.racks, next_state.loaded, next_state.beluga,
+                                          next_state.factory, next_state.produced,
+                                          next_state.current_flight_idx)
+            assert hash(next_state) == expected, f"Hash mismatch after {action}"
+            for rack, jigs in enumerate(next_state.racks):
+                used = sum(problem.jig_size(jig, next_state.is_loaded(jig)) for jig in jigs)
+                assert next_state.rack_used[rack] == used, f"Occupancy mismatch after {action}"
+            checked += 1
+        state = state.get_next_state(actions[step % len(actions)], problem)
+    
+    print(f"  {checked} successor hashes and occupancies match a full recompute")
+
+def test_node_table(instance_data, initial_state):
+    """Test that low-memory node tables re-derive unstored states and plans."""
+    from src.core.loader import ensure_problem_index
+    from src.search.astar import get_all_possible_actions
+    from src.search.nodes import SearchNodeTable
+    print("\nTesting search node table...")
+    
+    problem = ensure_problem_index(instance_data)
+    
+    # Grow a path of nodes, closing every other one, and keep the states for
+    # comparison
+    nodes = SearchNodeTable(low_memory=True)
+    node = nodes.add(initial_state, -1, None, 0)
+    states = [initial_state]
+    path = []
+    state = initial_state
+    for step in range(10):
+        actions = get_all_possible_actions(state, problem)
+        if not actions:
+            break
+        action = actions[step % len(actions)]
+        state = state.get_next_state(action, problem)
+        if step % 2:
+            nodes.close(node, states[node])
+        node = nodes.add(state, node, action, step + 1)
+        states.append(state)
+        path.append(action)
+    
+    assert nodes.lookup(state) == node
+    assert nodes.plan(node) == path
+    for node_id, expected in enumerate(states):
+        assert nodes.state(node_id) == expected, f"Re-derived state {node_id} differs"
+    
+    print(f"  {len(states)} node states re-derived from their stored ancestors")
+
+def test_symmetric_states(instance_data):
+    """Test that empty jigs of one type are interchangeable with symmetry, and plans are relabelled."""
+    from src.core.loader import ensure_problem_index, build_problem_index
+    from src.core.state import concrete_plan
+    print("\nTesting symmetric states...")
+    
+    data = ensure_problem_index(instance_data).data
+    for symmetric in (False, True):
+        problem = build_problem_index(data, symmetric=symmetric)
+        initial_state = create_initial_state(problem)
+        
+        # jig0001 comes back empty next to jig0002, while jig0005 (empty, same type) stays in front
+        state = initial_state.get_next_state(SendJigToProduction("jig0001", "rack01"), problem)
+        state = state.get_next_state(ReturnEmptyJigFromFactory("jig0001", "rack01"), problem)
+        assert state.rack_jigs == {"rack00": ("jig0005", "jig0003", "jig0004"), "rack01": ("jig0002", "jig0001")}
+        
+        # The same configuration with the two empty jigs swapped
+        swap = {0: 4, 4: 0}
+        racks = tuple(tuple(swap.get(jig, jig) for jig in jigs) for jigs in state.racks)
+        swapped = BelugaState(problem, racks, state.loaded, state.beluga, state.factory, 1 << 4,
+                              state.current_flight_idx)
+        assert (swapped == state) == symmetric
+        assert (hash(swapped) == hash(state)) == symmetric
+    
+    # An action generated from the swapped state is relabelled onto the state reached
+    plan = concrete_plan(state, [(swapped, MoveJigBetweenRacks("jig0005", "rack01", "rack00"))])
+    assert plan == [MoveJigBetweenRacks("jig0001", "rack01", "rack00")]
+    assert state.get_next_state(plan[0], problem) is not None
+    
+    print("  Swapped empty jigs give one state, and plans follow the actual jigs")
+
+def test_apply_undo(instance_data, initial_state):
+    """Test that in-place apply matches get_next_state and undo restores the state."""
+    from src.core.loader import ensure_problem_index
+    from src.search.astar import get_all_possible_actions
+    print("\nTesting in-place apply and undo...")
+    
+    problem = ensure_problem_index(instance_data)
+    working = initial_state.mutable_copy()
+    
+    # Walk a fixed path in place, applying and undoing every action along the way
+    state = initial_state
+    checked = 0
+    for step in range(30):
+        actions = get_all_possible_actions(state, problem)
+        if not actions:
+            break
+        for action in actions:
+            record = working.apply(action)
+            next_state = state.get_next_state(action, problem)
+            assert (record is None) == (next_state is None)
+            if record is None:
+                continue
+            assert hash(working) == hash(next_state), f"Hash mismatch after {action}"
+            assert tuple(working.racks) == next_state.racks and tuple(working.rack_used) == next_state.rack_used
+            assert working.locations == next_state.locations
+            working.undo(record)
+            assert hash(working) == hash(state) and tuple(working.racks) == state.racks
+            checked += 1
+        action = actions[step % len(actions)]
+        working.apply(action)
+        state = state.get_next_state(action, problem)
+    
+    print(f"  {checked} actions applied in place and undone")
+
+def test_raw_dict_index(instance_data, initial_state):
+    """Test that a raw instance dict is compiled once across per-state calls."""
+    from src.core.loader import ensure_problem_index
+    from src.search.heuristic import heuristic
+    print("\nTesting raw instance dict compilation...")
+    
+    data = ensure_problem_index(instance_data).data
+    problem = ensure_problem_index(data)
+    assert ensure_problem_index(data) is problem
+    assert heuristic(initial_state, data) == heuristic(initial_state, problem)
+    assert ensure_problem_index(data) is problem
+    
+    print("  Per-state calls reuse the index compiled for the raw dict")
+
 if __name__ == "__main__":
     print("Starting Beluga Challenge setup test...")
     
@@ -122,4 +266,20 @@ if __name__ == "__main__":
     # Test actions
     test_actions(instance_data, initial_state)
     
-    print("\nAll tests completed!")
\ No newline at end of file
+    # Test incremental hash and occupancy updates
+    test_incremental_updates(instance_data, initial_state)
+    
+    # Test the search node table
+    test_node_table(instance_data, initial_state)
+    
+    # Test symmetry between empty jigs
+    test_symmetric_states(instance_data)
+    
+    # Test in-place apply and undo
+    test_apply_undo(instance_data, initial_state)
+    
+    # Test reuse of the index compiled for a raw instance dict
+    test_raw_dict_index(instance_data, initial_state)
+    
+    print("\nAll tests completed!")
+